@@ -0,0 +1,46 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+def remove_duplicated_possible_bets(apps, schema_editor):
+    """Mantém só a sugestão mais recente de cada (event_id, market)."""
+    PossibleBet = apps.get_model("bet", "PossibleBet")
+
+    seen = set()
+    duplicated = []
+    for pk, event_id, market in PossibleBet.objects.order_by(
+        "-created_at", "-id"
+    ).values_list("id", "event_id", "market"):
+        if (event_id, market) in seen:
+            duplicated.append(pk)
+        else:
+            seen.add((event_id, market))
+
+    PossibleBet.objects.filter(pk__in=duplicated).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bet", "0007_prebetdecision"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicated_possible_bets, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name="possiblebet",
+            index=models.Index(
+                fields=["event_id", "-created_at"],
+                name="bet_possibl_event_i_dbfaa2_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="possiblebet",
+            constraint=models.UniqueConstraint(
+                fields=("event_id", "market"), name="unique_possiblebet_event_market"
+            ),
+        ),
+    ]
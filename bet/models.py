@@ -180,6 +180,70 @@ class AllowedLeague(models.Model):
         return self.name
 
 
+class PossibleBetQuerySet(models.QuerySet):
+    # eventos por DELETE/upsert; cada evento vira um termo no WHERE e o SQLite
+    # limita a profundidade da expressão a 1000
+    REPLACE_CHUNK_SIZE = 500
+
+    def replace_for_events(self, suggestions_by_event):
+        """
+        Substitui as sugestões de vários eventos de uma vez.
+
+        `suggestions_by_event` = {event_id: [{"market", "probability", "description"}]}
+
+        Roda em uma transação com, a cada REPLACE_CHUNK_SIZE eventos, um DELETE
+        (mercados que saíram) e um INSERT ... ON CONFLICT (upsert em
+        event_id+market).
+        """
+        if not suggestions_by_event:
+            return 0
+
+        events = list(suggestions_by_event.items())
+        total = 0
+        with transaction.atomic():
+            for start in range(0, len(events), self.REPLACE_CHUNK_SIZE):
+                total += self._replace_chunk(
+                    events[start : start + self.REPLACE_CHUNK_SIZE]
+                )
+        return total
+
+    def _replace_chunk(self, events):
+        rows = {}
+        stale = models.Q()
+
+        for event_id, suggestions in events:
+            event_id = str(event_id)
+            markets = []
+
+            for suggestion in suggestions:
+                market = suggestion["market"]
+                # mesmo mercado repetido no evento: vale a primeira sugestão
+                if (event_id, market) in rows:
+                    continue
+                markets.append(market)
+                rows[(event_id, market)] = self.model(
+                    event_id=event_id,
+                    market=market,
+                    probability=suggestion.get("probability", 50),
+                    description=suggestion.get("description"),
+                )
+
+            if markets:
+                stale |= models.Q(event_id=event_id) & ~models.Q(market__in=markets)
+            else:
+                stale |= models.Q(event_id=event_id)
+
+        self.filter(stale).delete()
+        if rows:
+            self.bulk_create(
+                rows.values(),
+                update_conflicts=True,
+                unique_fields=["event_id", "market"],
+                update_fields=["probability", "description", "created_at"],
+            )
+        return len(rows)
+
+
 class PossibleBet(models.Model):
     event_id = models.CharField(max_length=50)
     market = models.CharField(max_length=255)
@@ -187,8 +251,18 @@ class PossibleBet(models.Model):
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PossibleBetQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event_id", "market"], name="unique_possiblebet_event_market"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["event_id", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.market} ({self.probability}%)"
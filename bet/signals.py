@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bet.teams.analysis_cache import invalidate_team_analysis
+from jogos.models import Match
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def invalidate_match_teams(sender, instance, **kwargs):
+    """
+    Partida salva/apagada: a análise em cache dos dois times fica velha.
+
+    Só apaga depois do commit, senão um request concorrente poderia recalcular
+    e guardar a análise com os dados de antes da transação.
+    """
+    transaction.on_commit(
+        partial(
+            invalidate_team_analysis, [instance.home_team_id, instance.away_team_id]
+        )
+    )
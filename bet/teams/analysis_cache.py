@@ -0,0 +1,43 @@
+"""
+Análise do time (agregados + previsões) calculada uma vez e guardada no cache.
+
+A página do time lê daqui; o signal de post_save/post_delete de Match
+(bet.signals) apaga a entrada dos dois times da partida, então a próxima
+visita recalcula só quando algum jogo do time mudou.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from bet.teams.analytics import build_predictions
+from jogos.models import Match
+from jogos.stat_lines import team_stat_summary
+
+
+def team_analysis_key(team_id):
+    return f"team-analysis:{team_id}"
+
+
+def build_team_analysis(team):
+    stats = team_stat_summary(team)
+    return {
+        "stats": stats,
+        "predictions": build_predictions(stats),
+        "matches_count": Match.objects.filter(
+            Q(home_team=team) | Q(away_team=team)
+        ).count(),
+    }
+
+
+def get_team_analysis(team):
+    key = team_analysis_key(team.pk)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = build_team_analysis(team)
+        cache.set(key, analysis, settings.TEAM_ANALYSIS_TTL)
+    return analysis
+
+
+def invalidate_team_analysis(team_ids):
+    cache.delete_many([team_analysis_key(team_id) for team_id in team_ids])
@@ -1,8 +1,12 @@
-import json
 import math
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+from django.db.models import Q
+
+from jogos.models import Match, TeamForm
+from jogos.stat_lines import team_for_against
+
 
 def clamp(x: float, lo: float = 0.0, hi: float = 1.0) -> float:
     return max(lo, min(hi, x))
@@ -130,101 +134,67 @@ def build_predictions(team_stats: Dict[str, Any]) -> Dict[str, Prediction]:
     return preds
 
 
-def extract_xg_for_against(match, team):
-    data = match.raw_statistics_json
-
-    if isinstance(data, str):
-        try:
-            data = json.loads(data)
-        except Exception:
-            return None, None
+PROFILE_KEYS = [
+    "expectedGoals",
+    "cornerKicks",
+    "totalShotsOnGoal",
+    "totalShotsInsideBox",
+    "touchesInOppBox",
+]
 
-    if not isinstance(data, dict):
-        return None, None
 
-    side = "home" if match.home_team_id == team.id else "away"
-    opp_side = "away" if side == "home" else "home"
+def build_profile(stats):
+    """Perfil a partir de {key: (média a favor, média contra)}."""
 
-    for block in data.get("statistics", []):
-        if block.get("period") != "ALL":
-            continue
+    def avg(key, against=False):
+        return stats.get(key, (None, None))[1 if against else 0] or 0
 
-        for group in block.get("groups", []):
-            for item in group.get("statisticsItems", []):
-                if item.get("key") == "expectedGoals":
-                    xg_for = item.get(f"{side}Value")
-                    xg_against = item.get(f"{opp_side}Value")
-                    return xg_for, xg_against
-
-    return None, None
+    return {
+        "xg_for": avg("expectedGoals"),
+        "xg_against": avg("expectedGoals", against=True),
+        "corners_for": avg("cornerKicks"),
+        "corners_against": avg("cornerKicks", against=True),
+        "shots_for": avg("totalShotsOnGoal"),
+        "shots_against": avg("totalShotsOnGoal", against=True),
+        "shots_in_box_for": avg("totalShotsInsideBox"),
+        "shots_in_box_against": avg("totalShotsInsideBox", against=True),
+        "touches_box_for": avg("touchesInOppBox"),
+        "pressure_index": (
+            avg("touchesInOppBox") * 0.4 + avg("totalShotsInsideBox") * 0.4
+        ),
+    }
 
 
 def team_profile(team, matches):
-    xg_for, xg_against = [], []
-    corners_for, corners_against = [], []
-    shots_for, shots_against = [], []
-    shots_in_box_for, shots_in_box_against = [], []
-    touches_box_for = []
-
-    for match in matches:
-        xgf, xga = extract_xg_for_against(match, team)
-        if xgf is not None:
-            xg_for.append(xgf)
-        if xga is not None:
-            xg_against.append(xga)
-
-        data = match.raw_statistics_json
-        if isinstance(data, str):
-            try:
-                data = json.loads(data)
-            except Exception:
-                continue
-
-        if not isinstance(data, dict):
-            continue
+    """Médias a favor/contra do time nas partidas (MatchStatLine, uma query)."""
+    return build_profile(team_for_against(team, matches, PROFILE_KEYS))
 
-        side = "home" if match.home_team_id == team.id else "away"
-        opp = "away" if side == "home" else "home"
 
-        for block in data.get("statistics", []):
-            if block.get("period") != "ALL":
-                continue
+def recent_matches(team, before=None, limit=None):
+    matches = Match.objects.filter(
+        Q(home_team=team) | Q(away_team=team), finalizado=True
+    ).order_by("-date")
+    if before is not None:
+        matches = matches.filter(date__lt=before)
+    return matches[:limit]
 
-            for group in block.get("groups", []):
-                for item in group.get("statisticsItems", []):
 
-                    key = item.get("key")
-
-                    if key == "cornerKicks":
-                        corners_for.append(item.get(f"{side}Value", 0))
-                        corners_against.append(item.get(f"{opp}Value", 0))
-
-                    if key == "totalShotsOnGoal":
-                        shots_for.append(item.get(f"{side}Value", 0))
-                        shots_against.append(item.get(f"{opp}Value", 0))
-
-                    if key == "totalShotsInsideBox":
-                        shots_in_box_for.append(item.get(f"{side}Value", 0))
-                        shots_in_box_against.append(item.get(f"{opp}Value", 0))
-
-                    if key == "touchesInOppBox":
-                        touches_box_for.append(item.get(f"{side}Value", 0))
-
-    def avg(lst):
-        return sum(lst) / len(lst) if lst else 0
+def team_form_profile(team, window, before=None):
+    """
+    Perfil do time nos últimos `window` jogos finalizados antes de `before`.
 
-    return {
-        "xg_for": avg(xg_for),
-        "xg_against": avg(xg_against),
-        "corners_for": avg(corners_for),
-        "corners_against": avg(corners_against),
-        "shots_for": avg(shots_for),
-        "shots_against": avg(shots_against),
-        "shots_in_box_for": avg(shots_in_box_for),
-        "shots_in_box_against": avg(shots_in_box_against),
-        "touches_box_for": avg(touches_box_for),
-        "pressure_index": (avg(touches_box_for) * 0.4 + avg(shots_in_box_for) * 0.4),
-    }
+    Lê a TeamForm guardada (uma query); só agrega o histórico quando ela não
+    existe ou inclui jogos a partir de `before` (preview de partida antiga).
+    O perfil leva "games", o tamanho da amostra.
+    """
+    form = TeamForm.objects.filter(team=team, window=window).first()
+    if form is not None and (
+        before is None or form.last_match_date is None or form.last_match_date < before
+    ):
+        return {**build_profile(form.averages()), "games": form.games}
+
+    matches = recent_matches(team, before, window)
+    return {**team_profile(team, matches), "games": matches.count()}
 
 
 def match_preview(home, away):
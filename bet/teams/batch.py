@@ -0,0 +1,415 @@
+"""
+Versões em lote (vetorizadas) dos preditores de partida.
+
+Cada função recebe um DataFrame (ou dict de arrays) com uma linha por partida
+e devolve um DataFrame com os mercados como colunas, usando as mesmas
+fórmulas das versões escalares:
+
+- predictions_batch        -> bet.teams.analytics.build_predictions
+- match_preview_batch      -> bet.teams.analytics.match_preview
+- bet_recommendations_batch -> bet.teams.bet_preview.bet_recommendations
+- analyze_match_batch      -> jogos.utils.analyze_match
+- auto_prediction_batch    -> bet.views.api.generate_auto_prediction
+
+As linhas de entrada vêm de team_stat_summary/team_profile (`stats_frame`,
+`profiles_frame`), de jogos.utils.analyze_match_features e de
+bet.views.api.auto_prediction_features. Para quadros do dia e backtests com
+muitas partidas (a ação check_analise do admin usa o preview e as sugestões em
+lote); NumPy/pandas só carregam quando este módulo é importado.
+"""
+
+import numpy as np
+import pandas as pd
+
+from jogos.scoreline import goal_markets_batch
+from jogos.utils import MANDANTE_BONUS
+
+PREDICTION_KEYS = [
+    "expectedGoals",
+    "shotsOnGoal",
+    "totalShotsOnGoal",
+    "bigChanceCreated",
+    "touchesInOppBox",
+    "cornerKicks",
+]
+
+PROFILE_FIELDS = [
+    "xg_for",
+    "xg_against",
+    "corners_for",
+    "corners_against",
+    "pressure_index",
+]
+
+
+def as_frame(features):
+    return features if isinstance(features, pd.DataFrame) else pd.DataFrame(features)
+
+
+def column(frame, name, default=0.0):
+    if name not in frame:
+        return np.full(len(frame), default, dtype=float)
+    return frame[name].to_numpy(dtype=float, na_value=default)
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def pick(conditions, choices, default):
+    return np.select(conditions, choices, default=default).astype(object)
+
+
+def stats_frame(summaries):
+    """Uma linha por time a partir de {key: {"avg": ...}} (team_stat_summary)."""
+    return pd.DataFrame(
+        [
+            {key: summary.get(key, {}).get("avg", 0.0) for key in PREDICTION_KEYS}
+            for summary in summaries
+        ]
+    )
+
+
+def profiles_frame(pairs):
+    """Uma linha por partida a partir de (perfil mandante, perfil visitante)."""
+    return pd.DataFrame(
+        [
+            {
+                **{f"home_{field}": home[field] for field in PROFILE_FIELDS},
+                **{f"away_{field}": away[field] for field in PROFILE_FIELDS},
+            }
+            for home, away in pairs
+        ]
+    )
+
+
+def predictions_batch(features):
+    """Probabilidades (0-1) de build_predictions; colunas = keys do SofaScore."""
+    frame = as_frame(features)
+    xg = column(frame, "expectedGoals")
+    shots_ot = column(frame, "shotsOnGoal")
+    shots_total = column(frame, "totalShotsOnGoal")
+    big_created = column(frame, "bigChanceCreated")
+    touches_box = column(frame, "touchesInOppBox")
+    corners = column(frame, "cornerKicks")
+
+    over15 = (
+        (xg - 1.2) * 1.2
+        + (shots_ot - 4.0) * 0.25
+        + (big_created - 2.0) * 0.35
+        + (touches_box - 18.0) * 0.05
+    )
+    over25 = (
+        (xg - 1.6) * 1.25
+        + (shots_ot - 5.0) * 0.22
+        + (big_created - 2.5) * 0.40
+        + (shots_total - 13.0) * 0.06
+    )
+    btts = (xg - 1.3) * 0.9 + (shots_ot - 4.5) * 0.20 + (corners - 4.5) * 0.10
+    corners_score = (
+        (corners - 4.5) * 0.9
+        + (touches_box - 18.0) * 0.04
+        + (shots_total - 12.0) * 0.05
+    )
+    return pd.DataFrame(
+        {
+            "over_1_5": np.clip(sigmoid(over15), 0, 1),
+            "over_2_5": np.clip(sigmoid(over25), 0, 1),
+            "btts": np.clip(sigmoid(btts) * 0.85, 0, 1),
+            "corners_over": np.clip(sigmoid(corners_score), 0, 1),
+        },
+        index=frame.index,
+    )
+
+
+def match_preview_batch(features):
+    """match_preview em lote; colunas home_*/away_* dos perfis (profiles_frame)."""
+    frame = as_frame(features)
+    home_xg_for = column(frame, "home_xg_for")
+    away_xg_for = column(frame, "away_xg_for")
+
+    expected_goals = (
+        home_xg_for * 0.55
+        + away_xg_for * 0.45
+        + column(frame, "home_xg_against") * 0.45
+        + column(frame, "away_xg_against") * 0.55
+    )
+    over25 = np.clip((expected_goals - 1.8) / 1.2, 0.1, 0.9)
+    btts = np.minimum(
+        0.85,
+        np.maximum(0.15, (home_xg_for > 1.0).astype(float) + (away_xg_for > 1.0)) / 2,
+    )
+    corners_total = (
+        column(frame, "home_corners_for")
+        + column(frame, "away_corners_for")
+        + column(frame, "home_corners_against")
+        + column(frame, "away_corners_against")
+    ) / 2
+
+    return pd.DataFrame(
+        {
+            "expected_goals": np.round(expected_goals, 2),
+            "over_2_5": np.round(over25 * 100).astype(int),
+            "btts": np.round(btts * 100).astype(int),
+            "corners_total": corners_total,
+            "corners_over_8_5": pick(
+                [corners_total >= 9, corners_total >= 7], ["Alta", "Média"], "Baixa"
+            ),
+            "corners_score": np.select(
+                [corners_total >= 9, corners_total >= 7], [80, 55], 30
+            ),
+        },
+        index=frame.index,
+    )
+
+
+def side_market(home_score, away_score, neutral):
+    return pick(
+        [home_score > away_score * 1.15, away_score > home_score * 1.15],
+        ["Casa", "Fora"],
+        neutral,
+    )
+
+
+def bet_recommendations_batch(features, preview=None):
+    """bet_recommendations em lote; `preview` é o match_preview_batch (ou é calculado)."""
+    frame = as_frame(features)
+    if preview is None:
+        preview = match_preview_batch(frame)
+
+    home = {field: column(frame, f"home_{field}") for field in PROFILE_FIELDS}
+    away = {field: column(frame, f"away_{field}") for field in PROFILE_FIELDS}
+
+    def first_goal_score(side):
+        return (
+            side["xg_for"] * 1.2
+            + side["pressure_index"] * 0.03
+            - side["xg_against"] * 0.6
+        )
+
+    corners_total = (
+        home["corners_for"]
+        + away["corners_for"]
+        + home["corners_against"]
+        + away["corners_against"]
+    ) / 2
+
+    cards = (
+        3.5
+        + 0.5 * (np.abs(home["xg_for"] - away["xg_for"]) < 0.4)
+        + 0.7 * (home["pressure_index"] + away["pressure_index"] > 60)
+        + 0.5 * (preview["btts"].to_numpy() >= 60)
+    )
+
+    return pd.DataFrame(
+        {
+            "first_goal": side_market(
+                first_goal_score(home), first_goal_score(away), "Sem valor"
+            ),
+            "corners_side": side_market(
+                home["corners_for"] * 0.6 + away["corners_against"] * 0.4,
+                away["corners_for"] * 0.6 + home["corners_against"] * 0.4,
+                "Equilibrado",
+            ),
+            "corners_total": np.round(corners_total, 1),
+            "corners_line": pick(
+                [corners_total >= 11, corners_total >= 9, corners_total >= 7],
+                ["Over 9.5 / 10.5", "Over 8.5", "Linha 7.5"],
+                "Under",
+            ),
+            "cards_total": np.round(cards, 1),
+            "cards_market": pick(
+                [cards >= 5, cards >= 4],
+                ["Over 4.5 cartões", "Over 3.5 cartões"],
+                "Linha baixa",
+            ),
+        },
+        index=frame.index,
+    )
+
+
+def analyze_match_batch(features):
+    """
+    Probabilidades (%) e recomendação de analyze_match em lote.
+
+    Linhas com `has_stats` usam o modelo ao vivo (matriz de placares do xG,
+    jogos.scoreline); as demais, o pré-jogo pela força (userCount) e o peso da
+    liga.
+    """
+    frame = as_frame(features)
+    live = column(frame, "has_stats").astype(bool)
+
+    # pré-jogo
+    home_users = column(frame, "home_users", 30000)
+    away_users = column(frame, "away_users", 30000)
+    total_force = home_users + away_users
+    avg_goals = 2.6 * column(frame, "league_weight", 1.0)
+    home_strength = (home_users / total_force) * MANDANTE_BONUS
+    away_strength = away_users / total_force
+    lam_home = avg_goals * home_strength * 0.55
+    lam_away = avg_goals * away_strength * 0.45
+
+    pre_over25 = np.minimum(0.88, (lam_home + lam_away) / 2.3)
+    pre_btts = np.minimum(1, (lam_home * lam_away) / 1.3)
+
+    # ao vivo
+    xg_home, xg_away = column(frame, "xg_home"), column(frame, "xg_away")
+    sot_home, sot_away = column(frame, "sot_home"), column(frame, "sot_away")
+    total_xg = xg_home + xg_away
+    total_big = column(frame, "big_home") + column(frame, "big_away")
+    total_sot = sot_home + sot_away
+
+    # mercados da matriz de placares, uma matriz por par de xG distinto
+    markets = goal_markets_batch(xg_home, xg_away)
+    live_h2 = np.minimum(
+        1, (column(frame, "xg_h2_home") + column(frame, "xg_h2_away")) / 0.55
+    )
+
+    over25 = np.where(live, markets["over_2_5"], pre_over25)
+    over15 = np.where(live, markets["over_1_5"], np.minimum(1, pre_over25 + 0.20))
+    btts = np.where(live, markets["btts"], pre_btts)
+    goal_h2 = np.where(live, live_h2, 0.55)
+
+    recommendation = np.where(
+        live,
+        pick(
+            [over15 > 0.72, btts > 0.60, goal_h2 > 0.65],
+            ["Over 1.5 gols (LIVE)", "Ambas Marcam (LIVE)", "Gol no 2º tempo"],
+            "Nenhuma entrada segura ainda",
+        ),
+        pick(
+            [over15 > 0.72, btts > 0.65],
+            ["Over 1.5 (pré-jogo)", "BTTS (pré-jogo)"],
+            "Nenhuma entrada segura pré-live",
+        ),
+    )
+    confidence = np.where(
+        live,
+        np.minimum(100, total_xg * 22 + total_big * 10 + total_sot * 3),
+        (over25 * 0.6 + btts * 0.4) * 100,
+    )
+
+    return pd.DataFrame(
+        {
+            "over_1_5": np.round(over15 * 100, 1),
+            "over_2_5": np.round(over25 * 100, 1),
+            "under_2_5": np.round((1 - over25) * 100, 1),
+            "btts": np.round(btts * 100, 1),
+            "goal_h2": np.round(goal_h2 * 100, 1),
+            "projected_home": np.where(
+                live, np.round(xg_home * 0.9 + sot_home * 0.12, 2), lam_home
+            ),
+            "projected_away": np.where(
+                live, np.round(xg_away * 0.9 + sot_away * 0.12, 2), lam_away
+            ),
+            "recommendation": recommendation,
+            "confidence": np.round(confidence, 1),
+        },
+        index=frame.index,
+    )
+
+
+def auto_prediction_batch(features):
+    """Probabilidades e mercados de generate_auto_prediction em lote."""
+    frame = as_frame(features)
+    xg_home, xg_away = column(frame, "xg_home"), column(frame, "xg_away")
+    sot_home, sot_away = column(frame, "sot_home"), column(frame, "sot_away")
+    poss_home, poss_away = column(frame, "poss_home"), column(frame, "poss_away")
+    total_xg = xg_home + xg_away
+    total_shots = column(frame, "shots_home") + column(frame, "shots_away")
+    total_sot = sot_home + sot_away
+    total_goals = column(frame, "score_home") + column(frame, "score_away")
+    diff_pts = column(frame, "pts_home") - column(frame, "pts_away")
+
+    minute = column(frame, "minute", np.nan)
+    late = minute > 70
+    mid_or_late = minute > 30
+
+    signals = {
+        name: [column(frame, f"{name}_sum"), column(frame, f"{name}_count")]
+        for name in ("over", "under", "home", "away")
+    }
+
+    def add(name, condition, value):
+        signals[name][0] = signals[name][0] + np.where(condition, value, 0)
+        signals[name][1] = signals[name][1] + condition
+
+    def add_select(name, conditions, values):
+        # primeira condição verdadeira (if/elif) vale
+        taken = np.zeros(len(frame), dtype=bool)
+        for condition, value in zip(conditions, values):
+            add(name, condition & ~taken, value)
+            taken |= condition
+
+    add("home", diff_pts > 2, 65)
+    add("away", diff_pts < -2, 65)
+
+    for total, steps, low, under_value in (
+        (total_xg, ((2.0, 80), (1.2, 70), (0.8, 60)), 0.4, 70),
+        (total_shots, ((18, 70), (10, 60)), 4, 65),
+        (total_sot, ((7, 75), (4, 65)), 1, 65),
+    ):
+        add_select("over", [total >= step for step, _ in steps], [v for _, v in steps])
+        # `low` fica abaixo do menor degrau: é o elif final da versão escalar
+        add("under", (total <= low) & mid_or_late, under_value)
+
+    add("under", late & (total_goals == 0) & (total_xg < 1.0), 80)
+
+    home_xg_edge = (xg_home > xg_away * 1.5) & (xg_home > 0.4)
+    add("home", home_xg_edge, 70)
+    add("away", ~home_xg_edge & (xg_away > xg_home * 1.5) & (xg_away > 0.4), 70)
+
+    add("home", (sot_home >= 3) & (sot_home >= sot_away + 2), 60)
+    add("away", (sot_away >= 3) & (sot_away >= sot_home + 2), 60)
+
+    add("home", poss_home >= 60, 55)
+    add("away", (poss_home < 60) & (poss_away >= 60), 55)
+
+    probs = {}
+    for name, (total, count) in signals.items():
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = np.where(count > 0, np.trunc(total / count), 50)
+        probs[name] = np.clip(average, 5, 95).astype(int)
+
+    diff_gols = probs["over"] - probs["under"]
+    gols = pick(
+        [diff_gols >= 15, diff_gols >= 8, diff_gols <= -15, diff_gols <= -8],
+        ["Over 2.5", "Over 1.5", "Under 2.5", "Under 3.5"],
+        "Nenhum mercado claro",
+    )
+
+    score_home = (probs["home"] - probs["away"]) * 0.7 + diff_pts * 0.3
+    favorite = pick(
+        [score_home >= 12, score_home <= -12], ["Casa", "Fora"], "Equilibrado"
+    )
+
+    principal = pick(
+        [
+            gols == "Under 2.5",
+            gols == "Over 2.5",
+            np.isin(gols, ["Under 3.5", "Over 1.5"]),
+            np.abs(score_home) < 10,
+            score_home > 0,
+        ],
+        [
+            "Under 3.5",
+            "Over 1.5",
+            gols,
+            "Nenhum mercado seguro",
+            "Dupla chance mandante",
+        ],
+        "Dupla chance visitante",
+    )
+
+    return pd.DataFrame(
+        {
+            "under": probs["under"],
+            "over": probs["over"],
+            "home": probs["home"],
+            "away": probs["away"],
+            "gols": gols,
+            "favorite": favorite,
+            "principal": principal,
+        },
+        index=frame.index,
+    )
@@ -1,10 +1,40 @@
+import asyncio
+import random
+import time
+from datetime import timedelta
 from decimal import Decimal
+from unittest import mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
 
-from bet.models import Bankroll, Bet, Status
-from jogos.models import League, Match, Season, Team
+from bet.models import Bankroll, Bet, PossibleBet, Status
+from bet.teams.analytics import build_predictions, match_preview
+from bet.teams.batch import (
+    PROFILE_FIELDS,
+    analyze_match_batch,
+    auto_prediction_batch,
+    bet_recommendations_batch,
+    match_preview_batch,
+    predictions_batch,
+    profiles_frame,
+    stats_frame,
+)
+from bet.teams.bet_preview import bet_recommendations
+from bet.views.api import auto_prediction_features, generate_auto_prediction
+from bet.views.live import _event_stream
+from jogos.live_analysis import record_live_analysis
+from jogos.live_feed import publish
+from jogos.models import League, LiveSnapshot, Match, Season, Team
+from jogos.snapshots import SnapshotWriter
+from jogos.stat_lines import sync_stat_lines
+from jogos.team_form import update_finalized_forms
+from jogos.tests import LOCMEM_CACHES, create_match, stats_payload
+from jogos.utils import analyze_match, analyze_match_features
 
 
 class BankrollTestCase(TestCase):
@@ -73,3 +103,483 @@ class BetSettlementTestCase(TestCase):
 
         with self.assertRaises(ValueError):
             bet.settle_bet(is_green=True)
+
+
+class PossibleBetReplaceTestCase(TestCase):
+    def suggestions(self, *markets):
+        return [{"market": m, "probability": 60, "description": m} for m in markets]
+
+    def test_replace_upserts_and_removes_stale_markets(self):
+        PossibleBet.objects.replace_for_events(
+            {
+                "1": self.suggestions("Over 1.5", "BTTS"),
+                "2": self.suggestions("Over 2.5"),
+            }
+        )
+        PossibleBet.objects.replace_for_events(
+            {"1": self.suggestions("Over 1.5", "Over 1.5"), "2": []}
+        )
+
+        self.assertEqual(
+            list(PossibleBet.objects.values_list("event_id", "market")),
+            [("1", "Over 1.5")],
+        )
+
+    def test_replace_uses_constant_number_of_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            PossibleBet.objects.replace_for_events({"1": self.suggestions("Over 1.5")})
+
+        batch = {
+            str(event_id): self.suggestions("Over 1.5", "Over 2.5", "BTTS")
+            for event_id in range(2, 30)
+        }
+        with CaptureQueriesContext(connection) as large:
+            PossibleBet.objects.replace_for_events(batch)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(PossibleBet.objects.count(), 1 + 28 * 3)
+
+    def test_replace_splits_large_batches(self):
+        batch = {
+            str(event_id): self.suggestions("Over 1.5") for event_id in range(1200)
+        }
+        PossibleBet.objects.replace_for_events(batch)
+
+        batch = {str(event_id): self.suggestions("BTTS") for event_id in range(1200)}
+        self.assertEqual(PossibleBet.objects.replace_for_events(batch), 1200)
+        self.assertEqual(
+            set(PossibleBet.objects.values_list("market", flat=True)), {"BTTS"}
+        )
+        self.assertEqual(PossibleBet.objects.count(), 1200)
+
+
+class MatchSnapshotsViewTestCase(TestCase):
+    def setUp(self):
+        self.match = create_match()
+        self.snaps = [
+            LiveSnapshot.objects.create(match=self.match, minute=minute, xg_home=0.1)
+            for minute in range(5)
+        ]
+        self.url = reverse("match_snapshots", args=[self.match.pk])
+
+    def test_incremental_columnar_fetch_with_field_selection(self):
+        response = self.client.get(
+            self.url,
+            {
+                "since_id": self.snaps[2].pk,
+                "fields": "minute,xg_home,pressure_home",
+                "format": "columns",
+            },
+        )
+
+        self.assertEqual(
+            response.json(),
+            {
+                "columns": {
+                    "minute": [2, 3, 4],
+                    "xg_home": [0.1, 0.1, 0.1],
+                    "pressure_home": [False, False, False],
+                },
+                "last_id": self.snaps[4].pk,
+            },
+        )
+
+    def test_etag_returns_not_modified_until_new_snapshot(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        # upsert no mesmo bucket: mesmo id e mesma contagem
+        self.snaps[4].xg_home = 0.5
+        self.snaps[4].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        since = self.client.get(self.url, {"since_id": self.snaps[4].pk})
+        self.assertEqual(since.json()["snapshots"][0]["xg_home"], 0.5)
+
+        LiveSnapshot.objects.create(match=self.match, minute=5)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.url, {"fields": "minute,points_home"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(LIVE_FEED_BACKEND="local", LIVE_FEED_KEEPALIVE=1)
+class MatchStreamTestCase(TestCase):
+    async def test_stream_sends_current_state_then_published_events(self):
+        stream = _event_stream(7, snapshot={"minute": 12})
+
+        self.assertEqual(
+            await anext(stream), 'event: snapshot\ndata: {"minute": 12}\n\n'
+        )
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        publish(7, "analysis", {"pressure_home": True})
+
+        self.assertEqual(
+            await asyncio.wait_for(pending, 1),
+            'event: analysis\ndata: {"pressure_home": true}\n\n',
+        )
+        await stream.aclose()
+
+    @override_settings(LIVE_FEED_STREAM_SECONDS=0)
+    async def test_stream_closes_after_its_time_limit(self):
+        stream = _event_stream(7)
+
+        self.assertEqual(await anext(stream), ": keep-alive\n\n")
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+
+    @override_settings(LIVE_FEED_BACKEND="redis")
+    def test_publish_failure_is_logged_not_raised(self):
+        with mock.patch(
+            "jogos.live_feed._get_redis", side_effect=ConnectionError("down")
+        ), self.assertLogs("jogos.live_feed", "ERROR"):
+            publish(7, "snapshot", {"minute": 12})
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, LIVE_FEED_BACKEND="local", LIVE_FRESHNESS_SECONDS=60
+)
+class PostStatusTestCase(TestCase):
+    def setUp(self):
+        self.match = create_match(date=timezone.now() - timedelta(minutes=30))
+        self.snapshot = LiveSnapshot.objects.create(
+            match=self.match, minute=30, xg_home=0.8
+        )
+        record_live_analysis(self.match, {"goal_warning": "Jogo moderado"}, minute=30)
+        record_live_analysis(self.match, {"goal_warning": "ALTO risco"}, minute=31)
+        self.url = reverse("post-data-stats")
+
+    @mock.patch("bet.views.match.process_match_snapshot")
+    def test_fresh_snapshot_is_served_without_refresh(self, task):
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, {"event_id": self.match.pk})
+
+        data = response.json()
+        self.assertEqual(data["xg_home"], 0.8)
+        self.assertEqual(data["analysis_live"]["goal_warning"], "ALTO risco")
+        self.assertEqual(data["analysis_live"]["version"], 2)
+        self.assertFalse(data["stale"])
+        task.delay.assert_not_called()
+
+    @mock.patch("bet.views.match.process_match_snapshot")
+    def test_stale_snapshot_queues_a_single_refresh(self, task):
+        five_minutes_ago = timezone.now() - timedelta(minutes=5)
+        LiveSnapshot.objects.filter(pk=self.snapshot.pk).update(
+            created_at=five_minutes_ago, updated_at=five_minutes_ago
+        )
+
+        first = self.client.post(self.url, {"event_id": self.match.pk}).json()
+        second = self.client.post(self.url, {"event_id": self.match.pk}).json()
+
+        self.assertTrue(first["stale"] and first["refresh_queued"])
+        self.assertTrue(second["stale"])
+        self.assertFalse(second["refresh_queued"])
+        task.delay.assert_called_once_with(self.match.pk)
+
+    @mock.patch("bet.views.match.process_match_snapshot")
+    def test_snapshot_upserted_in_its_bucket_is_fresh(self, task):
+        self.addCleanup(cache.clear)
+        five_minutes_ago = timezone.now() - timedelta(minutes=5)
+        LiveSnapshot.objects.filter(pk=self.snapshot.pk).update(
+            created_at=five_minutes_ago, updated_at=five_minutes_ago
+        )
+        writer = SnapshotWriter()
+        writer.add(LiveSnapshot(match=self.match, minute=30, xg_home=1.1))
+        writer.flush()
+
+        data = self.client.post(self.url, {"event_id": self.match.pk}).json()
+
+        self.assertEqual(data["xg_home"], 1.1)
+        self.assertFalse(data["stale"])
+        task.delay.assert_not_called()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LIVE_FEED_BACKEND="local")
+class LiveMonitorTestCase(TestCase):
+    def test_monitor_uses_constant_number_of_queries(self):
+        for external_id in range(1, 4):
+            match = create_match(external_id=external_id)
+            LiveSnapshot.objects.create(match=match, minute=10, momentum_score=1)
+            LiveSnapshot.objects.create(match=match, minute=11, momentum_score=4)
+            record_live_analysis(match, {"pressure_home": False}, minute=10)
+            record_live_analysis(match, {"pressure_home": True}, minute=11)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("live_monitor_api"))
+
+        rows = response.json()["matches"]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row["momentum"] for row in rows}, {4})
+        self.assertTrue(all(row["pressure_home"] for row in rows))
+        self.assertEqual(response.json()["skipped_polls"], 0)
+
+        for external_id in range(4, 20):
+            create_match(external_id=external_id)
+        with self.assertNumQueries(3):
+            self.client.get(reverse("live_monitor_api"))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TeamAnalysisViewTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        now = timezone.now()
+        finished = [
+            create_match(
+                external_id=day,
+                date=now - timedelta(days=day),
+                finalizado=True,
+                raw_statistics_json=stats_payload(cornerKicks=(day, 3)),
+            )
+            for day in range(1, 3)
+        ]
+        self.next_match = create_match(external_id=10, date=now + timedelta(days=1))
+        sync_stat_lines(finished)
+        update_finalized_forms(finished)
+        self.team = self.next_match.home_team
+        self.url = reverse("team_analysis", args=[self.team.pk])
+
+    def test_analysis_is_cached_until_a_team_match_is_saved(self):
+        # time, agregados, contagem, próximo jogo e a forma dos dois lados
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context["stats"]["cornerKicks"]["avg"], 1.5)
+        self.assertEqual(response.context["matches_count"], 3)
+        self.assertIsNotNone(response.context["preview"])
+
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.next_match.status = "inprogress"
+            self.next_match.save()
+
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+
+class BatchPredictorsTestCase(SimpleTestCase):
+    """As versões em lote (bet.teams.batch) batem com as escalares linha a linha."""
+
+    ROWS = 300
+
+    def setUp(self):
+        self.rng = random.Random(42)
+
+    def uniform(self, high, low=0.0):
+        return round(self.rng.uniform(low, high), 2)
+
+    def assertRowsEqual(self, frame, expected, keys, decimals=None):
+        """
+        `decimals` ({coluna: casas}) marca as colunas que a versão escalar
+        arredonda; as demais são probabilidades cruas e comparadas com 9 casas.
+        """
+        decimals = decimals or {}
+        for (_, row), scalar in zip(frame.iterrows(), expected):
+            for key in keys:
+                if isinstance(scalar[key], str):
+                    self.assertEqual(row[key], scalar[key], key)
+                elif key in decimals:
+                    # np.round x round(): um empate na última casa pode cair para
+                    # lados diferentes, no máximo 1 unidade dessa casa
+                    unit = 10 ** -decimals[key]
+                    self.assertAlmostEqual(
+                        row[key], scalar[key], delta=unit * 1.0001, msg=key
+                    )
+                else:
+                    self.assertAlmostEqual(row[key], scalar[key], places=9, msg=key)
+
+    def test_predictions_and_previews(self):
+        summaries = [
+            {
+                key: {"avg": self.uniform(high)}
+                for key, high in (
+                    ("expectedGoals", 3),
+                    ("shotsOnGoal", 9),
+                    ("totalShotsOnGoal", 20),
+                    ("bigChanceCreated", 5),
+                    ("touchesInOppBox", 35),
+                    ("cornerKicks", 9),
+                )
+            }
+            for _ in range(self.ROWS)
+        ]
+        batch = predictions_batch(stats_frame(summaries))
+        expected = [
+            {key: p.prob for key, p in build_predictions(summary).items()}
+            for summary in summaries
+        ]
+        self.assertRowsEqual(batch, expected, expected[0].keys())
+
+        def profile():
+            return {
+                "xg_for": self.uniform(2.5),
+                "xg_against": self.uniform(2.5),
+                "corners_for": self.uniform(8),
+                "corners_against": self.uniform(8),
+                "pressure_index": self.uniform(45),
+            }
+
+        pairs = [(profile(), profile()) for _ in range(self.ROWS)]
+        frame = profiles_frame(pairs)
+        preview = match_preview_batch(frame)
+        recommendations = bet_recommendations_batch(frame, preview)
+
+        previews = [match_preview(home, away) for home, away in pairs]
+        self.assertRowsEqual(
+            preview,
+            previews,
+            previews[0].keys(),
+            {"expected_goals": 2, "over_2_5": 0, "btts": 0, "corners_score": 0},
+        )
+        self.assertRowsEqual(
+            recommendations,
+            [
+                bet_recommendations(home, away, scalar)
+                for (home, away), scalar in zip(pairs, previews)
+            ],
+            recommendations.columns,
+            {"corners_total": 1, "cards_total": 1},
+        )
+
+    def test_analyze_match(self):
+        rows, expected = [], []
+        for index in range(self.ROWS):
+            event = {
+                "homeTeam": {"name": "A", "userCount": self.rng.randint(1, 90000)},
+                "awayTeam": {"name": "B", "userCount": self.rng.randint(1, 90000)},
+                "tournament": {
+                    "name": "Liga",
+                    "slug": self.rng.choice(["premier-league", "ligue-1", "outra"]),
+                },
+            }
+            stats = {}
+            if index % 3:
+                stats = {
+                    "statistics": [
+                        {
+                            "period": period,
+                            "groups": [
+                                {
+                                    "statisticsItems": [
+                                        {
+                                            "key": key,
+                                            "homeValue": self.uniform(high),
+                                            "awayValue": self.uniform(high),
+                                        }
+                                        for key, high in (
+                                            ("expectedGoals", 2.5),
+                                            ("shotsOnGoal", 9),
+                                            ("bigChanceCreated", 4),
+                                        )
+                                    ]
+                                }
+                            ],
+                        }
+                        for period in ("ALL", "2ND")
+                    ]
+                }
+            rows.append(analyze_match_features(event, stats))
+            scalar = analyze_match(event, stats)
+            expected.append(
+                {
+                    **scalar["probabilities"],
+                    "recommendation": scalar["recommendation"],
+                    "confidence": scalar["confidence"],
+                }
+            )
+
+        batch = analyze_match_batch(rows)
+        self.assertRowsEqual(
+            batch,
+            expected,
+            expected[0].keys(),
+            {
+                key: 1
+                for key, value in expected[0].items()
+                if not isinstance(value, str)
+            },
+        )
+
+    def test_auto_prediction(self):
+        rows, expected = [], []
+        for _ in range(self.ROWS):
+            start = 1_700_000_000
+            event = {
+                "homeTeam": {"name": "A"},
+                "awayTeam": {"name": "B"},
+                "startTimestamp": start,
+                "time": (
+                    {"timestamp": start + self.rng.randint(0, 95) * 60}
+                    if self.rng.random() < 0.8
+                    else {}
+                ),
+                "homeScore": {"current": self.rng.randint(0, 3)},
+                "awayScore": {"current": self.rng.randint(0, 3)},
+            }
+            stats = {
+                key: {"home": self.uniform(high), "away": self.uniform(high)}
+                for key, high in (
+                    ("xg", 2),
+                    ("shots", 12),
+                    ("shots_on", 5),
+                    ("posse", 75),
+                )
+            }
+            streaks = {
+                "general": [
+                    {
+                        "name": self.rng.choice(
+                            ["More than 2.5 goals", "Less than 2.5 goals", "Wins"]
+                        ),
+                        "team": self.rng.choice(["home", "away", "both"]),
+                        "ratio": self.uniform(1),
+                    }
+                    for _ in range(self.rng.randint(0, 5))
+                ],
+                "head2head": [],
+            }
+            standings = {
+                "home": {"points": self.rng.randint(0, 60)},
+                "away": {"points": self.rng.randint(0, 60)},
+            }
+            rows.append(auto_prediction_features(event, stats, streaks, standings))
+
+            scalar = generate_auto_prediction(event, stats, streaks, standings)
+            favorite = scalar["leitura_geral"]["favorito"]
+            expected.append(
+                {
+                    **scalar["probabilidades"],
+                    "gols": scalar["leitura_geral"]["gols"],
+                    "principal": scalar["mercados_sugeridos_modelo"]["principal"],
+                    "favorite": (
+                        "Casa"
+                        if favorite.startswith("A ")
+                        else "Fora" if favorite.startswith("B ") else "Equilibrado"
+                    ),
+                }
+            )
+
+        batch = auto_prediction_batch(rows)
+        self.assertRowsEqual(batch, expected, expected[0].keys())
+
+    def test_throughput(self):
+        size = 100_000
+        profile = dict.fromkeys(PROFILE_FIELDS, 1.0)
+        frame = profiles_frame([(profile, profile)] * size)
+
+        start = time.perf_counter()
+        bet_recommendations_batch(frame)
+        # folgado para CI; localmente bem abaixo
+        self.assertLess(time.perf_counter() - start, 2.0)
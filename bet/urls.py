@@ -30,6 +30,13 @@ urlpatterns = [
         views.match_snapshots,
         name="match_snapshots",
     ),
+    path(
+        "matches/<int:match_id>/stream/",
+        views.match_stream,
+        name="match_stream",
+    ),
+    path("live/", views.live_monitor, name="live_monitor"),
+    path("live/api/", views.live_monitor_api, name="live_monitor_api"),
     path("run-scraper/", views.sofascore_scrape_view, name="run_scraper"),
     path("matches/<int:pk>/odds/featured/", MatchOddsFeaturedView.as_view()),
     path("matches/<int:pk>/odds/all/", MatchOddsAllView.as_view()),
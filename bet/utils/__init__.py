@@ -4,6 +4,7 @@ from decimal import Decimal
 from django.db import models
 
 from bet.models import Bet, MatchModelEvaluation
+from jogos.stat_index import raw_stat, stat_index
 
 
 def generate_bankroll_alerts(bankroll):
@@ -72,16 +73,9 @@ class SofaStatParser:
     """Ajuda a extrair dados limpos do JSON complexo do SofaScore."""
 
     def __init__(self, stats_json):
-        self.data = stats_json.get("statistics", [])
+        self.stats_json = stats_json
 
     def get_stats(self, period="ALL"):
-
-        period_group = next(
-            (item for item in self.data if item["period"] == period), None
-        )
-        if not period_group:
-            return {}
-
         stats = {}
 
         key_map = {
@@ -104,13 +98,13 @@ class SofaStatParser:
             "duelWonPercent": "duels_won_pct",
         }
 
-        for group in period_group.get("groups", []):
-            for item in group.get("statisticsItems", []):
-                key = item.get("key")
-                if key in key_map:
-                    clean_key = key_map[key]
-                    stats[f"{clean_key}_home"] = float(item.get("homeValue", 0))
-                    stats[f"{clean_key}_away"] = float(item.get("awayValue", 0))
+        index = stat_index(self.stats_json)
+        for key, clean_key in key_map.items():
+            if (period, key) in index:
+                home, away = raw_stat(index, key, period)
+                # valor não numérico é erro do payload, não zero
+                stats[f"{clean_key}_home"] = float(0 if home is None else home)
+                stats[f"{clean_key}_away"] = float(0 if away is None else away)
         return stats
 
 
@@ -293,18 +287,7 @@ def get_stat(stats_json, key, period="ALL"):
     if not stats_json:
         return None, None
 
-    data = safe_json(stats_json)
-
-    for block in data.get("statistics", []):
-        if block.get("period") != period:
-            continue
-
-        for group in block.get("groups", []):
-            for item in group.get("statisticsItems", []):
-                if item.get("key") == key:
-                    return item.get("homeValue"), item.get("awayValue")
-
-    return None, None
+    return raw_stat(safe_json(stats_json), key, period)
 
 
 def get_real_outcome(match):
@@ -11,6 +11,7 @@ from .api import (
 from .bankroll import bankroll_view, update_bet_result
 from .bets import create_bet_from_model, get_recommended_stake_and_odd, place_bet
 from .dashboard import dashboard
+from .live import live_monitor, live_monitor_api, match_stream
 from .match import (
     MatchStatFilters,
     extract_balanced_json,
@@ -38,9 +39,12 @@ __all__ = [
     "get_json",
     "get_recommended_stake_and_odd",
     "headers",
+    "live_monitor",
+    "live_monitor_api",
     "match_analysis",
     "match_detail",
     "match_snapshots",
+    "match_stream",
     "matches_list",
     "place_bet",
     "parse_summary",
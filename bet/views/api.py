@@ -3,8 +3,6 @@ import random
 import time
 from decimal import Decimal
 
-import requests
-from curl_cffi import requests as cureq
 from django.db.models import Count, Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
@@ -21,6 +19,9 @@ headers = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
 
 
 def get_json(url):
+    # curl_cffi só é carregado quando alguma view busca odds
+    from curl_cffi import requests as cureq
+
     try:
         resp = cureq.get(url, impersonate="chrome", timeout=15, verify=False)
         if resp.status_code != 200:
@@ -38,6 +39,72 @@ def prob_from_ratio(ratio):
     return min(int(ratio * 100), 100)
 
 
+def streak_signals(items):
+    """Listas de sinais (over, under, home, away) das streaks do SofaScore."""
+    under_signals, over_signals = [], []
+    home_signals, away_signals = [], []
+
+    def is_goal_streak(name):
+        name = name.lower()
+        return ("goal" in name) or ("gols" in name) or ("goals" in name)
+
+    for item in items:
+        ratio = item.get("ratio")
+        if ratio is None:
+            continue
+
+        name = (item.get("name") or "").lower()
+        team = item.get("team")
+
+        if is_goal_streak(name):
+            if "more than" in name or "mais de" in name:
+                over_signals.append(prob_from_ratio(ratio))
+            if "less than" in name or "menos de" in name:
+                under_signals.append(prob_from_ratio(ratio))
+
+        if team == "home" and ratio >= 0.60:
+            home_signals.append(prob_from_ratio(ratio))
+        if team == "away" and ratio >= 0.60:
+            away_signals.append(prob_from_ratio(ratio))
+
+    return over_signals, under_signals, home_signals, away_signals
+
+
+def auto_prediction_features(event, stats, streaks, standings):
+    """
+    Entradas numéricas de generate_auto_prediction numa linha (dict), para o
+    lote vetorizado (bet.teams.batch.auto_prediction_batch). As streaks viram
+    soma e quantidade de cada lista de sinais.
+    """
+    stats_block = stats or {}
+    row = {}
+    for name, key in (("xg", "xg"), ("shots", "shots"), ("sot", "shots_on")):
+        row[f"{name}_home"] = float(stats_block.get(key, {}).get("home", 0.0))
+        row[f"{name}_away"] = float(stats_block.get(key, {}).get("away", 0.0))
+    row["poss_home"] = float(stats_block.get("posse", {}).get("home", 0.0))
+    row["poss_away"] = float(stats_block.get("posse", {}).get("away", 0.0))
+
+    start_ts = event.get("startTimestamp")
+    current_ts = event.get("time", {}).get("timestamp")
+    row["minute"] = (
+        int(max(0, current_ts - start_ts) // 60)
+        if start_ts and current_ts
+        else float("nan")
+    )
+    row["score_home"] = (event.get("homeScore", {}) or {}).get("current", 0)
+    row["score_away"] = (event.get("awayScore", {}) or {}).get("current", 0)
+    row["pts_home"] = (standings.get("home") or {}).get("points", 0)
+    row["pts_away"] = (standings.get("away") or {}).get("points", 0)
+
+    signals = streak_signals(
+        (streaks.get("general", []) or []) + (streaks.get("head2head", []) or [])
+    )
+    for name, values in zip(("over", "under", "home", "away"), signals):
+        row[f"{name}_sum"] = sum(values)
+        row[f"{name}_count"] = len(values)
+    return row
+
+
 def generate_auto_prediction(event, stats, streaks, standings):
     home = event["homeTeam"]["name"]
     away = event["awayTeam"]["name"]
@@ -82,31 +149,9 @@ def generate_auto_prediction(event, stats, streaks, standings):
     else:
         phase = "late"
 
-    under_signals, over_signals = [], []
-    home_signals, away_signals = [], []
-
-    def is_goal_streak(name):
-        name = name.lower()
-        return ("goal" in name) or ("gols" in name) or ("goals" in name)
-
-    for item in streaks_gen + streaks_h2h:
-        ratio = item.get("ratio")
-        if ratio is None:
-            continue
-
-        name = (item.get("name") or "").lower()
-        team = item.get("team")
-
-        if is_goal_streak(name):
-            if "more than" in name or "mais de" in name:
-                over_signals.append(prob_from_ratio(ratio))
-            if "less than" in name or "menos de" in name:
-                under_signals.append(prob_from_ratio(ratio))
-
-        if team == "home" and ratio >= 0.60:
-            home_signals.append(prob_from_ratio(ratio))
-        if team == "away" and ratio >= 0.60:
-            away_signals.append(prob_from_ratio(ratio))
+    over_signals, under_signals, home_signals, away_signals = streak_signals(
+        streaks_gen + streaks_h2h
+    )
 
     pts_home = home_st.get("points", 0)
     pts_away = away_st.get("points", 0)
@@ -266,6 +311,8 @@ class MatchOddsFeaturedView(APIView):
         url = f"https://www.sofascore.com/api/v1/event/{external_id}/odds/100/featured"
         local_headers = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
 
+        import requests
+
         try:
             resp = requests.get(url, headers=local_headers, timeout=6)
             resp.raise_for_status()
@@ -396,6 +443,8 @@ class MatchOddsAllView(APIView):
         url = f"https://www.sofascore.com/api/v1/event/{match.external_id}/odds/1/all"
         local_headers = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
 
+        import requests
+
         try:
             resp = requests.get(url, headers=local_headers, timeout=8)
             resp.raise_for_status()
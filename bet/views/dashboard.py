@@ -5,8 +5,8 @@ from django.shortcuts import render
 from django.utils import timezone
 
 from bet.models import Bankroll, Bet
-from get_events import SofaScore
 from jogos.models import RunningToday
+from jogos.tasks import queue_ingest
 
 
 def dashboard(request):
@@ -14,11 +14,11 @@ def dashboard(request):
 
     today = date.today().isoformat()
     if not RunningToday.objects.filter(data=today, rodou=True).exists():
+        # a busca do dia roda no worker da fila ingest (ingest_events)
         try:
-            SofaScore([today]).get_events()
-            RunningToday.objects.update_or_create(data=today, defaults={"rodou": True})
+            queue_ingest([today])
         except Exception as exc:
-            print(f"Erro ao rodar scraper: {exc}")
+            print(f"Erro ao enfileirar scraper: {exc}")
 
     bankroll, _ = Bankroll.objects.get_or_create(name="Banca Principal")
 
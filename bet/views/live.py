@@ -0,0 +1,141 @@
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from jogos.live_analysis import latest_analysis
+from jogos.live_feed import subscribe
+from jogos.live_window import get_window, snapshot_payload
+from jogos.locks import skipped_count
+from jogos.models import LiveAnalysis, Match, snapshot_model_for
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _current_state(match):
+    window = get_window(match)
+    analysis = latest_analysis(match)
+    return (
+        window.as_dict() if len(window) else None,
+        analysis.payload() if analysis else None,
+    )
+
+
+async def _event_stream(match_id, snapshot=None, analysis=None):
+    # estado atual primeiro, depois só o que o poller publicar
+    if snapshot:
+        yield _sse("snapshot", snapshot)
+    if analysis:
+        yield _sse("analysis", analysis)
+
+    # conexão com prazo: sob WSGI o stream segura uma thread; o navegador
+    # reconecta e recebe o estado atual de novo
+    deadline = time.monotonic() + settings.LIVE_FEED_STREAM_SECONDS
+    async for message in subscribe(match_id):
+        if message is None:
+            yield ": keep-alive\n\n"
+        else:
+            yield _sse(message["event"], message["data"])
+        if time.monotonic() >= deadline:
+            return
+
+
+async def match_stream(request, match_id):
+    """
+    Server-Sent Events da partida: snapshots novos e análises ao vivo.
+
+    Não chama o SofaScore; quem busca os dados é o poller em background, então
+    o número de páginas abertas não muda o número de requisições externas.
+    Feito para ASGI (core/asgi.py); sob WSGI cada conexão ocupa uma thread por
+    até LIVE_FEED_STREAM_SECONDS.
+    """
+    match = await Match.objects.filter(pk=match_id).afirst()
+    if match is None:
+        raise Http404("Partida não encontrada")
+
+    snapshot, analysis = await sync_to_async(_current_state)(match)
+
+    response = StreamingHttpResponse(
+        _event_stream(match.pk, snapshot, analysis),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def live_monitor_rows():
+    """
+    Último snapshot + análise de todas as partidas de hoje ainda não finalizadas.
+
+    Número constante de queries: as partidas (com os times), um
+    latest_by_match por esporte e a última análise ao vivo de cada partida,
+    independente de quantos jogos estão ao vivo.
+    """
+    matches = list(
+        Match.objects.filter(date__date=timezone.now().date(), finalizado=False)
+        .select_related("home_team", "away_team")
+        .only(
+            "sport",
+            "date",
+            "status",
+            "current_minute",
+            "home_team_score",
+            "away_team_score",
+            "home_team__name",
+            "away_team__name",
+        )
+        .order_by("date")
+    )
+
+    latest = {}
+    for sport in {match.sport for match in matches}:
+        model = snapshot_model_for(sport)
+        latest.update(
+            model.objects.latest_by_match(
+                [match.pk for match in matches if match.sport == sport]
+            )
+        )
+
+    analyses = LiveAnalysis.objects.latest_by_match([match.pk for match in matches])
+
+    rows = []
+    for match in matches:
+        snapshot = latest.get(match.pk)
+        analysis = analyses.get(match.pk)
+        analise = analysis.payload() if analysis else {}
+        rows.append(
+            {
+                "id": match.pk,
+                "sport": match.sport,
+                "home_team": match.home_team.name,
+                "away_team": match.away_team.name,
+                "date": match.date,
+                "status": match.status,
+                "minute": match.current_minute,
+                "home_score": match.home_team_score,
+                "away_score": match.away_team_score,
+                "momentum": snapshot.momentum_score if snapshot else None,
+                "pressure_home": bool(analise.get("pressure_home")),
+                "pressure_away": bool(analise.get("pressure_away")),
+                "snapshot": snapshot_payload(snapshot) if snapshot else None,
+                "analise": analise,
+            }
+        )
+    return rows
+
+
+def live_monitor_api(request):
+    return JsonResponse(
+        {"matches": live_monitor_rows(), "skipped_polls": skipped_count()}
+    )
+
+
+def live_monitor(request):
+    return render(request, "betting/live_monitor.html", {"rows": live_monitor_rows()})
@@ -1,21 +1,26 @@
+import hashlib
 import json
 import re
 from dataclasses import dataclass
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q
-from django.forms import model_to_dict
+from django.db.models import Count, Max, Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from django.utils.timezone import now
+from django.views.decorators.http import condition
 
 from bet.models import PossibleBet
-from bet.teams.analytics import match_preview, team_profile
+from bet.teams.analytics import match_preview, team_form_profile
 from bet.teams.bet_preview import bet_recommendations
 from bet.utils import MatchAnalyzer
-from get_events import SofaScore
+from jogos.live_analysis import latest_analysis
+from jogos.live_window import snapshot_payload
 from jogos.models import League, LiveSnapshot, Match, MatchStats
+from jogos.tasks import process_match_snapshot
 from jogos.utils import analyze_match
 
 
@@ -461,6 +466,8 @@ def match_detail(request, pk):
     stats, summary = _parse_match_summary(match)
     streak_analysis = analyzer.analyze_streaks(summary.get("streaks", {}))
 
+    from get_events import SofaScore
+
     sofascore = SofaScore()
     base_analysis = _apply_streak_impact(
         sofascore.get_analise_event(match), streak_analysis
@@ -488,21 +495,9 @@ def match_detail(request, pk):
 
     RECENT_GAMES = 3
 
-    # últimos jogos do mandante EM CASA
-    home_matches = Match.objects.filter(
-        Q(home_team=match.home_team) | Q(away_team=match.home_team),
-        finalizado=True,
-        date__lt=match.date,
-    ).order_by("-date")[:RECENT_GAMES]
-
-    away_matches = Match.objects.filter(
-        Q(home_team=match.away_team) | Q(away_team=match.away_team),
-        finalizado=True,
-        date__lt=match.date,
-    ).order_by("-date")[:RECENT_GAMES]
-
-    home_profile = team_profile(match.home_team, home_matches)
-    away_profile = team_profile(match.away_team, away_matches)
+    # forma dos últimos jogos finalizados de cada time (TeamForm)
+    home_profile = team_form_profile(match.home_team, RECENT_GAMES, match.date)
+    away_profile = team_form_profile(match.away_team, RECENT_GAMES, match.date)
 
     preview = match_preview(home_profile, away_profile)
 
@@ -542,6 +537,8 @@ def post_status(request):
                 )
 
             if match.sport == "basketball":
+                from get_events import SofaScore
+
                 data = SofaScore().player_stats(match)
                 return JsonResponse(
                     {
@@ -552,48 +549,168 @@ def post_status(request):
                     safe=False,
                 )
 
-            snapshot = SofaScore().get_stats(event_id)
-
-            if snapshot is None:
-                return JsonResponse({"error": "No snapshot created"}, status=400)
+            # leitura apenas: quem busca no SofaScore é o process_match_snapshot
+            snapshot = (
+                match.snapshot_model.objects.filter(match=match)
+                .order_by("-minute", "-id")
+                .first()
+            )
+            freshness = settings.LIVE_FRESHNESS_SECONDS
+            # updated_at muda a cada upsert no bucket; last_seen_at, nos polls
+            # sem mudança nas estatísticas
+            updated_at = snapshot and max(
+                filter(None, [snapshot.updated_at, snapshot.last_seen_at])
+            )
+            stale = (
+                updated_at is None
+                or (timezone.now() - updated_at).total_seconds() > freshness
+            )
 
-            analysis_live = SofaScore().analyze_last_snapshots(match, window=10)
+            refresh_queued = False
+            # uma atualização por janela, não importa quantas abas peçam
+            if stale and cache.add(f"live-refresh:{match.pk}", 1, freshness):
+                process_match_snapshot.delay(match.pk)
+                refresh_queued = True
 
-            data = model_to_dict(snapshot)
-            data["analysis_live"] = analysis_live
+            data = snapshot_payload(snapshot) if snapshot else {"match": match.pk}
+            analysis = latest_analysis(match)
+            data["analysis_live"] = analysis.payload() if analysis else {}
+            data["updated_at"] = updated_at
+            data["stale"] = stale
+            data["refresh_queued"] = refresh_queued
 
             return JsonResponse(data)
     except Exception as exc:
         print(exc.__traceback__.tb_lineno)
 
 
+DEFAULT_SNAPSHOT_FIELDS = [
+    "id",
+    "minute",
+    "xg_home",
+    "xg_away",
+    "shots_total_home",
+    "shots_total_away",
+    "shots_on_home",
+    "shots_on_away",
+    "possession_home",
+    "possession_away",
+    "corners_home",
+    "corners_away",
+    "touches_box_home",
+    "touches_box_away",
+    "final_third_entries_home",
+    "final_third_entries_away",
+    "momentum_score",
+    "xg_rate_home",
+    "xg_rate_away",
+    "shots_rate_home",
+    "shots_rate_away",
+    "pressure_home",
+    "pressure_away",
+]
+
+
+def _snapshot_params(request):
+    """Lê since_minute/since_id/fields/format; ValueError se algo for inválido."""
+    from jogos.series import DERIVED_FIELDS, SERIES_FIELDS
+
+    since_minute = request.GET.get("since_minute")
+    since_id = request.GET.get("since_id")
+    fields = request.GET.get("fields")
+
+    fields = fields.split(",") if fields else list(DEFAULT_SNAPSHOT_FIELDS)
+    unknown = set(fields) - set(SERIES_FIELDS) - DERIVED_FIELDS
+    if unknown:
+        raise ValueError(f"Campos inválidos: {', '.join(sorted(unknown))}")
+
+    return {
+        "since_minute": int(since_minute) if since_minute else None,
+        "since_id": int(since_id) if since_id else None,
+        "fields": fields,
+        "columnar": request.GET.get("format") == "columns",
+    }
+
+
+def _snapshots_etag(request, match_id):
+    try:
+        params = _snapshot_params(request)
+    except ValueError:
+        return None
+
+    qs = LiveSnapshot.objects.filter(match_id=match_id)
+    if params["since_minute"] is not None:
+        qs = qs.filter(minute__gte=params["since_minute"])
+    if params["since_id"] is not None:
+        qs = qs.filter(id__gte=params["since_id"])
+    state = qs.aggregate(
+        last_id=Max("id"), total=Count("id"), updated=Max("updated_at")
+    )
+    # o upsert do bucket atual mantém id e contagem: updated_at muda a ETag
+    updated = state["updated"].timestamp() if state["updated"] else 0
+
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()[:12]
+    return f"{match_id}-{state['last_id']}-{state['total']}-{updated}-{query}"
+
+
+@condition(etag_func=_snapshots_etag)
 def match_snapshots(request, match_id):
-    snaps = LiveSnapshot.objects.filter(match_id=match_id).order_by("minute")
+    """
+    Série de snapshots da partida para os gráficos.
+
+    - `since_minute` / `since_id`: só os pontos a partir do minuto/id (usar o
+      `last_id` da resposta anterior; o último bucket volta junto, porque é
+      atualizado no lugar enquanto o minuto não fecha);
+    - `fields=minute,xg_home,...`: seleciona colunas;
+    - `format=columns`: um array por campo em vez de uma lista de dicts.
+    Responde 304 quando nada mudou (ETag).
+    """
+    import numpy as np
 
-    data = []
-    for snapshot in snaps:
-        data.append(
-            {
-                "minute": snapshot.minute,
-                "xg_home": snapshot.xg_home,
-                "xg_away": snapshot.xg_away,
-                "shots_total_home": snapshot.shots_total_home,
-                "shots_total_away": snapshot.shots_total_away,
-                "shots_on_home": snapshot.shots_on_home,
-                "shots_on_away": snapshot.shots_on_away,
-                "possession_home": snapshot.possession_home,
-                "possession_away": snapshot.possession_away,
-                "corners_home": snapshot.corners_home,
-                "corners_away": snapshot.corners_away,
-                "touches_box_home": snapshot.touches_box_home,
-                "touches_box_away": snapshot.touches_box_away,
-                "final_third_entries_home": snapshot.final_third_entries_home,
-                "final_third_entries_away": snapshot.final_third_entries_away,
-                "momentum_score": snapshot.momentum_score,
-            }
+    from jogos.series import DERIVED_FIELDS, ROLLING_MINUTES, MatchSeries
+
+    match = get_object_or_404(Match, pk=match_id)
+    try:
+        params = _snapshot_params(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    since_minute = params["since_minute"]
+    since_id = params["since_id"]
+    fields = params["fields"]
+
+    if DERIVED_FIELDS.intersection(fields):
+        # taxas móveis precisam do histórico anterior ao corte
+        lookback = None
+        if since_minute is not None and since_id is None:
+            lookback = max(since_minute - ROLLING_MINUTES, 0)
+        series = MatchSeries.load(match, since_minute=lookback)
+        mask = np.ones(len(series), dtype=bool)
+        if since_minute is not None:
+            mask &= series["minute"] >= since_minute
+        if since_id is not None:
+            mask &= series["id"] >= since_id
+    else:
+        series = MatchSeries.load(match, since_minute=since_minute, since_id=since_id)
+        mask = None
+
+    columns = {
+        field: (
+            series.derived(field, mask)
+            if field in DERIVED_FIELDS
+            else series.tolist(field, mask)
         )
+        for field in fields
+    }
+
+    ids = series.tolist("id", mask)
+    last_id = ids[-1] if ids else since_id
+
+    if params["columnar"]:
+        return JsonResponse({"columns": columns, "last_id": last_id})
 
-    return JsonResponse({"snapshots": data})
+    data = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    return JsonResponse({"snapshots": data, "last_id": last_id})
 
 
 def result(request):
@@ -3,6 +3,16 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Deploy the site with an ASGI server (uvicorn is in requirements.txt):
+
+    uvicorn core.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+The live feed (``/matches/<id>/stream/``) is an async SSE response; under
+ASGI each open page is a coroutine on the event loop instead of a worker
+thread. Under WSGI (core/wsgi.py) Django consumes the stream synchronously,
+holding a thread for up to LIVE_FEED_STREAM_SECONDS before the browser
+reconnects.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
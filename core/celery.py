@@ -23,8 +23,17 @@ def debug_task(self):
 
 
 app.conf.beat_schedule = {
-    "monitor-matches-every-5-minutes": {
-        "task": "jogos.tasks.dispatch_todays_matches",
-        "schedule": 30.0,  # Executa a cada 300 segundos (5 minutos)
+    # despacha só as partidas com next_poll_at vencido (jogos/scheduling.py)
+    "dispatch-due-matches-every-10-seconds": {
+        "task": "jogos.tasks.dispatch_due_matches",
+        "schedule": 10.0,
+    },
+    "finalize-stale-matches-every-5-minutes": {
+        "task": "jogos.tasks.finalize_stale_matches",
+        "schedule": 300.0,
+    },
+    "compact-finished-snapshots-hourly": {
+        "task": "jogos.tasks.compact_finished_snapshots",
+        "schedule": 3600.0,
     },
 }
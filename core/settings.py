@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -111,6 +112,13 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    }
+}
+
 CELERY_BROKER_URL = "redis://127.0.0.1:6379/0"
 CELERY_RESULT_BACKEND = "redis://127.0.0.1:6379/0"
 
@@ -118,3 +126,106 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "America/Sao_Paulo"
+
+# Filas por tipo de carga, cada uma com seu worker (comandos no DEVELOPMENT.md):
+# - live: coleta ao vivo, sensível a latência;
+# - ingest: busca diária/backfill de eventos e manutenção dos snapshots;
+# - analysis: rodadas de modelos e avaliações;
+# - notify: envio para o Telegram.
+# Assim um backfill de um mês não atrasa o polling ao vivo.
+CELERY_TASK_DEFAULT_QUEUE = "analysis"
+CELERY_TASK_ROUTES = {
+    "jogos.tasks.dispatch_due_matches": {"queue": "live", "priority": 0},
+    "jogos.tasks.poll_live_board": {"queue": "live", "priority": 0},
+    "jogos.tasks.process_match_batch": {"queue": "live", "priority": 3},
+    "jogos.tasks.process_match_snapshot": {"queue": "live", "priority": 3},
+    "jogos.tasks.refresh_match_states": {"queue": "live", "priority": 6},
+    "jogos.tasks.loadtest_probe": {"queue": "live", "priority": 3},
+    "jogos.tasks.ingest_events": {"queue": "ingest"},
+    "jogos.tasks.compact_finished_snapshots": {"queue": "ingest"},
+    "jogos.tasks.finalize_stale_matches": {"queue": "ingest"},
+    "jogos.tasks.refresh_team_forms": {"queue": "ingest"},
+    "jogos.tasks.loadtest_backfill": {"queue": "ingest"},
+    "jogos.tasks.evaluate_matches": {"queue": "analysis"},
+    "jogos.tasks.send_telegram": {"queue": "notify"},
+}
+# Prioridade dentro da fila: no Redis 0 é a mais alta (vai até 9).
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+# cada worker reserva só a próxima task: uma task longa não segura outras na
+# memória do processo (o -c de cada fila define a concorrência)
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Bot do Telegram (fila notify); sem token/chat_id as mensagens não são enviadas.
+TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "")
+
+# Retenção de LiveSnapshot: depois de finalizado o jogo fica 1 snapshot por bucket
+# no banco e a série completa vai para um Parquet em SNAPSHOT_ARCHIVE_DIR.
+SNAPSHOT_ARCHIVE_DIR = BASE_DIR / "archive" / "snapshots"
+SNAPSHOT_DOWNSAMPLE_MINUTES = 5
+
+# Ao vivo fica um snapshot por partida a cada SNAPSHOT_BUCKET_MINUTES minutos
+# de jogo (upsert em match+minute).
+SNAPSHOT_BUCKET_MINUTES = 1
+
+# Quantas partidas o SnapshotWriter acumula antes de gravar em lote.
+SNAPSHOT_FLUSH_SIZE = 50
+
+# Janela deslizante dos analisadores ao vivo (jogos.live_window).
+LIVE_WINDOW_MINUTES = 15
+LIVE_WINDOW_TTL = 6 * 60 * 60
+# Lease (segundos) da atualização de uma janela e quanto um worker espera por ele.
+LIVE_WINDOW_LOCK_TTL = 10
+LIVE_WINDOW_LOCK_WAIT = 2
+
+# post_status devolve o último snapshot se ele tiver até esta idade (segundos);
+# mais velho que isso, agenda um process_match_snapshot e marca como stale.
+LIVE_FRESHNESS_SECONDS = 60
+
+# Feed ao vivo (SSE): "redis" entre processos ou "local" no mesmo processo.
+LIVE_FEED_BACKEND = "redis"
+LIVE_FEED_REDIS_URL = "redis://127.0.0.1:6379/2"
+LIVE_FEED_KEEPALIVE = 15
+# Duração máxima (segundos) de uma conexão SSE; o EventSource reconecta sozinho.
+LIVE_FEED_STREAM_SECONDS = 5 * 60
+
+# Intervalo de coleta (segundos) por fase do jogo (jogos/scheduling.py). A fase
+# "kickoff" começa POLL_KICKOFF_MINUTES antes do horário marcado.
+POLL_INTERVALS = {
+    "pre_match": 60 * 60,
+    "kickoff": 3 * 60,
+    "live": 25,
+    "halftime": 2 * 60,
+}
+POLL_KICKOFF_MINUTES = 15
+
+# Coleta ao vivo em lote: até LIVE_BATCH_SIZE partidas por task, com até
+# SOFASCORE_MAX_WORKERS requisições simultâneas na mesma sessão HTTP.
+LIVE_BATCH_SIZE = 10
+SOFASCORE_MAX_WORKERS = 8
+
+# Lease (segundos) de uma coleta em curso por partida (jogos.locks); passa do
+# tempo máximo esperado de uma task para só expirar se o worker morrer.
+POLL_LOCK_TTL = 2 * 60
+# Lease de uma busca de eventos (ingest_events) por data, enfileirada ou rodando.
+INGEST_LOCK_TTL = 60 * 60
+
+# Finalização em lote (jogos.finalize): partida aberta que começou há mais de
+# MATCH_STALE_HOURS horas é finalizada; duplicadas são procuradas entre as
+# partidas dos últimos MATCH_DUPLICATE_DAYS dias.
+MATCH_STALE_HOURS = 3
+MATCH_DUPLICATE_DAYS = 1
+
+# Janelas (últimos N jogos finalizados) guardadas em TeamForm (jogos.team_form).
+TEAM_FORM_WINDOWS = (3, 5, 10)
+# Times por task de recálculo da forma depois de uma finalização em lote.
+TEAM_FORM_BATCH_SIZE = 50
+
+# Análise do time (bet.teams.analysis_cache) fica no cache até uma partida do
+# time ser salva; o TTL só cobre gravações em lote, que não disparam signals.
+TEAM_ANALYSIS_TTL = 6 * 60 * 60
@@ -1,17 +1,37 @@
 import json
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 
-import requests
+from django.conf import settings
 from django.db.models import Avg, F
 from django.utils import timezone
 
 from bet.models import PossibleBet
-from jogos.models import League, LiveSnapshot, Match, MatchStats, Season, Team
+from jogos.live_window import get_window
+from jogos.models import (
+    League,
+    LiveSnapshot,
+    Match,
+    MatchStats,
+    Season,
+    Team,
+    snapshot_bucket,
+    snapshot_model_for,
+)
+from jogos.scheduling import LIVE_STATUSES, next_poll_at
+from jogos.snapshots import SnapshotWriter
+from jogos.stat_index import stat_index, stat_pair
+from jogos.team_form import update_finalized_forms
 from jogos.utils import save_sofascore_data
 
 BASE = "https://www.sofascore.com/api/v1"
+LIVE_STATE_FIELDS = ["status", "home_team_score", "away_team_score", "current_minute"]
+# status.code do SofaScore para o intervalo
+HALFTIME_STATUS_CODE = 31
 headers = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
 allowed_leagues = {
     "premier-league",
@@ -45,10 +65,32 @@ allowed_countries = {
 class SofaScore:
     def __init__(self, date: list = None):
         self.date = date
-        self.session = requests.Session()
+        self._session = None
+        self._session_lock = threading.Lock()
         self._captcha_token = None
         self._captcha_expire_ts = 0
 
+    @property
+    def session(self):
+        """
+        Sessão HTTP do cliente, criada no primeiro uso (requests só é importado
+        por quem de fato busca no SofaScore). As conexões são reaproveitadas
+        entre as requisições, inclusive as concorrentes de fetch_many; o lock
+        garante uma única sessão mesmo no primeiro acesso concorrente.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_maxsize=settings.SOFASCORE_MAX_WORKERS
+                    )
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
     def _extract_js_files(self, html):
         """
         Extrai qualquer script JS da página, considerando vários formatos:
@@ -140,14 +182,10 @@ class SofaScore:
         if not ALL:
             return []
 
-        def get(key, default=(0, 0)):
-            for g in ALL.get("groups", []):
-                for it in g.get("statisticsItems", []):
-                    if it.get("key") == key:
-                        return float(it.get("homeValue", 0)), float(
-                            it.get("awayValue", 0)
-                        )
-            return default
+        index = stat_index(stats)
+
+        def get(key):
+            return stat_pair(index, key)
 
         insights = []
 
@@ -254,16 +292,7 @@ class SofaScore:
                 event = event.get("event")
 
             def extract_stat(stats, key):
-                for period in stats.get("statistics", []):
-                    if period.get("period") != "ALL":
-                        continue
-                    for group in period.get("groups", []):
-                        for item in group.get("statisticsItems", []):
-                            if item.get("key") == key:
-                                return float(item.get("homeValue", 0)), float(
-                                    item.get("awayValue", 0)
-                                )
-                return 0.0, 0.0
+                return stat_pair(stats, key)
 
             home = match.home_team.name
             away = match.away_team.name
@@ -328,10 +357,11 @@ class SofaScore:
                 }
 
             # estatísticas
-            xg_home, xg_away = extract_stat(stats, "expectedGoals")
-            shots_home, shots_away = extract_stat(stats, "totalShots")
-            shots_on_home, shots_on_away = extract_stat(stats, "shotsOnGoal")
-            possession_home, possession_away = extract_stat(stats, "ballPossession")
+            index = stat_index(stats)
+            xg_home, xg_away = extract_stat(index, "expectedGoals")
+            shots_home, shots_away = extract_stat(index, "totalShots")
+            shots_on_home, shots_on_away = extract_stat(index, "shotsOnGoal")
+            possession_home, possession_away = extract_stat(index, "ballPossession")
 
             insights = []
 
@@ -411,12 +441,24 @@ class SofaScore:
         }
 
         try:
-            r = requests.get(url, cookies=cookies, headers=headers)
+            r = self.session.get(url, cookies=cookies, headers=headers)
             r.raise_for_status()
             return r.json()
         except:
             return {}
 
+    def fetch_many(self, urls):
+        """GETs concorrentes na sessão do cliente; retorna {url: json}."""
+        urls = list(dict.fromkeys(urls))
+        if len(urls) <= 1:
+            return {url: self.get_json(url) for url in urls}
+
+        workers = min(len(urls), settings.SOFASCORE_MAX_WORKERS)
+        # cria a sessão antes de distribuir as requisições entre as threads
+        self.session
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(urls, pool.map(self.get_json, urls)))
+
     @staticmethod
     def analyze_streaks(streaks):
 
@@ -505,7 +547,7 @@ class SofaScore:
     @staticmethod
     def parse_sofascore_stats(raw, sport="football"):
         """
-        Converte o JSON de estatísticas do SofaScore no formato usado pelo LiveSnapshot.
+        Converte o JSON de estatísticas do SofaScore no formato do snapshot do esporte.
         Usa os dados do período 'ALL'.
         """
 
@@ -523,17 +565,11 @@ class SofaScore:
 
             if not period_all:
                 raise ValueError("Período ALL não encontrado")
-            groups = period_all.get("groups", [])
+
+            index = stat_index(raw)
 
             def get(key, default=0):
-                for group in groups:
-                    for item in group.get("statisticsItems", []):
-                        if item.get("key") == key:
-                            return (
-                                float(item.get("homeValue", default)),
-                                float(item.get("awayValue", default)),
-                            )
-                return default, default
+                return stat_pair(index, key, default=default)
 
             # -------- SCORING --------
             ft_h, ft_a = get("freeThrowsScored")
@@ -605,20 +641,11 @@ class SofaScore:
         if not period_all:
             raise ValueError("Período 'ALL' não encontrado no JSON.")
 
-        groups = period_all.get("groups", [])
-
         # Helper para pegar estatística pelo key do SofaScore
+        index = stat_index(raw)
+
         def get_stat(key, default=0):
-            for group in groups:
-                for item in group.get("statisticsItems", []):
-                    if item.get("key") == key:
-                        try:
-                            return float(item.get("homeValue", default)), float(
-                                item.get("awayValue", default)
-                            )
-                        except Exception:
-                            return default, default
-            return default, default
+            return stat_pair(index, key, default=default)
 
         # ====== OFENSIVO PRINCIPAL ======
         xg_home, xg_away = get_stat("expectedGoals")
@@ -784,18 +811,7 @@ class SofaScore:
         Procura uma estatística pelo campo 'key' no JSON do SofaScore (statistics endpoint).
         Ex: key='expectedGoals', 'attacks', 'dangerousAttacks', etc.
         """
-        try:
-            for block in stats_json.get("statistics", []):
-                for group in block.get("groups", []):
-                    for item in group.get("statisticsItems", []):
-                        if item.get("key") == key:
-                            # muitos vêm como homeValue/awayValue
-                            return float(item.get("homeValue", 0.0)), float(
-                                item.get("awayValue", 0.0)
-                            )
-        except Exception:
-            pass
-        return default, default
+        return stat_pair(stats_json, key, default=default)
 
     @staticmethod
     def get_team_standing(standings, team_id):
@@ -822,10 +838,10 @@ class SofaScore:
             return None
 
     def analyze_last_snapshots(self, match, window=10):
-        qs = LiveSnapshot.objects.filter(match=match).order_by("-minute")[:window]
-        snaps = list(reversed(qs))  # agora em ordem cronológica
+        """Calcula a análise da janela ao vivo (quem grava é record_live_analysis)."""
+        live_window = get_window(match)
 
-        if len(snaps) < 2:
+        if len(live_window) < 2:
             return {
                 "pressure_home": False,
                 "pressure_away": False,
@@ -837,23 +853,22 @@ class SofaScore:
                 "pressure_reason_away": "",
             }
 
+        start = live_window.first(window)
+        end = live_window.last
+        # MOMENTUM MÉDIO
+        avg_momentum = live_window.avg_momentum(window)
+
         if match.sport == "basketball":
-            start = snaps[0]
-            end = snaps[-1]
 
             # variação de pontos
-            delta_home = end.home_score - start.home_score
-            delta_away = end.away_score - start.away_score
+            delta_home = end.points_home - start.points_home
+            delta_away = end.points_away - start.points_away
             delta_total = delta_home + delta_away
 
             # ritmo por minuto
             minutes = max(1, end.minute - start.minute)
             pace = delta_total / minutes
 
-            avg_momentum = sum(
-                s.momentum_score for s in snaps if s.momentum_score is not None
-            ) / max(1, len(snaps))
-
             pressure_home = delta_home >= 6
             pressure_away = delta_away >= 6
 
@@ -864,12 +879,12 @@ class SofaScore:
                 "pressure_home": pressure_home,
                 "pressure_away": pressure_away,
                 "pressure_reason_home": (
-                    f"{match.home_team} anotou {delta_home} pts nos últimos {window} snapshots."
+                    f"{match.home_team} anotou {delta_home} pts nos últimos {window} minutos."
                     if pressure_home
                     else ""
                 ),
                 "pressure_reason_away": (
-                    f"{match.away_team} anotou {delta_away} pts nos últimos {window} snapshots."
+                    f"{match.away_team} anotou {delta_away} pts nos últimos {window} minutos."
                     if pressure_away
                     else ""
                 ),
@@ -885,79 +900,52 @@ class SofaScore:
                 ),
             }
 
-            match.analise = analysis
-            match.save(update_fields=["analise"])
             return analysis
 
-        # DIFERENÇAS ENTRE PRIMEIRO E ÚLTIMO SNAP
-        print(snaps[-1].xg_home - snaps[0].xg_home)
-        delta_xg_home = snaps[-1].xg_home - snaps[0].xg_home
-        delta_xg_away = snaps[-1].xg_away - snaps[0].xg_away
+        # série da janela ao vivo (já em memória); numpy só carrega aqui
+        from jogos.series import MatchSeries
 
-        delta_shots_on_home = snaps[-1].shots_on_home - snaps[0].shots_on_home
-        delta_shots_on_away = snaps[-1].shots_on_away - snaps[0].shots_on_away
+        series = MatchSeries.from_window(live_window)
 
-        delta_corners_home = snaps[-1].corners_home - snaps[0].corners_home
-        delta_corners_away = snaps[-1].corners_away - snaps[0].corners_away
+        # DIFERENÇAS ENTRE PRIMEIRO E ÚLTIMO SNAP
+        delta_xg_home = float(series.rolling_delta("xg_home", window)[-1])
+        delta_xg_away = float(series.rolling_delta("xg_away", window)[-1])
 
-        # MOMENTUM MÉDIO
-        avg_momentum = sum(s.momentum_score for s in snaps) / len(snaps)
+        delta_shots_on_home = int(series.rolling_delta("shots_on_home", window)[-1])
+        delta_shots_on_away = int(series.rolling_delta("shots_on_away", window)[-1])
 
-        # Regras (pode ajustar depois)
-        pressure_home = delta_xg_home >= 0.20 or delta_shots_on_home >= 2
-        pressure_away = delta_xg_away >= 0.20 or delta_shots_on_away >= 2
+        delta_corners_home = int(series.rolling_delta("corners_home", window)[-1])
+        delta_corners_away = int(series.rolling_delta("corners_away", window)[-1])
+
+        # Regras (pode ajustar depois) — as mesmas de MatchSeries.pressure
+        pressure_home = bool(series.pressure("home", window)[-1])
+        pressure_away = bool(series.pressure("away", window)[-1])
 
         corners_spike = (delta_corners_home + delta_corners_away) >= 3
 
         goal_incoming = pressure_home or pressure_away or avg_momentum >= 0.70
-        match.analise = {
-            "pressure_home": pressure_home,
-            "pressure_away": pressure_away,
-            "pressure_reason_home": (
-                f"Home criou {delta_xg_home:.2f} xG e {delta_shots_on_home} finalizações no gol nos últimos {window} snapshots."
-                if pressure_home
-                else ""
-            ),
-            "pressure_reason_away": (
-                f"Away criou {delta_xg_away:.2f} xG e {delta_shots_on_away} finalizações no gol nos últimos {window} snapshots."
-                if pressure_away
-                else ""
-            ),
-            "corners_signal": (
-                f"{delta_corners_home + delta_corners_away} cantos nos últimos {window} snapshots."
-                if corners_spike
-                else ""
-            ),
-            # As chaves abaixo já usam ternário corretamente para definir o VALOR:
-            "goal_warning": (
-                "ALTO risco de gol nos próximos minutos"
-                if goal_incoming
-                else "Jogo moderado"
-            ),
-            "over_15_signal": goal_incoming or corners_spike,
-            "over_25_trend": (
-                "Ritmo crescendo"
-                if (delta_xg_home + delta_xg_away) >= 0.30
-                else "Normal"
-            ),
-        }
-        match.save(update_fields=["analise"])
-
         return {
             "pressure_home": pressure_home,
             "pressure_away": pressure_away,
+            # trechos [minuto inicial, final] de pressão dentro da janela ao vivo
+            "pressure_windows_home": [
+                list(span) for span in series.pressure_windows("home", window)
+            ],
+            "pressure_windows_away": [
+                list(span) for span in series.pressure_windows("away", window)
+            ],
             "pressure_reason_home": (
-                f"Home criou {delta_xg_home:.2f} xG e {delta_shots_on_home} finalizações no gol nos últimos {window} snapshots."
+                f"Home criou {delta_xg_home:.2f} xG e {delta_shots_on_home} finalizações no gol nos últimos {window} minutos."
                 if pressure_home
                 else ""
             ),
             "pressure_reason_away": (
-                f"Away criou {delta_xg_away:.2f} xG e {delta_shots_on_away} finalizações no gol nos últimos {window} snapshots."
+                f"Away criou {delta_xg_away:.2f} xG e {delta_shots_on_away} finalizações no gol nos últimos {window} minutos."
                 if pressure_away
                 else ""
             ),
             "corners_signal": (
-                f"{delta_corners_home + delta_corners_away} cantos nos últimos {window} snapshots."
+                f"{delta_corners_home + delta_corners_away} cantos nos últimos {window} minutos."
                 if corners_spike
                 else ""
             ),
@@ -1055,7 +1043,7 @@ class SofaScore:
             }
 
             try:
-                r = requests.get(url, cookies=cookies, headers=headers)
+                r = self.session.get(url, cookies=cookies, headers=headers)
                 r.raise_for_status()
                 return r.json()
             except:
@@ -1071,6 +1059,13 @@ class SofaScore:
                 if e["tournament"]["slug"] in allowed_leagues
                 and e["tournament"]["category"]["slug"] in allowed_countries
             ]
+            # só as que viram finalizado agora atualizam a forma dos times
+            already_finished = set(
+                Match.objects.filter(
+                    external_id__in=[e["id"] for e in events], finalizado=True
+                ).values_list("external_id", flat=True)
+            )
+            finished = []
 
             for event in events:
                 league_name = event["tournament"]["name"]
@@ -1126,46 +1121,96 @@ class SofaScore:
                         "stading_json": stadings,
                     },
                 )
+                if match_obj.finalizado and event["id"] not in already_finished:
+                    finished.append(match_obj)
                 self.get_analyze_streaks(event["id"])
 
-    def get_stats(self, event_id=None):
-        if event_id:
+            update_finalized_forms(finished)
+
+    def get_stats(self, event_id=None, events=None, matches=None):
+        """
+        Busca as estatísticas e grava o snapshot das partidas.
+
+        `events` ({match_id: evento da listagem ao vivo}) restringe às partidas
+        informadas e dispensa o GET /event/{id}: só /statistics é buscado.
+        `matches` recebe as partidas já carregadas (sem nova query).
+
+        As requisições de todas as partidas saem juntas (fetch_many) e os
+        snapshots são gravados num único flush.
+        """
+        events = events or {}
+        if matches is not None:
+            matchs = matches
+        elif event_id:
             matchs = Match.objects.filter(id=event_id)
+        elif events:
+            matchs = Match.objects.filter(id__in=list(events))
         else:
             matchs = Match.objects.filter(finalizado=False)
 
+        matchs = list(matchs)
         last_snapshot = None
+        writer = SnapshotWriter()
+        latest = {}
+        for sport in {match.sport for match in matchs}:
+            model = snapshot_model_for(sport)
+            latest.update(
+                model.objects.latest_by_match(
+                    [match.pk for match in matchs if match.sport == sport]
+                )
+            )
+
+        urls = []
+        for match in matchs:
+            urls.append(f"{BASE}/event/{match.external_id}/statistics")
+            if match.pk not in events:
+                urls.append(f"{BASE}/event/{match.external_id}")
+        responses = self.fetch_many(urls)
 
         for match in matchs:
             try:
-                stats_url = f"{BASE}/event/{match.external_id}/statistics"
-                raw = self.get_json(stats_url)
-                event_raw = self.get_json(f"{BASE}/event/{match.external_id}")
-                match.stats_json = raw
-                match.save(update_fields=["stats_json"])
+                raw = responses[f"{BASE}/event/{match.external_id}/statistics"]
+                if match.pk in events:
+                    event_raw = {"event": events[match.pk]}
+                else:
+                    event_raw = responses[f"{BASE}/event/{match.external_id}"]
                 minute = self.calculate_minute(event_raw)
                 stats = self.parse_sofascore_stats(raw, match.sport)
+                snapshot_model = match.snapshot_model
 
-                last_snap = (
-                    LiveSnapshot.objects.filter(match=match).order_by("-minute").first()
-                )
+                if match.sport == "basketball":
+                    event = event_raw.get("event", {})
+                    stats["points_home"] = event.get("homeScore", {}).get("current", 0)
+                    stats["points_away"] = event.get("awayScore", {}).get("current", 0)
+
+                last_snap = latest.get(match.pk)
+
+                if raw != match.stats_json:
+                    match.stats_json = raw
+                    writer.save_stats_json(match)
+
+                # nada mudou desde o último poll: só marca que ainda é atual
+                if last_snap and last_snap.has_same_stats(stats):
+                    writer.touch(last_snap)
+                    last_snapshot = last_snap
+                    continue
 
                 result = self.generate_insights(event_raw, raw, match)
                 result["insights"].extend(self.generate_deep_insights(match, stats))
 
-                snapshot = LiveSnapshot.objects.create(
-                    match=match, minute=minute, **stats
+                snapshot = snapshot_model(
+                    match=match, minute=snapshot_bucket(minute), **stats
                 )
 
-                if last_snap:
+                if last_snap and snapshot_model is LiveSnapshot:
                     snapshot.momentum_score = self.calculate_momentum(
                         snapshot, last_snap
                     )
-                    snapshot.save(update_fields=["momentum_score"])
-                else:
-                    snapshot.momentum_score = 0
-                    snapshot.save(update_fields=["momentum_score"])
+                    # mesmo bucket: o momentum acumula até o bucket fechar
+                    if last_snap.minute == snapshot.minute:
+                        snapshot.momentum_score += last_snap.momentum_score
 
+                writer.add(snapshot)
                 last_snapshot = snapshot
 
             except Exception as e:
@@ -1173,8 +1218,116 @@ class SofaScore:
                     f"Erro processando match {match.id}: {e} {e.__traceback__.tb_lineno}"
                 )
 
+        writer.flush()
+
         return last_snapshot  # <-- RETORNA O SNAPSHOT
 
+    @classmethod
+    def live_state(cls, event):
+        """Status, placar e minuto de um evento da listagem ao vivo."""
+        status = event.get("status", {})
+        return {
+            # intervalo vem como inprogress; separa para a agenda ir mais devagar
+            "status": (
+                "halftime"
+                if status.get("code") == HALFTIME_STATUS_CODE
+                else status.get("type", "")
+            ),
+            "home_team_score": event.get("homeScore", {}).get("current"),
+            "away_team_score": event.get("awayScore", {}).get("current"),
+            "current_minute": cls.calculate_minute({"event": event}),
+        }
+
+    def poll_live_board(self, dispatch=None):
+        """
+        Um tick do placar ao vivo.
+
+        Faz uma chamada de listagem por esporte (/sport/{sport}/events/live),
+        atualiza status/placar/minuto/finalizado de todas as partidas em
+        acompanhamento com um bulk_update e só busca /statistics das partidas
+        cujo estado mudou.
+
+        `dispatch` recebe {match_id: evento} das partidas que mudaram (a task
+        divide em lotes); sem ele as stats são buscadas aqui com get_stats.
+        """
+        tracked = list(Match.objects.filter(finalizado=False, date__lte=timezone.now()))
+        if not tracked:
+            return {"calls": 0, "updated": 0, "changed": 0}
+
+        calls = 0
+        live_events = {}
+        for sport in {match.sport for match in tracked}:
+            board = self.get_json(f"{BASE}/sport/{sport}/events/live")
+            calls += 1
+            for event in board.get("events", []):
+                live_events[event["id"]] = event
+
+        updated = []
+        changed_events = {}
+        for match in tracked:
+            event = live_events.get(match.external_id)
+            if event is None:
+                # saiu da listagem: só confirma se estava em andamento
+                if match.status not in LIVE_STATUSES:
+                    continue
+                event = self.get_json(f"{BASE}/event/{match.external_id}").get("event")
+                calls += 1
+                if not event:
+                    continue
+
+            state = self.live_state(event)
+            if all(getattr(match, key) == value for key, value in state.items()):
+                continue
+
+            for key, value in state.items():
+                setattr(match, key, value)
+            match.finalizado = state["status"] == "finished"
+            match.next_poll_at = next_poll_at(match)
+            updated.append(match)
+
+            if state["status"] == "inprogress":
+                changed_events[match.pk] = event
+
+        Match.objects.bulk_update(
+            updated, [*LIVE_STATE_FIELDS, "finalizado", "next_poll_at"]
+        )
+        update_finalized_forms(updated)
+
+        if changed_events:
+            if dispatch is None:
+                self.get_stats(events=changed_events)
+            else:
+                dispatch(changed_events)
+            calls += len(changed_events)
+
+        return {"calls": calls, "updated": len(updated), "changed": len(changed_events)}
+
+    def refresh_match_states(self, matches):
+        """
+        Atualiza status/placar/horário de partidas fora da listagem ao vivo
+        (pré-jogo e perto do início) com /event/{id} e reagenda cada uma.
+        """
+        updated = []
+        for match in matches:
+            event = self.get_json(f"{BASE}/event/{match.external_id}").get("event")
+            if not event:
+                continue
+
+            for key, value in self.live_state(event).items():
+                setattr(match, key, value)
+            ts = event.get("startTimestamp")
+            if ts:
+                match.date = datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+            match.finalizado = match.status == "finished"
+            match.next_poll_at = next_poll_at(match)
+            updated.append(match)
+
+        Match.objects.bulk_update(
+            updated, [*LIVE_STATE_FIELDS, "date", "finalizado", "next_poll_at"]
+        )
+        update_finalized_forms(updated)
+        return len(updated)
+
     def get_stadings(
         self, season_id=None, tournament_id=None, home_id=None, away_id=None
     ):
@@ -1523,29 +1676,25 @@ class SofaScore:
         Retorna insights sobre gols, escanteios e disciplina.
         """
 
-        snapshots = LiveSnapshot.objects.filter(match=match).order_by("-minute")[
-            :window
-        ]
-        if not snapshots:
+        live_window = get_window(match)
+        if not live_window:
             return {"insights": [], "analysis": {}, "suggestions": []}
 
-        snapshots = list(snapshots)[::-1]  # ordena crescente minuto
-
         insights = []
         suggestions = []
         analysis = {}
 
+        # crescimento recente
+        first = live_window.first(window)
+        last = live_window.last
+
         # ============================
         # MÉDIAS E TOTAIS RECENTES
         # ============================
 
-        total_corners = snapshots[-1].corners_home + snapshots[-1].corners_away
-        total_shots = snapshots[-1].shots_total_home + snapshots[-1].shots_total_away
-        total_yellow = snapshots[-1].yellow_home + snapshots[-1].yellow_away
-
-        # crescimento recente
-        first = snapshots[0]
-        last = snapshots[-1]
+        total_corners = last.corners_home + last.corners_away
+        total_shots = last.shots_total_home + last.shots_total_away
+        total_yellow = last.yellow_home + last.yellow_away
 
         delta_corners = (last.corners_home + last.corners_away) - (
             first.corners_home + first.corners_away
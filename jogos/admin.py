@@ -2,12 +2,8 @@ import math
 import re
 
 from django.contrib import admin, messages
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
 
-from bet.teams.analytics import match_preview, team_profile
-from bet.teams.bet_preview import bet_recommendations
-from bet.utils import evaluate_match_models
+from bet.teams.analytics import team_form_profile
 from jogos.models import League, Match, MatchStats, RunningToday, Season, Team
 
 # Register your models here.
@@ -18,26 +14,11 @@ admin.site.register(MatchStats)
 
 import json
 
-import requests
 from django.contrib import admin
 
-from .models import LiveSnapshot
-
-
-def telegram_send(text: str):
-    url = f"https://api.telegram.org/bot8087550191:AAHAA3C9lXWBGUFJWCR9jqPt1YfimDBX9Xk/sendMessage"
-
-    payload = {
-        "chat_id": "8426590050",
-        "text": text,
-        "parse_mode": "HTML",
-        "disable_web_page_preview": True,
-    }
-
-    try:
-        requests.post(url, json=payload, timeout=5)
-    except Exception as e:
-        print("Erro ao enviar mensagem para Telegram:", e)
+from .models import BasketballSnapshot, LiveAnalysis, LiveSnapshot, SnapshotArchive
+from .stat_index import period_stats
+from .tasks import evaluate_matches, send_telegram
 
 
 def safe_json(value):
@@ -919,16 +900,9 @@ class MatchAdmin(admin.ModelAdmin):
             "away": {},
         }
 
-        for block in data.get("statistics", []):
-            if block.get("period") != "ALL":
-                continue
-
-            for group in block.get("groups", []):
-                for item in group.get("statisticsItems", []):
-                    key = item.get("key")
-
-                    stats["home"][key] = item.get("homeValue", 0)
-                    stats["away"][key] = item.get("awayValue", 0)
+        for key, (home, away) in period_stats(data).items():
+            stats["home"][key] = 0 if home is None else home
+            stats["away"][key] = 0 if away is None else away
 
         return stats
 
@@ -1089,31 +1063,38 @@ class MatchAdmin(admin.ModelAdmin):
         return "\n".join(text)
 
     def check_analise(self, request, queryset):
+        # numpy/pandas só carregam quando a ação roda (o admin sobe no startup)
+        from bet.teams.batch import (
+            bet_recommendations_batch,
+            match_preview_batch,
+            profiles_frame,
+        )
 
-        for match in queryset:
-            match = get_object_or_404(Match, id=match.pk)
-
-            RECENT_GAMES = 5
-
-            # últimos jogos do mandante EM CASA
-            home_matches = Match.objects.filter(
-                Q(home_team=match.home_team) | Q(away_team=match.home_team),
-                finalizado=True,
-                date__lt=match.date,
-            ).order_by("-date")[:RECENT_GAMES]
-
-            away_matches = Match.objects.filter(
-                Q(home_team=match.away_team) | Q(away_team=match.away_team),
-                finalizado=True,
-                date__lt=match.date,
-            ).order_by("-date")[:RECENT_GAMES]
-
-            home_profile = team_profile(match.home_team, home_matches)
-            away_profile = team_profile(match.away_team, away_matches)
+        RECENT_GAMES = 5
 
-            preview = match_preview(home_profile, away_profile)
-            bets = bet_recommendations(home_profile, away_profile, preview)
+        matches = list(queryset.select_related("home_team", "away_team"))
+        if not matches:
+            return
 
+        # forma dos últimos jogos finalizados de cada time (TeamForm)
+        frame = profiles_frame(
+            [
+                (
+                    team_form_profile(match.home_team, RECENT_GAMES, match.date),
+                    team_form_profile(match.away_team, RECENT_GAMES, match.date),
+                )
+                for match in matches
+            ]
+        )
+        # preview e sugestões de todas as partidas selecionadas de uma vez
+        previews = match_preview_batch(frame)
+        recommendations = bet_recommendations_batch(frame, previews)
+
+        for match, preview, bets in zip(
+            matches,
+            previews.to_dict("records"),
+            recommendations.to_dict("records"),
+        ):
             if match.finalizado:
                 evaluation = self.evaluate_bets(bets, match, preview)
             else:
@@ -1125,7 +1106,7 @@ class MatchAdmin(admin.ModelAdmin):
                 evaluation=evaluation if match.finalizado else None,
             )
 
-            telegram_send(analise_text)
+            send_telegram.delay(analise_text)
 
     def gerar_analise_e_enviar(self, request, queryset):
         enviados = 0
@@ -1138,7 +1119,7 @@ class MatchAdmin(admin.ModelAdmin):
             match.save(update_fields=["analise"])
 
             # envia para telegram
-            telegram_send(analise_text)
+            send_telegram.delay(analise_text)
 
             enviados += 1
 
@@ -1148,11 +1129,15 @@ class MatchAdmin(admin.ModelAdmin):
         )
 
     def action_evaluate(self, request, queryset):
-        for match in queryset:
-            analysis_v31 = gerar_analise_v3(match)
-            analysis_v32 = gerar_analise_v3_2(match)
+        # roda na fila "analysis", fora do request e sem disputar com o ao vivo
+        match_ids = list(queryset.values_list("pk", flat=True))
+        evaluate_matches.delay(match_ids)
 
-            evaluate_match_models(match, analysis_v31, analysis_v32)
+        self.message_user(
+            request,
+            f"Avaliação agendada para {len(match_ids)} jogo(s).",
+            level=messages.SUCCESS,
+        )
 
     def action_gerar_analise_v2(self, request, queryset):
         enviados = 0
@@ -1162,7 +1147,7 @@ class MatchAdmin(admin.ModelAdmin):
             match.analise = analise
             match.save(update_fields=["analise"])
 
-            telegram_send(analise["resumo"])
+            send_telegram.delay(analise["resumo"])
             enviados += 1
 
         self.message_user(
@@ -1179,7 +1164,7 @@ class MatchAdmin(admin.ModelAdmin):
             match.analise = analise
             match.save(update_fields=["analise"])
 
-            telegram_send(analise["resumo"])
+            send_telegram.delay(analise["resumo"])
             count += 1
 
         self.message_user(
@@ -1196,7 +1181,7 @@ class MatchAdmin(admin.ModelAdmin):
             match.analise = analise
             match.save(update_fields=["analise"])
 
-            telegram_send(analise["resumo"])
+            send_telegram.delay(analise["resumo"])
             count += 1
 
         self.message_user(
@@ -1334,4 +1319,44 @@ class LiveSnapshotAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(BasketballSnapshot)
+class BasketballSnapshotAdmin(admin.ModelAdmin):
+    list_display = (
+        "match",
+        "minute",
+        "points_home",
+        "points_away",
+        "rebounds_home",
+        "rebounds_away",
+        "max_run_home",
+        "max_run_away",
+        "created_at",
+    )
+
+    list_filter = (
+        "match",
+        "minute",
+        "created_at",
+    )
+
+    search_fields = (
+        "match__home_team__name",
+        "match__away_team__name",
+        "match__id",
+    )
+
+    ordering = ("match", "minute")
+
+    readonly_fields = ("created_at",)
+
+
+@admin.register(LiveAnalysis)
+class LiveAnalysisAdmin(admin.ModelAdmin):
+    list_display = ("match", "version", "minute", "created_at")
+    search_fields = ("match__home_team__name", "match__away_team__name", "match__id")
+    ordering = ("match", "-version")
+    readonly_fields = ("created_at",)
+
+
 admin.site.register(RunningToday)
+admin.site.register(SnapshotArchive)
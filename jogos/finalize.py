@@ -0,0 +1,73 @@
+"""
+Finalização em lote das partidas que o poller não fechou.
+
+Tudo é feito com UPDATEs por conjunto no banco (sem iterar partidas em
+Python), filtrando por (finalizado, date), que tem índice:
+
+- paradas: começaram há mais de MATCH_STALE_HOURS horas e seguem abertas;
+- duplicadas: mesma partida (mandante, visitante e dia) cadastrada mais de
+  uma vez; fica a mais recente (maior id) e as demais são finalizadas.
+
+Cada finalização é um único UPDATE no queryset filtrado; os times afetados
+saem de uma subquery (um SELECT por times, não por partidas). O `.update()` não
+dispara post_save, então depois do commit a forma (TeamForm) e a análise em
+cache desses times são recalculadas fora da transação, em tasks por lote
+(jogos.tasks.refresh_team_forms).
+"""
+
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber, TruncDate
+from django.utils import timezone
+
+from jogos.models import Match, Team
+
+
+def finalize(matches):
+    """Finaliza as partidas do queryset; retorna quantas foram atualizadas."""
+    from jogos.tasks import queue_team_forms
+
+    teams = set(
+        Team.objects.filter(
+            Q(pk__in=matches.values("home_team"))
+            | Q(pk__in=matches.values("away_team"))
+        ).values_list("pk", flat=True)
+    )
+    updated = matches.update(finalizado=True, next_poll_at=None)
+    if updated:
+        transaction.on_commit(partial(queue_team_forms, teams))
+    return updated
+
+
+def finalize_stale_matches(now=None):
+    now = now or timezone.now()
+    cutoff = now - timedelta(hours=settings.MATCH_STALE_HOURS)
+    return finalize(Match.objects.filter(finalizado=False, date__lt=cutoff))
+
+
+def finalize_duplicate_matches(now=None):
+    now = now or timezone.now()
+    # só as abertas recentes: o que é mais antigo já caiu em finalize_stale_matches
+    recent = Match.objects.filter(
+        finalizado=False, date__gte=now - timedelta(days=settings.MATCH_DUPLICATE_DAYS)
+    )
+    duplicates = recent.annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F("home_team"), F("away_team"), TruncDate("date")],
+            order_by=F("id").desc(),
+        )
+    ).filter(rank__gt=1)
+    return finalize(Match.objects.filter(pk__in=duplicates.values("pk")))
+
+
+def finalize_matches(now=None):
+    now = now or timezone.now()
+    return {
+        "stale": finalize_stale_matches(now),
+        "duplicates": finalize_duplicate_matches(now),
+    }
@@ -0,0 +1,56 @@
+"""
+Versões da análise ao vivo (LiveAnalysis).
+
+As tasks de coleta calculam a análise uma vez por poll, gravam aqui e publicam
+no canal da partida; post_status, o SSE e o monitor só leem a última versão.
+
+A versão é lida e gravada com a partida travada (select_for_update); no banco
+sem lock de linha (SQLite) duas coletas ainda podem disputar a mesma versão, e
+quem perde na constraint (match, version) relê e tenta de novo.
+"""
+
+from functools import partial
+
+from django.db import IntegrityError, transaction
+
+from jogos.live_feed import publish
+from jogos.models import LiveAnalysis, Match
+
+VERSION_RETRIES = 3
+
+
+def latest_analysis(match):
+    return LiveAnalysis.objects.filter(match=match).order_by("-version").first()
+
+
+def record_live_analysis(match, data, minute=0):
+    """
+    Grava `data` como nova versão da análise da partida e publica no feed
+    depois do commit.
+
+    Se nada mudou desde a última versão não grava nem publica; retorna a
+    versão vigente.
+    """
+    for attempt in range(VERSION_RETRIES):
+        try:
+            with transaction.atomic():
+                # trava a linha da partida: as versões dela saem em fila
+                list(Match.objects.select_for_update().filter(pk=match.pk).values("pk"))
+                last = latest_analysis(match)
+                if last and last.data == data:
+                    return last
+
+                analysis = LiveAnalysis.objects.create(
+                    match=match,
+                    version=last.version + 1 if last else 1,
+                    minute=minute or 0,
+                    data=data,
+                )
+            break
+        except IntegrityError:
+            # outra coleta gravou a mesma versão antes: relê a última
+            if attempt == VERSION_RETRIES - 1:
+                raise
+
+    transaction.on_commit(partial(publish, match.pk, "analysis", analysis.payload()))
+    return analysis
@@ -0,0 +1,95 @@
+"""
+Broker dos eventos ao vivo por partida (snapshots novos e análises).
+
+O poller (Celery) publica; as páginas abertas recebem pelo endpoint SSE. Com
+LIVE_FEED_BACKEND = "redis" a entrega passa pelo pub/sub do Redis e funciona
+entre processos (worker -> servidor ASGI). O backend "local" entrega só dentro
+do mesmo processo e serve para desenvolvimento e testes.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_local_subscribers = defaultdict(set)
+
+
+def channel_name(match_id):
+    return f"live-match:{match_id}"
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+
+        _redis_client = redis.Redis.from_url(settings.LIVE_FEED_REDIS_URL)
+    return _redis_client
+
+
+def publish(match_id, event, data):
+    """
+    Publica `data` (JSON) como evento `event` no canal da partida.
+
+    Roda depois do commit do poll: uma falha do feed (Redis fora do ar etc.)
+    só é logada, sem derrubar o get_stats nem a gravação da análise.
+    """
+    message = json.dumps({"event": event, "data": data}, default=str)
+    channel = channel_name(match_id)
+
+    try:
+        if settings.LIVE_FEED_BACKEND == "local":
+            for loop, queue in list(_local_subscribers[channel]):
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            return
+
+        _get_redis().publish(channel, message)
+    except Exception:
+        logger.exception("Falha ao publicar %s da partida %s", event, match_id)
+
+
+async def subscribe(match_id, timeout=None):
+    """
+    Gera as mensagens da partida conforme chegam.
+
+    A cada `timeout` segundos sem mensagem gera None, para o chamador mandar
+    um keep-alive.
+    """
+    timeout = timeout or settings.LIVE_FEED_KEEPALIVE
+    channel = channel_name(match_id)
+
+    if settings.LIVE_FEED_BACKEND == "local":
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        _local_subscribers[channel].add(subscriber)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    message = None
+                yield json.loads(message) if message else None
+        finally:
+            _local_subscribers[channel].discard(subscriber)
+        return
+
+    import redis.asyncio as aioredis
+
+    client = aioredis.Redis.from_url(settings.LIVE_FEED_REDIS_URL)
+    pubsub = client.pubsub()
+    await pubsub.subscribe(channel)
+    try:
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=timeout
+            )
+            yield json.loads(message["data"]) if message else None
+    finally:
+        await pubsub.unsubscribe(channel)
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,179 @@
+"""
+Janela deslizante por partida ao vivo.
+
+Guarda no cache (Redis) os snapshots dos últimos LIVE_WINDOW_MINUTES minutos
+de cada partida (um por bucket de minuto) junto com a soma acumulada do
+momentum, de modo que os analisadores leem o primeiro/último snapshot e a média
+de momentum dos últimos N minutos sem voltar ao banco. O banco só é lido no
+cold start (chave ausente no cache).
+
+Vários workers gravam snapshots ao mesmo tempo (process_match_batch), então a
+leitura-push-escrita de cada janela em `push_snapshots` acontece sob um lease
+por partida (cache.add). Se o lease não sai em LIVE_WINDOW_LOCK_WAIT segundos,
+a janela é descartada e o próximo get_window recarrega do banco.
+"""
+
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Subquery
+
+from jogos.models import snapshot_model_for
+
+SKIP_FIELDS = {"match", "created_at", "updated_at", "last_seen_at"}
+
+
+def window_key(match_id):
+    return f"live-window:{match_id}"
+
+
+def window_lock_key(match_id):
+    return f"live-window-lock:{match_id}"
+
+
+def snapshot_fields(model):
+    return [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.name not in SKIP_FIELDS
+    ]
+
+
+def snapshot_payload(snapshot):
+    """Snapshot como dict (mesmo formato de RollingWindow.as_dict)."""
+    data = {
+        field: getattr(snapshot, field) for field in snapshot_fields(type(snapshot))
+    }
+    data["match"] = snapshot.match_id
+    return data
+
+
+class RollingWindow:
+    def __init__(self, match_id, minutes=None):
+        self.match_id = match_id
+        self.minutes = minutes or settings.LIVE_WINDOW_MINUTES
+        self.items = deque()
+        # momentum acumulado antes do item mais antigo da janela
+        self.momentum_base = 0.0
+        self.momentum_total = 0.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def push(self, values):
+        item = SimpleNamespace(**values)
+        if self.items and item.minute < self.items[-1].minute:
+            return
+
+        # mesmo bucket de minuto: o upsert substituiu a linha
+        if self.items and item.minute == self.items[-1].minute:
+            self.items.pop()
+            self.momentum_total = (
+                self.items[-1].momentum_cum if self.items else self.momentum_base
+            )
+
+        self.momentum_total += item.momentum_score or 0
+        item.momentum_cum = self.momentum_total
+        self.items.append(item)
+
+        while self.items[0].minute < item.minute - self.minutes:
+            self.momentum_base = self.items.popleft().momentum_cum
+
+    def _start(self, window):
+        """Índice do primeiro snapshot dos últimos `window` minutos."""
+        since = self.items[-1].minute - window
+        start = len(self.items) - 1
+        while start > 0 and self.items[start - 1].minute >= since:
+            start -= 1
+        return start
+
+    def snapshots(self, window):
+        """Snapshots dos últimos `window` minutos em ordem cronológica."""
+        if not self.items:
+            return []
+        return list(self.items)[self._start(window) :]
+
+    def first(self, window):
+        return self.items[self._start(window)]
+
+    @property
+    def last(self):
+        return self.items[-1]
+
+    def avg_momentum(self, window):
+        if not self.items:
+            return 0.0
+        start = self._start(window)
+        before = self.items[start - 1].momentum_cum if start else self.momentum_base
+        return (self.momentum_total - before) / (len(self.items) - start)
+
+    def as_dict(self):
+        data = {
+            key: value
+            for key, value in vars(self.last).items()
+            if key != "momentum_cum"
+        }
+        data["match"] = self.match_id
+        return data
+
+
+def load_window(match):
+    """Cold start: range scan dos últimos LIVE_WINDOW_MINUTES minutos no banco."""
+    model = snapshot_model_for(match.sport)
+    window = RollingWindow(match.pk)
+    qs = model.objects.filter(match=match)
+    last_minute = qs.order_by("-minute").values("minute")[:1]
+    rows = (
+        qs.filter(minute__gte=Subquery(last_minute) - window.minutes)
+        .order_by("minute")
+        .values(*snapshot_fields(model))
+    )
+    for row in rows:
+        window.push(row)
+    return window
+
+
+def get_window(match):
+    window = cache.get(window_key(match.pk))
+    if window is None:
+        window = load_window(match)
+        # add: não sobrescreve uma janela que outro worker já atualizou
+        cache.add(window_key(match.pk), window, settings.LIVE_WINDOW_TTL)
+    return window
+
+
+def lock_window(match_id):
+    """Espera o lease da janela da partida; False se não saiu a tempo."""
+    key = window_lock_key(match_id)
+    deadline = time.monotonic() + settings.LIVE_WINDOW_LOCK_WAIT
+    while not cache.add(key, 1, settings.LIVE_WINDOW_LOCK_TTL):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def push_snapshots(snapshots):
+    """Atualiza as janelas já em cache com snapshots recém-gravados."""
+    by_match = {}
+    for snapshot in snapshots:
+        by_match.setdefault(snapshot.match_id, []).append(snapshot)
+
+    for match_id, rows in by_match.items():
+        key = window_key(match_id)
+        if not lock_window(match_id):
+            cache.delete(key)
+            continue
+        try:
+            window = cache.get(key)
+            # sem janela em cache: o próximo get_window carrega do banco
+            if window is None:
+                continue
+            for snapshot in rows:
+                window.push(snapshot_payload(snapshot))
+            cache.set(key, window, settings.LIVE_WINDOW_TTL)
+        finally:
+            cache.delete(window_lock_key(match_id))
@@ -0,0 +1,56 @@
+"""
+Leases no cache (Redis) para não empilhar coletas da mesma partida.
+
+O lease é pego por quem enfileira (dispatch) e solto pela task no fim, então
+enquanto uma coleta está na fila ou rodando a próxima é pulada: a fila fica
+limitada a uma task por partida (e um tick do placar ao vivo) mesmo com o
+SofaScore lento. O TTL (POLL_LOCK_TTL) solta o lease de um worker que morreu.
+
+As coletas puladas são contadas em `skipped_count()`.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+BOARD_KEY = "poll-lock:live-board"
+SKIPPED_KEY = "poll-skipped"
+
+
+def match_key(match_id):
+    return f"poll-lock:match:{match_id}"
+
+
+def ingest_key(day):
+    return f"poll-lock:ingest:{day}"
+
+
+def acquire(keys, ttl=None):
+    """Tenta pegar cada lease; retorna as chaves obtidas e conta as puladas."""
+    ttl = ttl or settings.POLL_LOCK_TTL
+    acquired = [key for key in keys if cache.add(key, 1, ttl)]
+    if len(acquired) < len(keys):
+        record_skipped(len(keys) - len(acquired))
+    return acquired
+
+
+def release(keys):
+    cache.delete_many(list(keys))
+
+
+def acquire_matches(match_ids, ttl=None):
+    """Ids das partidas cujo lease foi obtido (as demais já têm coleta em curso)."""
+    acquired = set(acquire([match_key(pk) for pk in match_ids], ttl))
+    return [pk for pk in match_ids if match_key(pk) in acquired]
+
+
+def release_matches(match_ids):
+    release(match_key(pk) for pk in match_ids)
+
+
+def record_skipped(count):
+    cache.add(SKIPPED_KEY, 0, None)
+    cache.incr(SKIPPED_KEY, count)
+
+
+def skipped_count():
+    return cache.get(SKIPPED_KEY, 0)
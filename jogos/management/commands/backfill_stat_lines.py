@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from bet.teams.analysis_cache import invalidate_team_analysis
+from jogos.models import Match
+from jogos.stat_lines import sync_stat_lines
+from jogos.team_form import teams_of
+
+
+class Command(BaseCommand):
+    help = (
+        "Preenche MatchStatLine a partir do raw_statistics_json das partidas já "
+        "salvas (a ingestão nova já grava as linhas)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Só partidas que ainda não têm linhas.",
+        )
+
+    def sync(self, matches):
+        lines = sync_stat_lines(matches)
+        # sem save() de Match não há signal: invalida a análise dos times aqui
+        invalidate_team_analysis(teams_of(matches))
+        return lines
+
+    def handle(self, *args, **options):
+        matches = (
+            Match.objects.exclude(raw_statistics_json={})
+            .only("home_team", "away_team", "date", "raw_statistics_json")
+            .order_by("pk")
+        )
+        if options["missing"]:
+            matches = matches.filter(stat_lines__isnull=True)
+
+        batch, total_matches, total_lines = [], 0, 0
+        for match in matches.iterator(chunk_size=options["batch_size"]):
+            batch.append(match)
+            if len(batch) >= options["batch_size"]:
+                total_lines += self.sync(batch)
+                total_matches += len(batch)
+                batch = []
+        if batch:
+            total_lines += self.sync(batch)
+            total_matches += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {total_lines} linhas de {total_matches} partidas gravadas."
+            )
+        )
@@ -0,0 +1,87 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# o que um processo web/worker paga ao subir: django.setup() + URLs
+STARTUP_CODE = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(output):
+    """[(módulo, self_us, cumulativo_us, profundidade)] de um relatório -X importtime."""
+    rows = []
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative), len(indent) // 2))
+    return rows
+
+
+def import_parents(rows):
+    """{módulo: quem importou}: no relatório os filhos vêm antes do pai."""
+    parents = {}
+    pending = []
+    for module, _, _, depth in rows:
+        while pending and pending[-1][1] > depth:
+            parents[pending.pop()[0]] = module
+        pending.append((module, depth))
+    return parents
+
+
+class Command(BaseCommand):
+    help = (
+        "Perfil de import do startup (python -X importtime): django.setup() + "
+        "URLs num processo novo, com os módulos mais caros e quem os importou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--module",
+            action="append",
+            default=[],
+            help="Mostra a cadeia de import do módulo (pode repetir).",
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        )
+        if result.returncode:
+            self.stderr.write(result.stderr[-2000:])
+            return
+
+        rows = parse_importtime(result.stderr)
+        total = sum(self_us for _, self_us, _, _ in rows)
+        self.stdout.write(f"⏱️ {len(rows)} módulos, {total / 1000:.0f}ms no total\n")
+
+        self.stdout.write(f"{'cumulativo':>12} {'próprio':>10}  módulo")
+        ranked = sorted(rows, key=lambda row: row[2], reverse=True)
+        for module, self_us, cumulative, _ in ranked[: options["top"]]:
+            self.stdout.write(
+                f"{cumulative / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {module}"
+            )
+
+        parents = import_parents(rows)
+        imported = {module for module, _, _, _ in rows}
+        for module in options["module"]:
+            if module not in imported:
+                self.stdout.write(f"\n{module}: não importado no startup ✅")
+                continue
+            chain = [module]
+            while chain[-1] in parents:
+                chain.append(parents[chain[-1]])
+            self.stdout.write(f"\n{module}: " + " <- ".join(chain))
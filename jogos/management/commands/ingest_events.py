@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from jogos.tasks import queue_ingest
+
+
+class Command(BaseCommand):
+    help = (
+        "Enfileira a busca de eventos do SofaScore (ingest_events, fila ingest) "
+        "de um intervalo de datas, um dia por task."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", type=date.fromisoformat, help="YYYY-MM-DD")
+        parser.add_argument(
+            "end", type=date.fromisoformat, nargs="?", help="YYYY-MM-DD (inclusivo)"
+        )
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or start
+        days = [
+            (start + timedelta(days=offset)).isoformat()
+            for offset in range((end - start).days + 1)
+        ]
+
+        queued = [day for day in days if queue_ingest([day])]
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {len(queued)} de {len(days)} dias enfileirados na fila ingest."
+            )
+        )
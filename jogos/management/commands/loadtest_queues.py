@@ -0,0 +1,61 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from jogos.tasks import loadtest_backfill, loadtest_probe
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência da fila live com e sem um backfill rodando na fila "
+        "ingest. Precisa dos workers de cada fila no ar (ver DEVELOPMENT.md)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--probes", type=int, default=20)
+        parser.add_argument("--interval", type=float, default=0.5)
+        parser.add_argument("--backfill", type=int, default=200)
+        parser.add_argument("--backfill-seconds", type=float, default=2.0)
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def measure(self, options):
+        results = []
+        for _ in range(options["probes"]):
+            results.append(loadtest_probe.delay(time.time()))
+            time.sleep(options["interval"])
+        return [result.get(timeout=options["timeout"]) for result in results]
+
+    def report(self, label, latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        self.stdout.write(
+            f"{label}: p50={statistics.median(latencies) * 1000:.0f}ms "
+            f"p95={p95 * 1000:.0f}ms max={latencies[-1] * 1000:.0f}ms"
+        )
+        return p95
+
+    def handle(self, *args, **options):
+        self.stdout.write("🚀 Latência da fila live sem carga...")
+        baseline = self.report("sem backfill", self.measure(options))
+
+        self.stdout.write(
+            f"🚚 Enfileirando {options['backfill']} tasks de backfill "
+            f"({options['backfill_seconds']}s cada) na fila ingest..."
+        )
+        backfill = [
+            loadtest_backfill.delay(options["backfill_seconds"])
+            for _ in range(options["backfill"])
+        ]
+
+        loaded = self.report("com backfill", self.measure(options))
+
+        for result in backfill:
+            result.revoke()
+
+        if loaded <= baseline * 2 + 0.1:
+            self.stdout.write(self.style.SUCCESS("✅ Latência da fila live estável."))
+        else:
+            self.stdout.write(
+                self.style.WARNING("⚠️ Latência da fila live subiu com o backfill.")
+            )
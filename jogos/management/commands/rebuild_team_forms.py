@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from jogos.models import Team
+from jogos.team_form import update_team_forms
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula a TeamForm de todos os times (depois do backfill_stat_lines); "
+        "no dia a dia ela é atualizada quando cada partida é finalizada."
+    )
+
+    def handle(self, *args, **options):
+        team_ids = list(Team.objects.values_list("pk", flat=True))
+        total = update_team_forms(team_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {total} formas de {len(team_ids)} times gravadas.")
+        )
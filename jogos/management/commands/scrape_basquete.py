@@ -622,6 +622,7 @@ class Command(BaseCommand):
             allowed_countries = {
                 "usa",
             }
+            possible_bets = {}
             try:
                 events = [
                     e
@@ -678,21 +679,20 @@ class Command(BaseCommand):
 
                     result["previsao_automatica"] = prediction
 
-                    # limpa apostas antigas do evento
-                    PossibleBet.objects.filter(event_id=event["id"]).delete()
-
                     markets = prediction.get("mercados_sugeridos_modelo", [])
                     probs = prediction.get("probabilidades", {})
 
                     best_prob = max(probs.values()) if probs else 50
 
-                    for market in markets:
-                        PossibleBet.objects.create(
-                            event_id=event["id"],
-                            market=market,
-                            probability=best_prob,
-                            description="Mercado sugerido pelo modelo NBA",
-                        )
+                    # apostas do evento substituem as antigas no flush do lote
+                    possible_bets[event["id"]] = [
+                        {
+                            "market": market,
+                            "probability": best_prob,
+                            "description": "Mercado sugerido pelo modelo NBA",
+                        }
+                        for market in markets
+                    ]
 
                     final.append(result)
 
@@ -709,3 +709,6 @@ class Command(BaseCommand):
             except Exception as e:
                 print(f"erro: {e} {e.__traceback__.tb_lineno}")
                 pass
+
+            # um único upsert para todos os eventos do dia
+            PossibleBet.objects.replace_for_events(possible_bets)
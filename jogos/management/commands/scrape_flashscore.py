@@ -783,6 +783,7 @@ class Command(BaseCommand):
                 "europe",
                 "england",
             }
+            possible_bets = {}
             try:
                 events = [
                     e
@@ -839,31 +840,35 @@ class Command(BaseCommand):
 
                     result["previsao_automatica"] = prediction
 
-                    # limpa apostas antigas do evento
-                    PossibleBet.objects.filter(event_id=event["id"]).delete()
-
                     # MERCADOS sugeridos
                     markets = prediction.get("mercados_sugeridos_modelo", {})
 
                     # PROBABILIDADES do modelo
                     probs = prediction.get("probabilidades", {})
 
+                    # apostas do evento substituem as antigas no flush do lote
+                    event_bets = possible_bets.setdefault(event["id"], [])
+
                     # 1) Mercado principal
                     if markets.get("principal"):
-                        PossibleBet.objects.create(
-                            event_id=event["id"],
-                            market=markets["principal"],
-                            probability=max(probs.values()),  # melhor probabilidade
-                            description="Mercado principal sugerido pelo modelo",
+                        event_bets.append(
+                            {
+                                "market": markets["principal"],
+                                "probability": max(
+                                    probs.values()
+                                ),  # melhor probabilidade
+                                "description": "Mercado principal sugerido pelo modelo",
+                            }
                         )
 
                     # 2) Mercado de gols
                     if markets.get("gols"):
-                        PossibleBet.objects.create(
-                            event_id=event["id"],
-                            market=markets["gols"],
-                            probability=probs.get("over") or 50,
-                            description="Leitura de gols com base no comportamento do jogo",
+                        event_bets.append(
+                            {
+                                "market": markets["gols"],
+                                "probability": probs.get("over") or 50,
+                                "description": "Leitura de gols com base no comportamento do jogo",
+                            }
                         )
 
                     final.append(result)
@@ -881,3 +886,6 @@ class Command(BaseCommand):
             except Exception as e:
                 print(f"erro: {e}")
                 pass
+
+            # um único upsert para todos os eventos do dia
+            PossibleBet.objects.replace_for_events(possible_bets)
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0026_livesnapshot_points_away_livesnapshot_points_home"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SnapshotArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.CharField(max_length=500)),
+                ("rows", models.IntegerField(default=0)),
+                ("bucket_minutes", models.IntegerField(default=1)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "match",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot_archive",
+                        to="jogos.match",
+                    ),
+                ),
+            ],
+        ),
+    ]
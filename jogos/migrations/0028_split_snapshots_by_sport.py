@@ -0,0 +1,430 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BASKETBALL_FIELDS = [
+    "minute",
+    "momentum_score",
+    "created_at",
+    "points_home",
+    "points_away",
+    "ft_made_home",
+    "ft_made_away",
+    "fg2_made_home",
+    "fg2_made_away",
+    "fg3_made_home",
+    "fg3_made_away",
+    "fg_made_home",
+    "fg_made_away",
+    "rebounds_home",
+    "rebounds_away",
+    "off_reb_home",
+    "off_reb_away",
+    "def_reb_home",
+    "def_reb_away",
+    "assists_home",
+    "assists_away",
+    "turnovers_home",
+    "turnovers_away",
+    "steals_home",
+    "steals_away",
+    "blocks_home",
+    "blocks_away",
+    "fouls_home",
+    "fouls_away",
+    "max_run_home",
+    "max_run_away",
+    "biggest_lead_home",
+    "biggest_lead_away",
+    "time_leading_home",
+    "time_leading_away",
+]
+
+
+def copy_basketball_snapshots(apps, schema_editor):
+    """Move os snapshots de basquete para a tabela própria."""
+    LiveSnapshot = apps.get_model("jogos", "LiveSnapshot")
+    BasketballSnapshot = apps.get_model("jogos", "BasketballSnapshot")
+
+    # preserva o created_at original
+    created_at = BasketballSnapshot._meta.get_field("created_at")
+    created_at.auto_now_add = False
+
+    qs = LiveSnapshot.objects.filter(match__sport="basketball")
+    batch = []
+    for row in qs.values("match_id", *BASKETBALL_FIELDS).iterator(chunk_size=2000):
+        row["minute"] = max(row["minute"] or 0, 0)
+        batch.append(BasketballSnapshot(**row))
+        if len(batch) >= 2000:
+            BasketballSnapshot.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        BasketballSnapshot.objects.bulk_create(batch)
+
+    qs.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0027_snapshotarchive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BasketballSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("minute", models.PositiveSmallIntegerField(default=0)),
+                ("momentum_score", models.FloatField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("points_home", models.PositiveSmallIntegerField(default=0)),
+                ("points_away", models.PositiveSmallIntegerField(default=0)),
+                ("ft_made_home", models.PositiveSmallIntegerField(default=0)),
+                ("ft_made_away", models.PositiveSmallIntegerField(default=0)),
+                ("fg2_made_home", models.PositiveSmallIntegerField(default=0)),
+                ("fg2_made_away", models.PositiveSmallIntegerField(default=0)),
+                ("fg3_made_home", models.PositiveSmallIntegerField(default=0)),
+                ("fg3_made_away", models.PositiveSmallIntegerField(default=0)),
+                ("fg_made_home", models.PositiveSmallIntegerField(default=0)),
+                ("fg_made_away", models.PositiveSmallIntegerField(default=0)),
+                ("rebounds_home", models.PositiveSmallIntegerField(default=0)),
+                ("rebounds_away", models.PositiveSmallIntegerField(default=0)),
+                ("off_reb_home", models.PositiveSmallIntegerField(default=0)),
+                ("off_reb_away", models.PositiveSmallIntegerField(default=0)),
+                ("def_reb_home", models.PositiveSmallIntegerField(default=0)),
+                ("def_reb_away", models.PositiveSmallIntegerField(default=0)),
+                ("assists_home", models.PositiveSmallIntegerField(default=0)),
+                ("assists_away", models.PositiveSmallIntegerField(default=0)),
+                ("turnovers_home", models.PositiveSmallIntegerField(default=0)),
+                ("turnovers_away", models.PositiveSmallIntegerField(default=0)),
+                ("steals_home", models.PositiveSmallIntegerField(default=0)),
+                ("steals_away", models.PositiveSmallIntegerField(default=0)),
+                ("blocks_home", models.PositiveSmallIntegerField(default=0)),
+                ("blocks_away", models.PositiveSmallIntegerField(default=0)),
+                ("fouls_home", models.PositiveSmallIntegerField(default=0)),
+                ("fouls_away", models.PositiveSmallIntegerField(default=0)),
+                ("max_run_home", models.PositiveSmallIntegerField(default=0)),
+                ("max_run_away", models.PositiveSmallIntegerField(default=0)),
+                ("biggest_lead_home", models.PositiveSmallIntegerField(default=0)),
+                ("biggest_lead_away", models.PositiveSmallIntegerField(default=0)),
+                ("time_leading_home", models.PositiveSmallIntegerField(default=0)),
+                ("time_leading_away", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="jogos.match"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["minute"],
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(copy_basketball_snapshots, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="assists_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="assists_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="biggest_lead_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="biggest_lead_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="blocks_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="blocks_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="def_reb_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="def_reb_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="fg2_made_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="fg2_made_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="fg3_made_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="fg3_made_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="fg_made_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="fg_made_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="ft_made_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="ft_made_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="max_run_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="max_run_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="off_reb_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="off_reb_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="points_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="points_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="rebounds_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="rebounds_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="steals_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="steals_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="time_leading_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="time_leading_home",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="turnovers_away",
+        ),
+        migrations.RemoveField(
+            model_name="livesnapshot",
+            name="turnovers_home",
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="big_chances_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="big_chances_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="big_chances_missed_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="big_chances_missed_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="clearances_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="clearances_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="corners_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="corners_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="final_third_entries_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="final_third_entries_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="fouls_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="fouls_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="interceptions_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="interceptions_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="minute",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="recoveries_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="recoveries_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="red_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="red_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="saves_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="saves_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_inside_box_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_inside_box_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_on_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_on_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_outside_box_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_outside_box_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_total_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="shots_total_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="tackles_won_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="tackles_won_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="touches_box_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="touches_box_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="yellow_away",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="livesnapshot",
+            name="yellow_home",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
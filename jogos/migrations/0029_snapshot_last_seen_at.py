@@ -0,0 +1,23 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0028_split_snapshots_by_sport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="basketballsnapshot",
+            name="last_seen_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="livesnapshot",
+            name="last_seen_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:24
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def keep_last_snapshot_per_minute(apps, schema_editor):
+    """Antes do unique: fica só o último snapshot de cada (match, minute)."""
+    for model_name in ("LiveSnapshot", "BasketballSnapshot"):
+        model = apps.get_model("jogos", model_name)
+        keep_ids = (
+            model.objects.values("match", "minute")
+            .annotate(last_id=Max("id"))
+            .values("last_id")
+        )
+        model.objects.exclude(id__in=keep_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0029_snapshot_last_seen_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_last_snapshot_per_minute, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="basketballsnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("match", "minute"),
+                name="unique_basketballsnapshot_match_minute",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="livesnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("match", "minute"), name="unique_livesnapshot_match_minute"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0030_unique_snapshot_minute_bucket"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="status",
+            field=models.CharField(blank=True, default="", max_length=30),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def stop_finished_matches(apps, schema_editor):
+    # partidas já finalizadas não entram na agenda
+    Match = apps.get_model("jogos", "Match")
+    Match.objects.filter(finalizado=True).update(next_poll_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0031_match_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="next_poll_at",
+            field=models.DateTimeField(
+                blank=True, default=django.utils.timezone.now, null=True
+            ),
+        ),
+        migrations.RunPython(stop_finished_matches, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["finalizado", "next_poll_at"],
+                name="jogos_match_finaliz_c77dff_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0032_match_next_poll_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiveAnalysis",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField()),
+                ("minute", models.PositiveSmallIntegerField(default=0)),
+                ("data", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="live_analyses",
+                        to="jogos.match",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["version"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="liveanalysis",
+            constraint=models.UniqueConstraint(
+                fields=("match", "version"), name="unique_live_analysis_version"
+            ),
+        ),
+    ]
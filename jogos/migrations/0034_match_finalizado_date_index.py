@@ -0,0 +1,19 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0033_live_analysis"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["finalizado", "date"], name="jogos_match_finaliz_3de23b_idx"
+            ),
+        ),
+    ]
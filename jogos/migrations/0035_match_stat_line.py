@@ -0,0 +1,69 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0034_match_finalizado_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchStatLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "side",
+                    models.CharField(
+                        choices=[("home", "Mandante"), ("away", "Visitante")],
+                        max_length=4,
+                    ),
+                ),
+                ("period", models.CharField(default="ALL", max_length=10)),
+                ("key", models.CharField(max_length=60)),
+                ("value", models.FloatField()),
+                ("date", models.DateTimeField(blank=True, null=True)),
+                (
+                    "match",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stat_lines",
+                        to="jogos.match",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stat_lines",
+                        to="jogos.team",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["team", "key", "date"],
+                        name="jogos_match_team_id_602dfb_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="matchstatline",
+            constraint=models.UniqueConstraint(
+                fields=("match", "side", "period", "key"), name="unique_match_stat_line"
+            ),
+        ),
+    ]
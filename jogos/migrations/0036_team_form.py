@@ -0,0 +1,47 @@
+# Generated by Django 4.2.24 on 2026-10-19 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0035_match_stat_line"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamForm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("window", models.PositiveSmallIntegerField()),
+                ("games", models.PositiveSmallIntegerField(default=0)),
+                ("last_match_date", models.DateTimeField(blank=True, null=True)),
+                ("totals", models.JSONField(default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="forms",
+                        to="jogos.team",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="teamform",
+            constraint=models.UniqueConstraint(
+                fields=("team", "window"), name="unique_team_form_window"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.24 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jogos", "0036_team_form"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="basketballsnapshot",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="livesnapshot",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from django.utils.timezone import now
@@ -50,6 +51,10 @@ class Match(models.Model):
 
     date = models.DateTimeField(null=True, blank=True)
     finalizado = models.BooleanField(default=False)
+    # status.type do SofaScore (notstarted, inprogress, finished...)
+    status = models.CharField(max_length=30, blank=True, default="")
+    # próxima coleta agendada (jogos/scheduling.py); None = não coletar mais
+    next_poll_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
 
     home_team_score = models.IntegerField(null=True, blank=True)
     away_team_score = models.IntegerField(null=True, blank=True)
@@ -79,6 +84,16 @@ class Match(models.Model):
     def __str__(self):
         return f"[{self.sport}] {self.home_team} vs {self.away_team}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["finalizado", "next_poll_at"]),
+            models.Index(fields=["finalizado", "date"]),
+        ]
+
+    @property
+    def snapshot_model(self):
+        return snapshot_model_for(self.sport)
+
 
 class RunningToday(models.Model):
     rodou = models.BooleanField(default=False)
@@ -182,128 +197,350 @@ class StandingEntry(models.Model):
         return f"Standings {self.match}"
 
 
-class LiveSnapshot(models.Model):
+class SnapshotQuerySet(models.QuerySet):
+    def latest_by_match(self, match_ids):
+        """{match_id: último snapshot} de várias partidas em uma única query."""
+        latest = (
+            self.model.objects.filter(match=models.OuterRef("pk"))
+            .order_by("-minute", "-id")
+            .values("id")[:1]
+        )
+        latest_ids = (
+            Match.objects.filter(pk__in=match_ids)
+            .annotate(last_snapshot_id=models.Subquery(latest))
+            .values("last_snapshot_id")
+        )
+        return {snap.match_id: snap for snap in self.filter(id__in=latest_ids)}
+
+
+class BaseSnapshot(models.Model):
+    """Campos comuns aos snapshots ao vivo; as estatísticas ficam por esporte."""
+
     match = models.ForeignKey(Match, on_delete=models.CASCADE)
-    minute = models.IntegerField(default=0)
+    minute = models.PositiveSmallIntegerField(default=0)
+
+    # ======== SCORE DINÂMICO ========
+    momentum_score = models.FloatField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # último upsert do bucket (a linha é regravada no lugar, mesmo id)
+    updated_at = models.DateTimeField(auto_now=True)
+    # último poll em que as estatísticas ainda eram as deste snapshot
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+
+    objects = SnapshotQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        ordering = ["minute"]
+        # um snapshot por bucket de minuto (ver snapshot_bucket)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["match", "minute"], name="unique_%(class)s_match_minute"
+            )
+        ]
+
+    @classmethod
+    def upsert_fields(cls):
+        """
+        Campos regravados quando chega um snapshot do mesmo bucket; last_seen_at
+        fica com o último toque (o snapshot novo chega com ele vazio).
+        """
+        return [
+            field.name
+            for field in cls._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in ("match", "minute", "created_at", "last_seen_at")
+        ]
+
+    def has_same_stats(self, stats):
+        return all(getattr(self, key) == value for key, value in stats.items())
+
+
+class LiveSnapshot(BaseSnapshot):
+    """Snapshot de futebol."""
 
     # ======== OFENSIVO PRINCIPAL ========
     xg_home = models.FloatField(default=0)
     xg_away = models.FloatField(default=0)
 
-    shots_on_home = models.IntegerField(default=0)
-    shots_on_away = models.IntegerField(default=0)
+    shots_on_home = models.PositiveSmallIntegerField(default=0)
+    shots_on_away = models.PositiveSmallIntegerField(default=0)
 
-    shots_total_home = models.IntegerField(default=0)
-    shots_total_away = models.IntegerField(default=0)
+    shots_total_home = models.PositiveSmallIntegerField(default=0)
+    shots_total_away = models.PositiveSmallIntegerField(default=0)
 
-    corners_home = models.IntegerField(default=0)
-    corners_away = models.IntegerField(default=0)
+    corners_home = models.PositiveSmallIntegerField(default=0)
+    corners_away = models.PositiveSmallIntegerField(default=0)
 
     possession_home = models.FloatField(default=0)
     possession_away = models.FloatField(default=0)
 
     # ======== PROFUNDIDADE OFENSIVA ========
-    touches_box_home = models.IntegerField(default=0)
-    touches_box_away = models.IntegerField(default=0)
+    touches_box_home = models.PositiveSmallIntegerField(default=0)
+    touches_box_away = models.PositiveSmallIntegerField(default=0)
 
-    final_third_entries_home = models.IntegerField(default=0)
-    final_third_entries_away = models.IntegerField(default=0)
+    final_third_entries_home = models.PositiveSmallIntegerField(default=0)
+    final_third_entries_away = models.PositiveSmallIntegerField(default=0)
 
-    big_chances_home = models.IntegerField(default=0)
-    big_chances_away = models.IntegerField(default=0)
+    big_chances_home = models.PositiveSmallIntegerField(default=0)
+    big_chances_away = models.PositiveSmallIntegerField(default=0)
 
-    big_chances_missed_home = models.IntegerField(default=0)
-    big_chances_missed_away = models.IntegerField(default=0)
+    big_chances_missed_home = models.PositiveSmallIntegerField(default=0)
+    big_chances_missed_away = models.PositiveSmallIntegerField(default=0)
 
-    shots_inside_box_home = models.IntegerField(default=0)
-    shots_inside_box_away = models.IntegerField(default=0)
+    shots_inside_box_home = models.PositiveSmallIntegerField(default=0)
+    shots_inside_box_away = models.PositiveSmallIntegerField(default=0)
 
-    shots_outside_box_home = models.IntegerField(default=0)
-    shots_outside_box_away = models.IntegerField(default=0)
+    shots_outside_box_home = models.PositiveSmallIntegerField(default=0)
+    shots_outside_box_away = models.PositiveSmallIntegerField(default=0)
 
     # ======== DEFENSIVO ========
-    interceptions_home = models.IntegerField(default=0)
-    interceptions_away = models.IntegerField(default=0)
+    interceptions_home = models.PositiveSmallIntegerField(default=0)
+    interceptions_away = models.PositiveSmallIntegerField(default=0)
 
-    clearances_home = models.IntegerField(default=0)
-    clearances_away = models.IntegerField(default=0)
+    clearances_home = models.PositiveSmallIntegerField(default=0)
+    clearances_away = models.PositiveSmallIntegerField(default=0)
 
-    recoveries_home = models.IntegerField(default=0)
-    recoveries_away = models.IntegerField(default=0)
+    recoveries_home = models.PositiveSmallIntegerField(default=0)
+    recoveries_away = models.PositiveSmallIntegerField(default=0)
 
-    tackles_won_home = models.IntegerField(default=0)
-    tackles_won_away = models.IntegerField(default=0)
+    tackles_won_home = models.PositiveSmallIntegerField(default=0)
+    tackles_won_away = models.PositiveSmallIntegerField(default=0)
 
     # ======== GOALKEEPING ========
-    saves_home = models.IntegerField(default=0)
-    saves_away = models.IntegerField(default=0)
+    saves_home = models.PositiveSmallIntegerField(default=0)
+    saves_away = models.PositiveSmallIntegerField(default=0)
 
     goals_prevented_home = models.FloatField(default=0)
     goals_prevented_away = models.FloatField(default=0)
 
     # ======== DISCIPLINA ========
-    fouls_home = models.IntegerField(default=0)
-    fouls_away = models.IntegerField(default=0)
+    fouls_home = models.PositiveSmallIntegerField(default=0)
+    fouls_away = models.PositiveSmallIntegerField(default=0)
 
-    yellow_home = models.IntegerField(default=0)
-    yellow_away = models.IntegerField(default=0)
+    yellow_home = models.PositiveSmallIntegerField(default=0)
+    yellow_away = models.PositiveSmallIntegerField(default=0)
 
-    red_home = models.IntegerField(default=0)
-    red_away = models.IntegerField(default=0)
+    red_home = models.PositiveSmallIntegerField(default=0)
+    red_away = models.PositiveSmallIntegerField(default=0)
 
-    # ======== SCORE DINÂMICO ========
-    momentum_score = models.FloatField(default=0)
+    class Meta(BaseSnapshot.Meta):
+        pass
 
-    created_at = models.DateTimeField(auto_now_add=True)
 
-    ft_made_home = models.IntegerField(default=0)
-    ft_made_away = models.IntegerField(default=0)
+class BasketballSnapshot(BaseSnapshot):
+    """Snapshot de basquete (NBA)."""
 
-    fg2_made_home = models.IntegerField(default=0)
-    fg2_made_away = models.IntegerField(default=0)
+    points_home = models.PositiveSmallIntegerField(default=0)
+    points_away = models.PositiveSmallIntegerField(default=0)
 
-    fg3_made_home = models.IntegerField(default=0)
-    fg3_made_away = models.IntegerField(default=0)
+    ft_made_home = models.PositiveSmallIntegerField(default=0)
+    ft_made_away = models.PositiveSmallIntegerField(default=0)
 
-    fg_made_home = models.IntegerField(default=0)
-    fg_made_away = models.IntegerField(default=0)
+    fg2_made_home = models.PositiveSmallIntegerField(default=0)
+    fg2_made_away = models.PositiveSmallIntegerField(default=0)
 
-    rebounds_home = models.IntegerField(default=0)
-    rebounds_away = models.IntegerField(default=0)
+    fg3_made_home = models.PositiveSmallIntegerField(default=0)
+    fg3_made_away = models.PositiveSmallIntegerField(default=0)
 
-    off_reb_home = models.IntegerField(default=0)
-    off_reb_away = models.IntegerField(default=0)
+    fg_made_home = models.PositiveSmallIntegerField(default=0)
+    fg_made_away = models.PositiveSmallIntegerField(default=0)
 
-    def_reb_home = models.IntegerField(default=0)
-    def_reb_away = models.IntegerField(default=0)
+    rebounds_home = models.PositiveSmallIntegerField(default=0)
+    rebounds_away = models.PositiveSmallIntegerField(default=0)
 
-    assists_home = models.IntegerField(default=0)
-    assists_away = models.IntegerField(default=0)
+    off_reb_home = models.PositiveSmallIntegerField(default=0)
+    off_reb_away = models.PositiveSmallIntegerField(default=0)
 
-    turnovers_home = models.IntegerField(default=0)
-    turnovers_away = models.IntegerField(default=0)
+    def_reb_home = models.PositiveSmallIntegerField(default=0)
+    def_reb_away = models.PositiveSmallIntegerField(default=0)
 
-    steals_home = models.IntegerField(default=0)
-    steals_away = models.IntegerField(default=0)
+    assists_home = models.PositiveSmallIntegerField(default=0)
+    assists_away = models.PositiveSmallIntegerField(default=0)
 
-    blocks_home = models.IntegerField(default=0)
-    blocks_away = models.IntegerField(default=0)
+    turnovers_home = models.PositiveSmallIntegerField(default=0)
+    turnovers_away = models.PositiveSmallIntegerField(default=0)
 
-    fouls_home = models.IntegerField(default=0)
-    fouls_away = models.IntegerField(default=0)
+    steals_home = models.PositiveSmallIntegerField(default=0)
+    steals_away = models.PositiveSmallIntegerField(default=0)
+
+    blocks_home = models.PositiveSmallIntegerField(default=0)
+    blocks_away = models.PositiveSmallIntegerField(default=0)
 
-    max_run_home = models.IntegerField(default=0)
-    max_run_away = models.IntegerField(default=0)
+    fouls_home = models.PositiveSmallIntegerField(default=0)
+    fouls_away = models.PositiveSmallIntegerField(default=0)
 
-    biggest_lead_home = models.IntegerField(default=0)
-    biggest_lead_away = models.IntegerField(default=0)
+    max_run_home = models.PositiveSmallIntegerField(default=0)
+    max_run_away = models.PositiveSmallIntegerField(default=0)
+
+    biggest_lead_home = models.PositiveSmallIntegerField(default=0)
+    biggest_lead_away = models.PositiveSmallIntegerField(default=0)
 
     # tempo em segundos
-    time_leading_home = models.IntegerField(default=0)
-    time_leading_away = models.IntegerField(default=0)
+    time_leading_home = models.PositiveSmallIntegerField(default=0)
+    time_leading_away = models.PositiveSmallIntegerField(default=0)
+
+    class Meta(BaseSnapshot.Meta):
+        pass
+
+
+SNAPSHOT_MODELS = {
+    "football": LiveSnapshot,
+    "basketball": BasketballSnapshot,
+}
+
+
+def snapshot_bucket(minute):
+    """Minuto inicial do bucket de SNAPSHOT_BUCKET_MINUTES em que `minute` cai."""
+    return minute - minute % settings.SNAPSHOT_BUCKET_MINUTES
 
-    points_home = models.IntegerField(default=0)
-    points_away = models.IntegerField(default=0)
+
+def snapshot_model_for(sport):
+    """Tabela de snapshot usada pelo esporte (futebol é o padrão)."""
+    return SNAPSHOT_MODELS.get(sport, LiveSnapshot)
+
+
+class SnapshotArchive(models.Model):
+    """Série completa (resolução cheia) de snapshots exportada em Parquet."""
+
+    match = models.OneToOneField(
+        Match, on_delete=models.CASCADE, related_name="snapshot_archive"
+    )
+    path = models.CharField(max_length=500)
+    rows = models.IntegerField(default=0)
+    bucket_minutes = models.IntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive {self.match_id} ({self.rows} snapshots)"
+
+
+class LiveAnalysisQuerySet(models.QuerySet):
+    def latest_by_match(self, match_ids):
+        """{match_id: última versão da análise} de várias partidas em uma query."""
+        latest = (
+            self.model.objects.filter(match=models.OuterRef("pk"))
+            .order_by("-version")
+            .values("id")[:1]
+        )
+        latest_ids = (
+            Match.objects.filter(pk__in=match_ids)
+            .annotate(last_analysis_id=models.Subquery(latest))
+            .values("last_analysis_id")
+        )
+        return {item.match_id: item for item in self.filter(id__in=latest_ids)}
+
+
+class LiveAnalysis(models.Model):
+    """
+    Resultado de analyze_last_snapshots guardado por partida.
+
+    Cada análise diferente da anterior vira uma nova versão; views e SSE leem a
+    última em vez de recalcular.
+    """
+
+    match = models.ForeignKey(
+        Match, on_delete=models.CASCADE, related_name="live_analyses"
+    )
+    version = models.PositiveIntegerField()
+    minute = models.PositiveSmallIntegerField(default=0)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LiveAnalysisQuerySet.as_manager()
 
     class Meta:
-        ordering = ["minute"]
+        ordering = ["version"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["match", "version"], name="unique_live_analysis_version"
+            )
+        ]
+
+    def __str__(self):
+        return f"Análise {self.match_id} v{self.version}"
+
+    def payload(self):
+        """Análise como publicada no feed e devolvida pelas views."""
+        return {
+            **self.data,
+            "version": self.version,
+            "minute": self.minute,
+            "analyzed_at": self.created_at,
+        }
+
+
+class MatchStatLine(models.Model):
+    """
+    Uma estatística do SofaScore de um time numa partida (formato longo).
+
+    Preenchida na ingestão a partir de raw_statistics_json (jogos.stat_lines),
+    para as médias por time saírem de um AVG/MIN/MAX no banco em vez de
+    reabrir o JSON de cada jogo. `date` repete Match.date para o índice.
+    """
+
+    SIDE_CHOICES = [("home", "Mandante"), ("away", "Visitante")]
+
+    match = models.ForeignKey(
+        Match, on_delete=models.CASCADE, related_name="stat_lines"
+    )
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="stat_lines")
+    side = models.CharField(max_length=4, choices=SIDE_CHOICES)
+    period = models.CharField(max_length=10, default="ALL")
+    key = models.CharField(max_length=60)
+    value = models.FloatField()
+    date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["team", "key", "date"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["match", "side", "period", "key"],
+                name="unique_match_stat_line",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} {self.side} ({self.period}) {self.match_id}: {self.value}"
+
+
+class TeamForm(models.Model):
+    """
+    Somas das estatísticas do time nos últimos `window` jogos finalizados.
+
+    Atualizada por jogos.team_form quando uma partida do time é finalizada;
+    o preview lê uma linha por time em vez de agregar o histórico.
+    """
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="forms")
+    window = models.PositiveSmallIntegerField()
+    games = models.PositiveSmallIntegerField(default=0)
+    last_match_date = models.DateTimeField(null=True, blank=True)
+    # {key: {"for": soma, "for_games": n, "against": soma, "against_games": n}}
+    totals = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "window"], name="unique_team_form_window"
+            )
+        ]
+
+    def __str__(self):
+        return f"Forma {self.team_id} (últimos {self.window})"
+
+    def averages(self):
+        """{key: (média a favor, média contra)}, None onde não há jogos."""
+        return {
+            key: (
+                total["for"] / total["for_games"] if total["for_games"] else None,
+                (
+                    total["against"] / total["against_games"]
+                    if total["against_games"]
+                    else None
+                ),
+            )
+            for key, total in self.totals.items()
+        }
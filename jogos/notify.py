@@ -0,0 +1,25 @@
+from django.conf import settings
+
+
+def telegram_send(text: str):
+    token = settings.TELEGRAM_BOT_TOKEN
+    chat_id = settings.TELEGRAM_CHAT_ID
+    if not token or not chat_id:
+        print("Telegram não configurado (TELEGRAM_BOT_TOKEN/TELEGRAM_CHAT_ID).")
+        return
+
+    import requests
+
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+
+    payload = {
+        "chat_id": chat_id,
+        "text": text,
+        "parse_mode": "HTML",
+        "disable_web_page_preview": True,
+    }
+
+    try:
+        requests.post(url, json=payload, timeout=5)
+    except Exception as e:
+        print("Erro ao enviar mensagem para Telegram:", e)
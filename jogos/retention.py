@@ -0,0 +1,142 @@
+"""
+Retenção dos snapshots ao vivo (LiveSnapshot / BasketballSnapshot).
+
+Enquanto o jogo está ao vivo tudo fica no banco em resolução cheia (~1 linha a
+cada 30s). Depois de `finalizado`:
+
+- a série completa é exportada para Parquet (SNAPSHOT_ARCHIVE_DIR/<match_id>.parquet);
+- no banco fica apenas o último snapshot de cada bucket de
+  SNAPSHOT_DOWNSAMPLE_MINUTES minutos.
+
+`read_snapshots` junta as duas fontes de forma transparente para backtests.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, Max, OuterRef, Q
+
+from jogos.models import (
+    SNAPSHOT_MODELS,
+    LiveSnapshot,
+    Match,
+    SnapshotArchive,
+    snapshot_model_for,
+)
+
+
+def _require_pandas():
+    try:
+        import pandas as pd
+    except ImportError as exc:  # pragma: no cover - depende do ambiente
+        raise RuntimeError(
+            "pandas + pyarrow são necessários para o arquivo de snapshots."
+        ) from exc
+    return pd
+
+
+def snapshot_columns(model=LiveSnapshot):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def archive_path(match_id):
+    return Path(settings.SNAPSHOT_ARCHIVE_DIR) / f"{match_id}.parquet"
+
+
+def archive_match_snapshots(match, bucket_minutes=None):
+    """
+    Exporta a série completa da partida e reduz o banco a 1 snapshot por bucket.
+    Retorna quantas linhas foram removidas do banco.
+    """
+    pd = _require_pandas()
+    bucket_minutes = bucket_minutes or settings.SNAPSHOT_DOWNSAMPLE_MINUTES
+
+    columns = snapshot_columns(match.snapshot_model)
+    qs = match.snapshot_model.objects.filter(match=match)
+    rows = list(qs.order_by("minute", "created_at", "id").values(*columns))
+    if not rows:
+        return 0
+
+    path = archive_path(match.pk)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    frame.to_parquet(path, compression="zstd", index=False)
+
+    # último snapshot de cada bucket (os valores são acumulados no jogo)
+    keep_ids = (
+        qs.annotate(bucket=F("minute") / bucket_minutes)
+        .values("bucket")
+        .annotate(last_id=Max("id"))
+        .values_list("last_id", flat=True)
+    )
+
+    with transaction.atomic():
+        deleted, _ = qs.exclude(pk__in=list(keep_ids)).delete()
+        SnapshotArchive.objects.update_or_create(
+            match=match,
+            defaults={
+                "path": str(path),
+                "rows": len(rows),
+                "bucket_minutes": bucket_minutes,
+            },
+        )
+
+    return deleted
+
+
+def compact_finished_matches(limit=50, bucket_minutes=None):
+    """Arquiva as partidas finalizadas que ainda têm snapshots fora do Parquet."""
+    has_snapshots = Q()
+    for model in SNAPSHOT_MODELS.values():
+        has_snapshots |= Q(Exists(model.objects.filter(match=OuterRef("pk"))))
+
+    matches = (
+        Match.objects.filter(finalizado=True, snapshot_archive__isnull=True)
+        .filter(has_snapshots)
+        .order_by("date")[:limit]
+    )
+
+    archived = 0
+    for match in matches:
+        archive_match_snapshots(match, bucket_minutes=bucket_minutes)
+        archived += 1
+
+    return archived
+
+
+def read_snapshots(match, columns=None):
+    """
+    DataFrame com a série da partida em ordem cronológica.
+
+    Se existir arquivo, a resolução cheia vem dele (memory-mapped) e o banco só
+    completa as linhas gravadas depois da exportação.
+    """
+    pd = _require_pandas()
+    model = snapshot_model_for(match.sport)
+    columns = list(columns or snapshot_columns(model))
+    for required in ("id", "minute"):
+        if required not in columns:
+            columns.append(required)
+
+    qs = model.objects.filter(match=match)
+    archive = SnapshotArchive.objects.filter(match=match).first()
+
+    frames = []
+    if archive and Path(archive.path).exists():
+        archived = pd.read_parquet(archive.path, columns=columns, memory_map=True)
+        frames.append(archived)
+        if len(archived):
+            # ids são crescentes: o que ficou no banco até ali já está no arquivo
+            qs = qs.filter(id__gt=int(archived["id"].max()))
+
+    db_rows = list(qs.values(*columns))
+    if db_rows:
+        frames.append(pd.DataFrame.from_records(db_rows, columns=columns))
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return frame.sort_values(["minute", "id"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,64 @@
+"""
+Agenda de coleta por partida.
+
+Cada Match guarda em `next_poll_at` quando deve ser consultada de novo, de
+acordo com a fase do jogo:
+
+- pre_match: longe do início, uma vez por hora (horário/status podem mudar);
+- kickoff: a POLL_KICKOFF_MINUTES do início (ou atrasada), a cada poucos minutos;
+- live: em andamento, a cada 20-30s;
+- halftime: intervalo, mais devagar;
+- finished: finalizada/cancelada, sem coleta (next_poll_at = None).
+
+O beat só olha as partidas vencidas (`next_poll_at <= agora`), com índice em
+(finalizado, next_poll_at).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jogos.models import Match
+
+# status (Match.status) de partida em andamento
+LIVE_STATUSES = ("inprogress", "halftime")
+# status do SofaScore que encerram a coleta
+CLOSED_STATUSES = ("finished", "canceled", "postponed", "abandoned")
+
+
+def poll_phase(match, now=None):
+    now = now or timezone.now()
+    if match.finalizado or match.status in CLOSED_STATUSES:
+        return "finished"
+    if match.status == "halftime":
+        return "halftime"
+    if match.status == "inprogress":
+        return "live"
+    if match.date is None:
+        return "pre_match"
+    if match.date - now <= timedelta(minutes=settings.POLL_KICKOFF_MINUTES):
+        return "kickoff"
+    return "pre_match"
+
+
+def next_poll_at(match, now=None):
+    """Próxima coleta da partida, ou None quando não há mais o que buscar."""
+    now = now or timezone.now()
+    phase = poll_phase(match, now)
+    if phase == "finished":
+        return None
+
+    next_at = now + timedelta(seconds=settings.POLL_INTERVALS[phase])
+    if phase == "pre_match" and match.date is not None:
+        # não passa da entrada na janela de kickoff
+        kickoff_window = match.date - timedelta(minutes=settings.POLL_KICKOFF_MINUTES)
+        next_at = min(next_at, kickoff_window)
+    return next_at
+
+
+def due_matches(now=None):
+    now = now or timezone.now()
+    return Match.objects.filter(finalizado=False, next_poll_at__lte=now).only(
+        "sport", "date", "status", "finalizado", "next_poll_at", "external_id"
+    )
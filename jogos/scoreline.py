@@ -0,0 +1,147 @@
+"""
+Matriz de placares e mercados de gols a partir das médias de gols dos times.
+
+`score_matrix(λ mandante, λ visitante)` monta de uma vez a matriz
+P(mandante = i, visitante = j) com Poisson independentes e, com `rho`, a
+correção de Dixon–Coles nos placares baixos (0x0, 1x0, 0x1, 1x1). Todos os
+mercados (1X2, dupla chance, over/under, BTTS, totais por time, placar exato)
+saem da mesma matriz em `goal_markets`.
+
+As médias são arredondadas (RATE_DECIMALS) e as matrizes ficam em cache por
+(λm, λv, rho). `goal_markets_batch` recebe arrays de médias e monta uma matriz
+por par distinto, com o cálculo vetorizado.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+MAX_GOALS = 10
+RATE_DECIMALS = 2
+GOAL_LINES = (0.5, 1.5, 2.5, 3.5, 4.5, 5.5)
+TEAM_LINES = (0.5, 1.5, 2.5)
+CORRECT_SCORE_GOALS = 5
+
+
+def poisson_pmf(rates, max_goals=MAX_GOALS):
+    """P(X = 0..max_goals) para cada média; shape (..., max_goals + 1)."""
+    rates = np.asarray(rates, dtype=float)[..., None]
+    goals = np.arange(1, max_goals + 1)
+    # p_k = p_{k-1} * λ / k, sem fatorial
+    steps = np.concatenate([np.ones(rates.shape), rates / goals], axis=-1)
+    return np.exp(-rates) * np.cumprod(steps, axis=-1)
+
+
+def build_matrices(lam_home, lam_away, rho=0.0, max_goals=MAX_GOALS):
+    """Matrizes (..., G, G) de placares, normalizadas para somar 1."""
+    lam_home = np.asarray(lam_home, dtype=float)
+    lam_away = np.asarray(lam_away, dtype=float)
+    matrices = (
+        poisson_pmf(lam_home, max_goals)[..., :, None]
+        * poisson_pmf(lam_away, max_goals)[..., None, :]
+    )
+
+    if rho:
+        # Dixon–Coles: ajusta a dependência nos placares baixos
+        matrices[..., 0, 0] *= 1 - lam_home * lam_away * rho
+        matrices[..., 0, 1] *= 1 + lam_home * rho
+        matrices[..., 1, 0] *= 1 + lam_away * rho
+        matrices[..., 1, 1] *= 1 - rho
+        matrices = np.clip(matrices, 0, None)
+
+    return matrices / matrices.sum(axis=(-2, -1), keepdims=True)
+
+
+@lru_cache(maxsize=4096)
+def _cached_matrix(lam_home, lam_away, rho, max_goals):
+    matrix = build_matrices(lam_home, lam_away, rho, max_goals)
+    matrix.setflags(write=False)
+    return matrix
+
+
+def score_matrix(lam_home, lam_away, rho=0.0, max_goals=MAX_GOALS):
+    """Matriz P(i x j) de uma partida (somente leitura, em cache)."""
+    return _cached_matrix(
+        round(max(float(lam_home), 0.0), RATE_DECIMALS),
+        round(max(float(lam_away), 0.0), RATE_DECIMALS),
+        float(rho),
+        max_goals,
+    )
+
+
+def goal_markets(matrix):
+    """
+    Mercados lidos da matriz. Aceita (G, G) ou um lote (N, G, G); cada valor é
+    uma probabilidade (float, ou array de N).
+    """
+    matrix = np.asarray(matrix)
+    size = matrix.shape[-1]
+    home_goals, away_goals = np.indices((size, size))
+    totals = home_goals + away_goals
+
+    def total(mask):
+        return (matrix * mask).sum(axis=(-2, -1))
+
+    home_marginal = matrix.sum(axis=-1)
+    away_marginal = matrix.sum(axis=-2)
+
+    home_win = total(home_goals > away_goals)
+    draw = total(home_goals == away_goals)
+    away_win = total(home_goals < away_goals)
+
+    markets = {
+        "home": home_win,
+        "draw": draw,
+        "away": away_win,
+        "home_or_draw": home_win + draw,
+        "draw_or_away": draw + away_win,
+        "home_or_away": home_win + away_win,
+        "btts": total((home_goals > 0) & (away_goals > 0)),
+    }
+    for line in GOAL_LINES:
+        over = total(totals > line)
+        markets[f"over_{line}".replace(".", "_")] = over
+        markets[f"under_{line}".replace(".", "_")] = 1 - over
+    for line in TEAM_LINES:
+        suffix = str(line).replace(".", "_")
+        markets[f"home_over_{suffix}"] = home_marginal[..., int(line) + 1 :].sum(-1)
+        markets[f"away_over_{suffix}"] = away_marginal[..., int(line) + 1 :].sum(-1)
+
+    shown = min(CORRECT_SCORE_GOALS, size - 1) + 1
+    markets["correct_score"] = {
+        f"{i}-{j}": matrix[..., i, j] for i in range(shown) for j in range(shown)
+    }
+    best = matrix.reshape(matrix.shape[:-2] + (-1,)).argmax(axis=-1)
+    markets["most_likely_score"] = np.char.add(
+        np.char.add((best // size).astype(str), "-"), (best % size).astype(str)
+    )
+    if markets["most_likely_score"].ndim == 0:
+        markets["most_likely_score"] = str(markets["most_likely_score"])
+    return markets
+
+
+def goal_markets_batch(lam_home, lam_away, rho=0.0, max_goals=MAX_GOALS):
+    """
+    goal_markets para arrays de médias; uma matriz por par distinto de médias
+    arredondadas, devolvida já expandida para a ordem de entrada.
+    """
+    rates = np.round(
+        np.clip(
+            np.column_stack(
+                [np.asarray(lam_home, dtype=float), np.asarray(lam_away, dtype=float)]
+            ),
+            0,
+            None,
+        ),
+        RATE_DECIMALS,
+    )
+    unique, inverse = np.unique(rates, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    markets = goal_markets(build_matrices(unique[:, 0], unique[:, 1], rho, max_goals))
+
+    def expand(value):
+        if isinstance(value, dict):
+            return {key: expand(item) for key, item in value.items()}
+        return value[inverse]
+
+    return expand(markets)
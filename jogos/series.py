@@ -0,0 +1,164 @@
+"""
+Série temporal de uma partida em arrays NumPy.
+
+Carrega todos os snapshots de futebol da partida com um único `values_list` e
+calcula de forma vetorizada o que antes era feito snapshot a snapshot:
+deltas por intervalo, momentum (mesmos pesos de `SofaScore.calculate_momentum`),
+taxas móveis de xG/finalizações e janelas de pressão.
+"""
+
+import numpy as np
+from django.db import models
+
+from jogos.models import LiveSnapshot
+
+# mesmos pesos de SofaScore.calculate_momentum
+MOMENTUM_WEIGHTS = {
+    "xg": 120,
+    "shots_on": 15,
+    "touches_box": 3,
+    "final_third_entries": 2,
+    "possession": 0.4,
+}
+
+SIDE_FIELDS = [
+    "xg",
+    "shots_on",
+    "shots_total",
+    "corners",
+    "possession",
+    "touches_box",
+    "final_third_entries",
+    "big_chances",
+    "fouls",
+    "yellow",
+]
+
+SERIES_FIELDS = ["id", "minute", "momentum_score"] + [
+    f"{field}_{side}" for field in SIDE_FIELDS for side in ("home", "away")
+]
+
+# janela (minutos) das taxas móveis e da regra de pressão
+ROLLING_MINUTES = 10
+
+# colunas calculadas a partir da série, por lado
+DERIVED_FIELDS = {
+    f"{name}_{side}"
+    for name in ("xg_rate", "shots_rate", "pressure")
+    for side in ("home", "away")
+}
+
+INTEGER_FIELDS = {
+    field
+    for field in SERIES_FIELDS
+    if not isinstance(LiveSnapshot._meta.get_field(field), models.FloatField)
+}
+
+
+class MatchSeries:
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def load(cls, match, since_minute=None, since_id=None):
+        qs = LiveSnapshot.objects.filter(match=match)
+        if since_minute is not None:
+            qs = qs.filter(minute__gte=since_minute)
+        if since_id is not None:
+            # inclui a própria linha: o bucket atual é atualizado no lugar
+            qs = qs.filter(id__gte=since_id)
+        rows = list(qs.order_by("minute", "id").values_list(*SERIES_FIELDS))
+        return cls.from_rows(rows)
+
+    @classmethod
+    def from_window(cls, window):
+        """Série a partir da janela ao vivo em cache (RollingWindow), sem query."""
+        return cls.from_rows(
+            [
+                tuple(getattr(item, field) for field in SERIES_FIELDS)
+                for item in window.items
+            ]
+        )
+
+    @classmethod
+    def from_rows(cls, rows):
+        if rows:
+            data = np.array(rows, dtype=np.float64)
+        else:
+            data = np.empty((0, len(SERIES_FIELDS)), dtype=np.float64)
+        return cls({field: data[:, index] for index, field in enumerate(SERIES_FIELDS)})
+
+    def __len__(self):
+        return len(self.columns["minute"])
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def tolist(self, field, mask=None):
+        """Coluna pronta para JSON (contadores voltam a ser int)."""
+        values = self.columns[field]
+        if mask is not None:
+            values = values[mask]
+        if field in INTEGER_FIELDS:
+            values = values.astype(np.int64)
+        return values.tolist()
+
+    def derived(self, field, mask=None):
+        """Coluna de DERIVED_FIELDS (xg_rate_*, shots_rate_*, pressure_*)."""
+        name, side = field.rsplit("_", 1)
+        if name == "xg_rate":
+            values = self.rolling_rate(f"xg_{side}")
+        elif name == "shots_rate":
+            values = self.rolling_rate(f"shots_total_{side}")
+        else:
+            values = self.pressure(side)
+        if mask is not None:
+            values = values[mask]
+        return values.tolist()
+
+    def deltas(self, field):
+        """Variação de cada snapshot em relação ao anterior (o primeiro é 0)."""
+        values = self.columns[field]
+        return np.diff(values, prepend=values[:1])
+
+    def momentum(self, side="home"):
+        """Momentum de cada snapshot, idêntico ao de calculate_momentum."""
+        total = np.zeros(len(self))
+        for field, weight in MOMENTUM_WEIGHTS.items():
+            total += np.maximum(self.deltas(f"{field}_{side}"), 0) * weight
+        return total
+
+    def _window_start(self, minutes):
+        """Índice do primeiro snapshot dentro dos últimos `minutes` de cada linha."""
+        minute = self.columns["minute"]
+        return np.searchsorted(minute, minute - minutes, side="left")
+
+    def rolling_delta(self, field, minutes=ROLLING_MINUTES):
+        values = self.columns[field]
+        return values - values[self._window_start(minutes)]
+
+    def rolling_rate(self, field, minutes=ROLLING_MINUTES):
+        """Quanto `field` cresceu por minuto nos últimos `minutes` minutos."""
+        minute = self.columns["minute"]
+        elapsed = minute - minute[self._window_start(minutes)]
+        delta = self.rolling_delta(field, minutes)
+        return np.divide(delta, elapsed, out=np.zeros_like(delta), where=elapsed > 0)
+
+    def pressure(self, side="home", minutes=ROLLING_MINUTES, xg=0.20, shots_on=2):
+        """Mesma regra de pressão do analyze_last_snapshots, ponto a ponto."""
+        return (self.rolling_delta(f"xg_{side}", minutes) >= xg) | (
+            self.rolling_delta(f"shots_on_{side}", minutes) >= shots_on
+        )
+
+    def pressure_windows(self, side="home", minutes=ROLLING_MINUTES):
+        """Trechos contínuos de pressão como [(minuto_inicial, minuto_final)]."""
+        flags = self.pressure(side, minutes).astype(np.int8)
+        if not len(flags):
+            return []
+        edges = np.diff(np.concatenate(([0], flags, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        minute = self.columns["minute"]
+        return [
+            (int(minute[start]), int(minute[end])) for start, end in zip(starts, ends)
+        ]
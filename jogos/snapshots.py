@@ -0,0 +1,97 @@
+"""
+Escrita dos snapshots ao vivo em lote.
+
+Cada poll gera no máximo um upsert por partida no bucket de minuto atual
+(unique match+minute), e só quando alguma estatística mudou; se nada mudou o
+último snapshot só recebe `last_seen_at`. As escritas
+ficam no buffer e vão para o banco em `bulk_create`/`bulk_update` a cada
+SNAPSHOT_FLUSH_SIZE partidas (e no `flush` final); depois do commit (o da
+transação mais externa, se o writer roda dentro de uma) os snapshots novos
+entram na janela deslizante da partida e são publicados no feed ao vivo
+(jogos.live_feed).
+"""
+
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from jogos.live_feed import publish
+from jogos.live_window import push_snapshots, snapshot_payload
+from jogos.models import Match
+
+
+def assign_ids(model, snapshots):
+    """
+    Preenche o pk dos snapshots do upsert ({(match_id, minute): snapshot}).
+
+    No Django 4.2 o bulk_create com update_conflicts não devolve os ids; a
+    janela e o feed precisam deles, então são relidos numa query.
+    """
+    rows = model.objects.filter(
+        match__in={match_id for match_id, _ in snapshots},
+        minute__in={minute for _, minute in snapshots},
+    ).values_list("match_id", "minute", "id")
+    for match_id, minute, pk in rows:
+        snapshot = snapshots.get((match_id, minute))
+        if snapshot is not None:
+            snapshot.pk = pk
+
+
+def publish_snapshots(snapshots):
+    for snapshot in snapshots:
+        publish(snapshot.match_id, "snapshot", snapshot_payload(snapshot))
+
+
+class SnapshotWriter:
+    def __init__(self, flush_size=None):
+        self.flush_size = flush_size or settings.SNAPSHOT_FLUSH_SIZE
+        self.new_snapshots = {}
+        self.seen_ids = {}
+        self.changed_matches = []
+        self.pending = 0
+
+    def add(self, snapshot):
+        # dois polls no mesmo bucket antes do flush: vale o mais recente
+        rows = self.new_snapshots.setdefault(type(snapshot), {})
+        rows[(snapshot.match_id, snapshot.minute)] = snapshot
+        self._tick()
+
+    def touch(self, snapshot):
+        self.seen_ids.setdefault(type(snapshot), []).append(snapshot.pk)
+        self._tick()
+
+    def save_stats_json(self, match):
+        self.changed_matches.append(match)
+
+    def _tick(self):
+        self.pending += 1
+        if self.pending >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        now = timezone.now()
+        with transaction.atomic():
+            for model, snapshots in self.new_snapshots.items():
+                model.objects.bulk_create(
+                    snapshots.values(),
+                    update_conflicts=True,
+                    unique_fields=["match", "minute"],
+                    update_fields=model.upsert_fields(),
+                )
+                assign_ids(model, snapshots)
+                # janela e feed só veem o que foi de fato gravado (a escrita pode
+                # estar dentro da transação de quem chamou)
+                rows = list(snapshots.values())
+                transaction.on_commit(partial(push_snapshots, rows))
+                transaction.on_commit(partial(publish_snapshots, rows))
+            for model, ids in self.seen_ids.items():
+                model.objects.filter(pk__in=ids).update(last_seen_at=now)
+            if self.changed_matches:
+                Match.objects.bulk_update(self.changed_matches, ["stats_json"])
+
+        self.new_snapshots = {}
+        self.seen_ids = {}
+        self.changed_matches = []
+        self.pending = 0
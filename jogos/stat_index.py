@@ -0,0 +1,93 @@
+"""
+Índice das estatísticas do SofaScore (endpoint /event/{id}/statistics).
+
+O payload vem como statistics[período].groups[].statisticsItems[]. Em vez de
+varrer todos os grupos a cada chave pedida, `stat_index` percorre os itens uma
+única vez e devolve {(período, key): (homeValue, awayValue)}; cada consulta
+depois é um lookup no dict.
+
+Quem consulta várias chaves do mesmo payload monta o índice uma vez
+(`index = stat_index(payload)`) e passa o índice para stat_pair/raw_stat/
+period_stats no lugar do payload; o texto JSON é memoizado pelo conteúdo. Um
+dict não é memoizado: ele pode ser alterado entre os polls e validar o
+conteúdo custa tanto quanto reindexar.
+
+Valor não numérico em stat_pair vira `default`, com aviso no log.
+"""
+
+import json
+import logging
+from functools import lru_cache
+
+STATS_CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+
+class StatIndex(dict):
+    """{(período, key): (home, away)}; aceito no lugar do payload nas consultas."""
+
+
+def build_stat_index(payload):
+    """{(período, key): (home, away)} em uma passada; vale a primeira ocorrência."""
+    index = StatIndex()
+    if not isinstance(payload, dict):
+        return index
+    for block in payload.get("statistics") or []:
+        period = block.get("period")
+        for group in block.get("groups") or []:
+            for item in group.get("statisticsItems") or []:
+                index.setdefault(
+                    (period, item.get("key")),
+                    (item.get("homeValue"), item.get("awayValue")),
+                )
+    return index
+
+
+@lru_cache(maxsize=STATS_CACHE_SIZE)
+def _text_index(text):
+    try:
+        return build_stat_index(json.loads(text))
+    except ValueError:
+        return StatIndex()
+
+
+def stat_index(payload):
+    """
+    Índice do payload (dict, texto JSON ou um StatIndex já montado). O índice
+    do texto é compartilhado: não altere o retorno.
+    """
+    if isinstance(payload, StatIndex):
+        return payload
+    if not payload:
+        return StatIndex()
+    if isinstance(payload, (str, bytes)):
+        return _text_index(payload)
+    return build_stat_index(payload)
+
+
+def period_stats(payload, period="ALL"):
+    """{key: (home, away)} de um período."""
+    return {
+        key: values for (p, key), values in stat_index(payload).items() if p == period
+    }
+
+
+def raw_stat(payload, key, period="ALL"):
+    """(homeValue, awayValue) como vieram no JSON; (None, None) se não existe."""
+    return stat_index(payload).get((period, key), (None, None))
+
+
+def stat_pair(payload, key, period="ALL", default=0.0):
+    """(home, away) em float; `default` se a chave não existe ou não é numérica."""
+    home, away = raw_stat(payload, key, period)
+    try:
+        return (
+            float(default if home is None else home),
+            float(default if away is None else away),
+        )
+    except (TypeError, ValueError):
+        logger.warning(
+            "Estatística %s (%s) não numérica: %r x %r", key, period, home, away
+        )
+        return default, default
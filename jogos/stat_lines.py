@@ -0,0 +1,88 @@
+"""
+Linhas de estatística por time e partida (MatchStatLine).
+
+`sync_stat_lines` transforma o raw_statistics_json de cada partida em uma linha
+por (lado, período, key) com valor numérico; roda na ingestão
+(save_sofascore_data) e no backfill (manage.py backfill_stat_lines).
+
+`team_stat_summary` e `team_for_against` agregam essas linhas no banco, com
+AVG/MIN/MAX/COUNT, no lugar de reparsear o JSON dos jogos a cada request.
+"""
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
+
+from jogos.models import MatchStatLine
+from jogos.stat_index import stat_index
+
+
+def build_stat_lines(match):
+    """MatchStatLine (não salvas) com os valores numéricos da partida."""
+    teams = {"home": match.home_team_id, "away": match.away_team_id}
+    lines = []
+    for (period, key), values in stat_index(match.raw_statistics_json).items():
+        if not period or not key:
+            continue
+        for side, value in zip(("home", "away"), values):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(
+                MatchStatLine(
+                    match_id=match.pk,
+                    team_id=teams[side],
+                    side=side,
+                    period=period,
+                    key=key,
+                    value=value,
+                    date=match.date,
+                )
+            )
+    return lines
+
+
+def sync_stat_lines(matches):
+    """Regrava as linhas das partidas; retorna quantas linhas foram criadas."""
+    matches = list(matches)
+    lines = [line for match in matches for line in build_stat_lines(match)]
+    with transaction.atomic():
+        MatchStatLine.objects.filter(match__in=[match.pk for match in matches]).delete()
+        MatchStatLine.objects.bulk_create(lines, batch_size=1000)
+    return len(lines)
+
+
+def team_stat_summary(team, matches=None, period="ALL"):
+    """
+    {key: {"avg", "min", "max", "games"}} do time, em uma query.
+
+    `matches` limita às partidas (ex.: as últimas N, já fatiadas).
+    """
+    lines = MatchStatLine.objects.filter(team=team, period=period)
+    if matches is not None:
+        lines = lines.filter(match__in=matches)
+
+    rows = lines.values("key").annotate(
+        avg=Avg("value"), min=Min("value"), max=Max("value"), games=Count("id")
+    )
+    return {
+        row["key"]: {
+            "avg": round(row["avg"], 2),
+            "min": row["min"],
+            "max": row["max"],
+            "games": row["games"],
+        }
+        for row in rows
+    }
+
+
+def team_for_against(team, matches, keys, period="ALL"):
+    """{key: (média a favor, média contra)} nas partidas dadas, em uma query."""
+    rows = (
+        MatchStatLine.objects.filter(match__in=matches, period=period, key__in=keys)
+        .values("key")
+        .annotate(
+            own=Avg("value", filter=Q(team=team)),
+            opp=Avg("value", filter=~Q(team=team)),
+        )
+    )
+    averages = {row["key"]: (row["own"], row["opp"]) for row in rows}
+    return {key: averages.get(key, (None, None)) for key in keys}
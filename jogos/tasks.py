@@ -1,43 +1,69 @@
-from datetime import timedelta
+import time
 
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 
-from get_events import SofaScore
+from bet.teams.analysis_cache import invalidate_team_analysis
+from bet.utils import evaluate_match_models
 
-from .models import Match
+from .finalize import finalize_matches
+from .live_analysis import record_live_analysis
+from .locks import (
+    BOARD_KEY,
+    acquire,
+    acquire_matches,
+    ingest_key,
+    release,
+    release_matches,
+)
+from .models import Match, RunningToday
+from .notify import telegram_send
+from .retention import compact_finished_matches
+from .scheduling import LIVE_STATUSES, due_matches, next_poll_at
+from .team_form import update_team_forms
 
 # from django.forms.models import model_to_dict # Geralmente não precisamos disso no celery, a menos que vá salvar em log JSON
 
 
+def sofascore_client(*args):
+    """
+    SofaScore importado no primeiro uso: get_events (requests etc.) é pesado e
+    os workers de notify/analysis nunca precisam dele.
+    """
+    from get_events import SofaScore
+
+    return SofaScore(*args)
+
+
 @shared_task
 def process_match_snapshot(event_id):
     """
     Esta tarefa faz o trabalho pesado: busca stats e analisa.
     Substitui a lógica interna da sua view.
     """
+    # já tem coleta dessa partida em curso: não duplica a chamada
+    if not acquire_matches([event_id]):
+        return "Skipped"
+
     try:
         match = Match.objects.get(id=event_id)
+        sofascore = sofascore_client()
 
         # 1. Busca os dados (Snapshot)
-        snapshot = SofaScore().get_stats(event_id)
+        snapshot = sofascore.get_stats(matches=[match])
 
         if snapshot is None:
             print(f"Erro: Nenhum snapshot criado para a match {event_id}")
             return "No snapshot"
 
-        # 2. Realiza a análise
-        analysis_live = SofaScore().analyze_last_snapshots(match, window=10)
-
-        # 3. O QUE FAZER COM OS DADOS?
-        # No Celery você não retorna JsonResponse. Você deve SALVAR no banco ou enviar notificação.
-        # Exemplo: Atualizar o objeto Match ou salvar um novo registro de Log
+        # 2. Realiza a análise, grava a versão e avisa as páginas abertas
+        analysis_live = sofascore.analyze_last_snapshots(match, window=10)
+        analysis = record_live_analysis(
+            match, analysis_live, minute=match.current_minute
+        )
 
-        # Exemplo hipotético de salvamento:
-        # match.last_analysis = analysis_live
-        # match.save()
-
-        print(f"Sucesso: Match {event_id} analisada. Dados: {analysis_live}")
+        print(f"Sucesso: Match {event_id} analisada (v{analysis.version}).")
         return "Success"
 
     except Match.DoesNotExist:
@@ -46,30 +72,198 @@ def process_match_snapshot(event_id):
         print(f"Erro na task da match {event_id}: {str(e)}")
         # Opcional: Re-raise para o Celery tentar novamente se configurado
         # raise e
+    finally:
+        release_matches([event_id])
 
 
 @shared_task
-def dispatch_todays_matches():
+def process_match_batch(match_ids, events=None):
     """
-    Esta tarefa busca as partidas e dispara o processamento para cada uma.
-    Critérios: Hoje, Não finalizada, Horário > Agora.
+    Snapshot + análise de um lote de partidas numa única task.
+
+    Um cliente SofaScore (sessão e token) para o lote todo, requisições
+    concorrentes e os snapshots gravados numa transação só (get_stats).
+    `events` ({match_id: evento da listagem}) dispensa o GET /event/{id}.
+    Os leases das partidas foram pegos em dispatch_batches e são soltos aqui.
+    """
+    try:
+        # ids viram string na serialização JSON do broker
+        events = {int(pk): event for pk, event in (events or {}).items()}
+        matches = list(Match.objects.filter(pk__in=match_ids, finalizado=False))
+        if not matches:
+            return 0
+
+        sofascore = sofascore_client()
+        sofascore.get_stats(events=events, matches=matches)
+        for match in matches:
+            record_live_analysis(
+                match,
+                sofascore.analyze_last_snapshots(match),
+                minute=match.current_minute,
+            )
+        return len(matches)
+    finally:
+        release_matches(match_ids)
+
+
+def dispatch_batches(events):
+    """
+    Divide {match_id: evento} em tasks de até LIVE_BATCH_SIZE partidas.
+
+    Partidas com coleta ainda na fila ou rodando ficam de fora; retorna
+    quantas foram puladas.
+    """
+    match_ids = acquire_matches(list(events))
+    size = settings.LIVE_BATCH_SIZE
+    for start in range(0, len(match_ids), size):
+        batch = match_ids[start : start + size]
+        process_match_batch.delay(batch, {pk: events[pk] for pk in batch})
+    return len(events) - len(match_ids)
+
+
+@shared_task
+def dispatch_due_matches():
+    """
+    Tick do agendador: só as partidas com next_poll_at vencido.
+
+    As ao vivo são cobertas por um único poll_live_board (uma listagem por
+    esporte); as de pré-jogo/kickoff vão em lote para refresh_match_states.
+    Cada partida despachada já sai reagendada conforme a fase. Se o tick
+    anterior (ou o refresh da partida) ainda não terminou, não enfileira outro.
     """
     now = timezone.now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = now.replace(hour=23, minute=59, second=59, microsecond=999)
+    due = list(due_matches(now))
+    if not due:
+        return {"live": 0, "refresh": 0, "skipped": 0}
+
+    live = [match for match in due if match.status in LIVE_STATUSES]
+    others = [match.pk for match in due if match.status not in LIVE_STATUSES]
+
+    for match in due:
+        match.next_poll_at = next_poll_at(match, now)
+    Match.objects.bulk_update(due, ["next_poll_at"])
+
+    skipped = 0
+    if live:
+        if acquire([BOARD_KEY]):
+            poll_live_board.delay()
+        else:
+            skipped += len(live)
+
+    refresh = acquire_matches(others)
+    skipped += len(others) - len(refresh)
+    if refresh:
+        refresh_match_states.delay(refresh)
+
+    return {"live": len(live), "refresh": len(refresh), "skipped": skipped}
+
+
+@shared_task
+def refresh_match_states(match_ids):
+    """Atualiza status/horário das partidas ainda fora do ar e reagenda."""
+    try:
+        matches = Match.objects.filter(pk__in=match_ids, finalizado=False)
+        return sofascore_client().refresh_match_states(matches)
+    finally:
+        release_matches(match_ids)
+
+
+@shared_task
+def poll_live_board():
+    """Um tick do placar ao vivo: 1 listagem por esporte + lotes dos que mudaram."""
+    try:
+        result = sofascore_client().poll_live_board(dispatch=dispatch_batches)
+    finally:
+        release([BOARD_KEY])
+    print(f"Live board: {result}")
+    return result
 
-    # Filtrando as partidas
-    matches = Match.objects.filter(
-        date__date=now.date(),  # Era 'start_time', seu model usa 'date'
-        finalizado=False,  # Era 'finished', seu model usa 'finalizado'
-    )
 
-    if not matches.exists():
-        print("Nenhuma partida encontrada nos critérios.")
-        return
+@shared_task
+def ingest_events(dates):
+    """
+    Busca e salva os eventos das datas ("YYYY-MM-DD"), diário ou backfill.
 
-    print(f"Encontradas {matches.count()} partidas para processar.")
+    Enfileirada por `queue_ingest` (dashboard e manage.py ingest_events), que
+    pega o lease de cada data; marca as datas em RunningToday e solta os leases.
+    """
+    try:
+        sofascore_client(dates).get_events()
+        for day in dates:
+            RunningToday.objects.update_or_create(data=day, defaults={"rodou": True})
+    finally:
+        release(ingest_key(day) for day in dates)
+    return len(dates)
+
+
+def queue_ingest(dates):
+    """
+    Enfileira ingest_events (fila ingest) para as datas sem busca em curso.
+    Retorna as datas enfileiradas.
+    """
+    keys = acquire([ingest_key(day) for day in dates], settings.INGEST_LOCK_TTL)
+    queued = [day for day in dates if ingest_key(day) in keys]
+    if queued:
+        ingest_events.delay(queued)
+    return queued
+
+
+@shared_task
+def evaluate_matches(match_ids):
+    """Roda os modelos V3.1/V3.2 e avalia as partidas (ação do admin)."""
+    # o admin importa as tasks; aqui a importação fica para a execução
+    from jogos.admin import gerar_analise_v3, gerar_analise_v3_2
+
+    evaluated = 0
+    for match in Match.objects.filter(pk__in=match_ids):
+        evaluate_match_models(match, gerar_analise_v3(match), gerar_analise_v3_2(match))
+        evaluated += 1
+    return evaluated
+
+
+@shared_task
+def send_telegram(text):
+    telegram_send(text)
 
-    for match in matches:
-        # Dispara a tarefa assíncrona para cada jogo
-        process_match_snapshot.delay(match.id)
+
+@shared_task
+def loadtest_probe(sent_at):
+    """Latência (s) entre o enfileiramento e a execução numa fila (loadtest_queues)."""
+    return time.time() - sent_at
+
+
+@shared_task
+def loadtest_backfill(seconds):
+    """Simula uma task de backfill ocupando o worker (loadtest_queues)."""
+    time.sleep(seconds)
+    return seconds
+
+
+@shared_task
+def finalize_stale_matches():
+    """Finaliza partidas paradas e duplicadas com UPDATEs por conjunto."""
+    return finalize_matches()
+
+
+@shared_task
+def refresh_team_forms(team_ids):
+    """Recalcula a TeamForm dos times e descarta a análise deles em cache."""
+    forms = update_team_forms(team_ids)
+    invalidate_team_analysis(team_ids)
+    return forms
+
+
+def queue_team_forms(team_ids):
+    """Enfileira refresh_team_forms em lotes de TEAM_FORM_BATCH_SIZE times."""
+    team_ids = sorted(team_ids)
+    size = settings.TEAM_FORM_BATCH_SIZE
+    for start in range(0, len(team_ids), size):
+        refresh_team_forms.delay(team_ids[start : start + size])
+
+
+@shared_task
+def compact_finished_snapshots():
+    """Arquiva em Parquet e reduz no banco os snapshots de jogos finalizados."""
+    archived = compact_finished_matches()
+    print(f"{archived} partidas com snapshots arquivados.")
+    return archived
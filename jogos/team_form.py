@@ -0,0 +1,83 @@
+"""
+Forma recente dos times (TeamForm) mantida a cada partida finalizada.
+
+Quando uma partida vira `finalizado`, só os dois times dela são recalculados:
+as linhas (MatchStatLine) dos últimos max(TEAM_FORM_WINDOWS) jogos de cada um
+são somadas uma vez e cortadas em cada janela. O preview lê a TeamForm do
+time (uma query pelo índice de (team, window)) em vez de agregar o histórico.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Q
+
+from bet.teams.analytics import PROFILE_KEYS
+from jogos.models import Match, MatchStatLine, TeamForm
+
+
+def teams_of(matches):
+    return {
+        team for match in matches for team in (match.home_team_id, match.away_team_id)
+    }
+
+
+def window_totals(team_id, match_ids, lines):
+    """Somas a favor/contra por key nas partidas `match_ids`."""
+    totals = {}
+    for match_id in match_ids:
+        for line_team, key, value in lines.get(match_id, ()):
+            total = totals.setdefault(
+                key, {"for": 0.0, "for_games": 0, "against": 0.0, "against_games": 0}
+            )
+            side = "for" if line_team == team_id else "against"
+            total[side] += value
+            total[f"{side}_games"] += 1
+    return totals
+
+
+def update_team_forms(team_ids):
+    """Recalcula as janelas dos times; retorna quantas TeamForm foram gravadas."""
+    windows = settings.TEAM_FORM_WINDOWS
+    forms = []
+    for team_id in set(team_ids):
+        recent = list(
+            Match.objects.filter(
+                Q(home_team_id=team_id) | Q(away_team_id=team_id), finalizado=True
+            )
+            .order_by("-date")
+            .values_list("pk", "date")[: max(windows)]
+        )
+
+        lines = defaultdict(list)
+        for match_id, line_team, key, value in MatchStatLine.objects.filter(
+            match__in=[pk for pk, _ in recent], period="ALL", key__in=PROFILE_KEYS
+        ).values_list("match_id", "team_id", "key", "value"):
+            lines[match_id].append((line_team, key, value))
+
+        for window in windows:
+            in_window = recent[:window]
+            forms.append(
+                TeamForm(
+                    team_id=team_id,
+                    window=window,
+                    games=len(in_window),
+                    last_match_date=in_window[0][1] if in_window else None,
+                    totals=window_totals(team_id, [pk for pk, _ in in_window], lines),
+                )
+            )
+
+    TeamForm.objects.bulk_create(
+        forms,
+        update_conflicts=True,
+        unique_fields=["team", "window"],
+        update_fields=["games", "last_match_date", "totals", "updated_at"],
+    )
+    return len(forms)
+
+
+def update_finalized_forms(matches):
+    """Atualiza a forma dos times das partidas finalizadas da lista."""
+    finalized = [match for match in matches if match.finalizado]
+    if finalized:
+        update_team_forms(teams_of(finalized))
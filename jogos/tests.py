@@ -1,3 +1,792 @@
-from django.test import TestCase
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from bet.teams.analysis_cache import team_analysis_key
+from bet.teams.analytics import (
+    match_preview,
+    recent_matches,
+    team_form_profile,
+    team_profile,
+)
+from bet.teams.bet_preview import bet_recommendations
+from bet.utils import SofaStatParser
+from core.celery import app as celery_app
+from get_events import BASE, SofaScore
+from jogos.admin import MatchAdmin
+from jogos.finalize import finalize_matches
+from jogos.live_analysis import record_live_analysis
+from jogos.live_window import (
+    RollingWindow,
+    get_window,
+    push_snapshots,
+    window_key,
+    window_lock_key,
+)
+from jogos.locks import skipped_count
+from jogos.management.commands.importtime import STARTUP_CODE
+from jogos.models import (
+    BasketballSnapshot,
+    League,
+    LiveAnalysis,
+    LiveSnapshot,
+    Match,
+    Season,
+    Team,
+    TeamForm,
+)
+from jogos.retention import archive_match_snapshots, read_snapshots
+from jogos.scheduling import next_poll_at, poll_phase
+from jogos.scoreline import goal_markets, goal_markets_batch, score_matrix
+from jogos.series import MatchSeries
+from jogos.snapshots import SnapshotWriter
+from jogos.stat_index import build_stat_index, stat_index, stat_pair
+from jogos.stat_lines import sync_stat_lines, team_stat_summary
+from jogos.tasks import (
+    dispatch_due_matches,
+    process_match_batch,
+    queue_ingest,
+    refresh_team_forms,
+)
+from jogos.team_form import update_finalized_forms
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def create_match(external_id=1, **kwargs):
+    league, _ = League.objects.get_or_create(country="BR", name="Serie Teste")
+    season, _ = Season.objects.get_or_create(
+        league=league, name="Temporada Teste", external_id=1
+    )
+    home, _ = Team.objects.get_or_create(league=league, name="Time A", external_id=1)
+    away, _ = Team.objects.get_or_create(league=league, name="Time B", external_id=2)
+
+    defaults = {
+        "season": season,
+        "home_team": home,
+        "away_team": away,
+        "date": timezone.now(),
+    }
+    defaults.update(kwargs)
+    return Match.objects.create(external_id=external_id, **defaults)
+
+
+class SnapshotRetentionTestCase(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        self.settings_override = override_settings(
+            SNAPSHOT_ARCHIVE_DIR=self.archive_dir.name
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.match = create_match(finalizado=True)
+        for minute in range(10):
+            LiveSnapshot.objects.create(
+                match=self.match, minute=minute, xg_home=minute / 10
+            )
+
+    def test_archive_downsamples_db_and_reader_merges_full_series(self):
+        deleted = archive_match_snapshots(self.match, bucket_minutes=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(LiveSnapshot.objects.filter(match=self.match).count(), 5)
+
+        LiveSnapshot.objects.create(match=self.match, minute=10, xg_home=9)
+        frame = read_snapshots(self.match, columns=["minute", "xg_home"])
+
+        self.assertEqual(len(frame), 11)
+        self.assertEqual(frame["minute"].tolist(), sorted(frame["minute"].tolist()))
+        self.assertEqual(frame["xg_home"].iloc[-1], 9)
+
+    def test_basketball_snapshots_use_their_own_table(self):
+        match = create_match(external_id=2, sport="basketball", finalizado=True)
+        self.assertIs(match.snapshot_model, BasketballSnapshot)
+
+        for minute in range(3):
+            BasketballSnapshot.objects.create(
+                match=match, minute=minute, points_home=minute * 2
+            )
+
+        archive_match_snapshots(match, bucket_minutes=10)
+        frame = read_snapshots(match, columns=["minute", "points_home"])
+
+        self.assertEqual(frame["points_home"].tolist(), [0, 2, 4])
+        self.assertFalse(LiveSnapshot.objects.filter(match=match).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LIVE_FEED_BACKEND="local")
+class SnapshotWriterTestCase(TestCase):
+    def test_latest_by_match_and_unchanged_polls_only_touch(self):
+        first = create_match(external_id=10)
+        second = create_match(external_id=11)
+        LiveSnapshot.objects.create(match=first, minute=1, xg_home=0.1)
+        LiveSnapshot.objects.create(match=first, minute=2, xg_home=0.4)
+        LiveSnapshot.objects.create(match=second, minute=1, corners_home=2)
+
+        with self.assertNumQueries(1):
+            latest = LiveSnapshot.objects.latest_by_match([first.pk, second.pk])
+
+        self.assertEqual(latest[first.pk].minute, 2)
+        self.assertTrue(latest[first.pk].has_same_stats({"xg_home": 0.4}))
+        self.assertFalse(latest[second.pk].has_same_stats({"corners_home": 3}))
+
+        writer = SnapshotWriter(flush_size=10)
+        writer.touch(latest[first.pk])
+        writer.add(LiveSnapshot(match=second, minute=2, corners_home=3))
+
+        self.assertEqual(LiveSnapshot.objects.count(), 3)
+        writer.flush()
+
+        self.assertEqual(LiveSnapshot.objects.count(), 4)
+        latest[first.pk].refresh_from_db()
+        self.assertIsNotNone(latest[first.pk].last_seen_at)
+
+        # mesmo bucket de minuto: atualiza a linha em vez de inserir
+        writer.add(LiveSnapshot(match=second, minute=2, corners_home=4))
+        upserted = LiveSnapshot(match=second, minute=2, corners_home=5)
+        writer.add(upserted)
+        writer.flush()
+
+        self.assertEqual(LiveSnapshot.objects.count(), 4)
+        stored = LiveSnapshot.objects.get(match=second, minute=2)
+        self.assertEqual(stored.corners_home, 5)
+        # o upsert não devolve ids: o writer relê para a janela e o feed
+        self.assertEqual(upserted.pk, stored.pk)
+
+    def test_snapshots_are_published_only_after_commit(self):
+        match = create_match(external_id=12)
+        writer = SnapshotWriter()
+        writer.add(LiveSnapshot(match=match, minute=3, xg_home=0.2))
+
+        with mock.patch("jogos.snapshots.publish") as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                writer.flush()
+            publish.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+        stored = LiveSnapshot.objects.get(match=match)
+        event, payload = publish.call_args.args[1:]
+        self.assertEqual((event, payload["id"]), ("snapshot", stored.pk))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LIVE_FEED_BACKEND="local")
+class RollingWindowTestCase(TestCase):
+    def test_window_spans_minutes_and_replaces_same_bucket(self):
+        window = RollingWindow(match_id=1, minutes=4)
+        for minute, momentum in enumerate([1, 2, 3, 4, 5, 6, 7, 8]):
+            window.push({"id": minute, "minute": minute, "momentum_score": momentum})
+        window.push({"id": None, "minute": 7, "momentum_score": 10})
+
+        self.assertEqual([item.minute for item in window.snapshots(4)], [3, 4, 5, 6, 7])
+        self.assertEqual(window.first(4).minute, 3)
+        self.assertEqual(window.avg_momentum(4), 6.4)
+        self.assertEqual(window.avg_momentum(1), 8.5)
+
+    def test_window_follows_new_snapshots_and_basketball_uses_points(self):
+        match = create_match(external_id=20, sport="basketball")
+        BasketballSnapshot.objects.create(match=match, minute=1, points_home=2)
+
+        self.assertEqual(len(get_window(match)), 1)
+
+        writer = SnapshotWriter()
+        writer.add(
+            BasketballSnapshot(match=match, minute=5, points_home=12, points_away=4)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.flush()
+            # antes do commit a janela não vê o snapshot
+            self.assertEqual(len(get_window(match)), 1)
+
+        with self.assertNumQueries(0):
+            analysis = SofaScore().analyze_last_snapshots(match, window=10)
+
+        self.assertTrue(analysis["pressure_home"])
+        self.assertFalse(analysis["pressure_away"])
+        self.assertEqual(get_window(match).as_dict()["points_home"], 12)
+
+    @override_settings(LIVE_WINDOW_LOCK_WAIT=0)
+    def test_push_with_window_locked_drops_the_cached_window(self):
+        self.addCleanup(cache.clear)
+        match = create_match(external_id=22, sport="basketball")
+        BasketballSnapshot.objects.create(match=match, minute=1, points_home=2)
+        get_window(match)
+
+        # outro worker atualizando a mesma janela
+        cache.add(window_lock_key(match.pk), 1)
+        push_snapshots([BasketballSnapshot(match=match, minute=3, points_home=8)])
+
+        self.assertIsNone(cache.get(window_key(match.pk)))
+        BasketballSnapshot.objects.create(match=match, minute=3, points_home=8)
+        self.assertEqual(get_window(match).as_dict()["points_home"], 8)
+
+    def test_football_analysis_uses_series_of_the_window(self):
+        self.addCleanup(cache.clear)
+        match = create_match(external_id=21)
+        for minute, xg, shots_on in [(1, 0.0, 0), (4, 0.1, 1), (8, 0.35, 3)]:
+            LiveSnapshot.objects.create(
+                match=match, minute=minute, xg_home=xg, shots_on_home=shots_on
+            )
+        get_window(match)
+
+        with self.assertNumQueries(0):
+            analysis = SofaScore().analyze_last_snapshots(match, window=10)
+
+        self.assertTrue(analysis["pressure_home"])
+        self.assertFalse(analysis["pressure_away"])
+        self.assertEqual(analysis["pressure_windows_home"], [[8, 8]])
+        self.assertEqual(analysis["pressure_windows_away"], [])
+        self.assertIn("0.35 xG e 3 finalizações", analysis["pressure_reason_home"])
+
+
+class MatchSeriesTestCase(TestCase):
+    def test_vectorized_momentum_and_pressure_match_scalar_rules(self):
+        match = create_match(external_id=30)
+        for minute, xg, shots_on in [
+            (1, 0.0, 0),
+            (4, 0.1, 1),
+            (8, 0.35, 3),
+            (30, 0.4, 3),
+        ]:
+            LiveSnapshot.objects.create(
+                match=match,
+                minute=minute,
+                xg_home=xg,
+                shots_on_home=shots_on,
+                touches_box_home=minute // 2,
+                possession_home=50 + minute % 7,
+            )
+
+        with self.assertNumQueries(1):
+            series = MatchSeries.load(match)
+
+        snaps = list(LiveSnapshot.objects.filter(match=match).order_by("minute"))
+        expected = [0.0] + [
+            SofaScore.calculate_momentum(snap, last)
+            for last, snap in zip(snaps, snaps[1:])
+        ]
+        self.assertEqual(len(series), 4)
+        for value, reference in zip(series.momentum("home"), expected):
+            self.assertAlmostEqual(value, reference)
+
+        self.assertEqual(series.pressure_windows("home"), [(8, 8)])
+        self.assertEqual(series.tolist("minute"), [1, 4, 8, 30])
+
+
+class LiveBoardTestCase(TestCase):
+    def event(self, external_id, status, home, away, minute):
+        return {
+            "id": external_id,
+            "status": {"type": status, "clock": {"minute": minute}},
+            "homeScore": {"current": home},
+            "awayScore": {"current": away},
+        }
+
+    def test_one_listing_call_and_stats_only_for_changed_matches(self):
+        kickoff = timezone.now() - timedelta(minutes=20)
+        unchanged = create_match(
+            external_id=40,
+            date=kickoff,
+            status="inprogress",
+            home_team_score=1,
+            away_team_score=0,
+            current_minute=20,
+        )
+        scored = create_match(external_id=41, date=kickoff, status="inprogress")
+        ended = create_match(external_id=42, date=kickoff, status="inprogress")
+        board = {
+            "events": [
+                self.event(40, "inprogress", 1, 0, 20),
+                self.event(41, "inprogress", 0, 1, 20),
+            ]
+        }
+        responses = {
+            "https://www.sofascore.com/api/v1/sport/football/events/live": board,
+            "https://www.sofascore.com/api/v1/event/42": {
+                "event": self.event(42, "finished", 2, 2, 90)
+            },
+        }
+
+        with mock.patch.object(
+            SofaScore, "get_json", side_effect=responses.__getitem__
+        ), mock.patch.object(SofaScore, "get_stats") as get_stats:
+            result = SofaScore().poll_live_board()
+
+        self.assertEqual(result, {"calls": 3, "updated": 2, "changed": 1})
+        get_stats.assert_called_once_with(events={scored.pk: board["events"][1]})
+
+        scored.refresh_from_db()
+        ended.refresh_from_db()
+        self.assertEqual(scored.away_team_score, 1)
+        self.assertTrue(ended.finalizado)
+        self.assertEqual(ended.status, "finished")
+        self.assertIsNone(ended.next_poll_at)
+        self.assertFalse(Match.objects.get(pk=unchanged.pk).finalizado)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PollSchedulingTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def test_next_poll_follows_match_phase(self):
+        now = timezone.now()
+        far = Match(date=now + timedelta(hours=5), status="notstarted")
+        near = Match(date=now + timedelta(minutes=20), status="notstarted")
+        kickoff = Match(date=now + timedelta(minutes=5), status="notstarted")
+        live = Match(date=now, status="inprogress")
+        halftime = Match(date=now, status="halftime")
+        finished = Match(date=now, status="finished", finalizado=True)
+
+        self.assertEqual(poll_phase(far, now), "pre_match")
+        self.assertEqual(next_poll_at(far, now), now + timedelta(hours=1))
+        # pré-jogo não passa da entrada na janela de kickoff
+        self.assertEqual(next_poll_at(near, now), now + timedelta(minutes=5))
+        self.assertEqual(next_poll_at(kickoff, now), now + timedelta(minutes=3))
+        self.assertEqual(next_poll_at(live, now), now + timedelta(seconds=25))
+        self.assertEqual(next_poll_at(halftime, now), now + timedelta(minutes=2))
+        self.assertIsNone(next_poll_at(finished, now))
+
+    def test_dispatch_only_due_matches(self):
+        now = timezone.now()
+        live = create_match(external_id=50, status="inprogress")
+        pre_match = create_match(
+            external_id=51, date=now + timedelta(hours=3), status="notstarted"
+        )
+        later = create_match(
+            external_id=52,
+            date=now + timedelta(hours=3),
+            next_poll_at=now + timedelta(minutes=30),
+        )
+        create_match(external_id=53, finalizado=True, next_poll_at=None)
+
+        with mock.patch("jogos.tasks.poll_live_board.delay") as board, mock.patch(
+            "jogos.tasks.refresh_match_states.delay"
+        ) as refresh:
+            result = dispatch_due_matches()
+
+        self.assertEqual(result, {"live": 1, "refresh": 1, "skipped": 0})
+        board.assert_called_once_with()
+        refresh.assert_called_once_with([pre_match.pk])
+
+        live.refresh_from_db()
+        pre_match.refresh_from_db()
+        self.assertGreater(live.next_poll_at, now)
+        self.assertGreater(pre_match.next_poll_at, now + timedelta(minutes=59))
+        self.assertEqual(
+            Match.objects.get(pk=later.pk).next_poll_at, now + timedelta(minutes=30)
+        )
+
+    def test_dispatch_skips_matches_with_poll_in_flight(self):
+        create_match(external_id=54, status="inprogress")
+        create_match(external_id=55, date=timezone.now() + timedelta(hours=3))
+
+        with mock.patch("jogos.tasks.poll_live_board.delay") as board, mock.patch(
+            "jogos.tasks.refresh_match_states.delay"
+        ) as refresh:
+            dispatch_due_matches()
+            # as tasks anteriores ainda não rodaram: nada novo vai para a fila
+            Match.objects.update(next_poll_at=timezone.now())
+            result = dispatch_due_matches()
+
+        self.assertEqual(result, {"live": 1, "refresh": 0, "skipped": 2})
+        self.assertEqual(board.call_count, 1)
+        self.assertEqual(refresh.call_count, 1)
+        self.assertEqual(skipped_count(), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LIVE_FEED_BACKEND="local")
+class MatchBatchTestCase(TestCase):
+    def setUp(self):
+        # as janelas ficam no cache por match_id; não vazam para outros testes
+        self.addCleanup(cache.clear)
+
+    def test_batch_fetches_statistics_once_per_match_with_one_client(self):
+        first = create_match(external_id=60, status="inprogress")
+        second = create_match(external_id=61, status="inprogress")
+        events = {
+            str(match.pk): {
+                "id": match.external_id,
+                "status": {"clock": {"minute": 30}},
+            }
+            for match in (first, second)
+        }
+
+        with mock.patch.object(
+            SofaScore,
+            "get_json",
+            return_value={"statistics": [{"period": "ALL", "groups": []}]},
+        ) as get_json, mock.patch("get_events.SofaScore", wraps=SofaScore) as client:
+            processed = process_match_batch([first.pk, second.pk], events)
+
+        self.assertEqual(processed, 2)
+        client.assert_called_once_with()
+        urls = sorted(call.args[0] for call in get_json.call_args_list)
+        self.assertEqual(
+            urls,
+            [
+                "https://www.sofascore.com/api/v1/event/60/statistics",
+                "https://www.sofascore.com/api/v1/event/61/statistics",
+            ],
+        )
+        self.assertEqual(
+            list(LiveSnapshot.objects.values_list("match_id", "minute")),
+            [(first.pk, 30), (second.pk, 30)],
+        )
+
+    def test_concurrent_fetches_share_one_session(self):
+        client = SofaScore()
+        urls = [f"{BASE}/event/{pk}/statistics" for pk in range(8)]
+
+        with mock.patch("requests.Session") as session_class, mock.patch.object(
+            SofaScore, "get_json", lambda self, url: id(self.session)
+        ):
+            sessions = client.fetch_many(urls)
+
+        session_class.assert_called_once_with()
+        self.assertEqual(len(set(sessions.values())), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueueIngestTestCase(SimpleTestCase):
+    def test_each_day_is_queued_once_while_its_lease_is_held(self):
+        self.addCleanup(cache.clear)
+        with mock.patch("jogos.tasks.ingest_events.delay") as delay:
+            queue_ingest(["2025-11-01", "2025-11-02"])
+            queued = queue_ingest(["2025-11-02", "2025-11-03"])
+
+        self.assertEqual(queued, ["2025-11-03"])
+        delay.assert_has_calls(
+            [mock.call(["2025-11-01", "2025-11-02"]), mock.call(["2025-11-03"])]
+        )
+
+
+class TaskRoutingTestCase(SimpleTestCase):
+    def test_live_polling_has_its_own_queue(self):
+        router = celery_app.amqp.router
+        queues = {
+            name: router.route({}, name)["queue"].name
+            for name in (
+                "jogos.tasks.dispatch_due_matches",
+                "jogos.tasks.process_match_batch",
+                "jogos.tasks.ingest_events",
+                "jogos.tasks.evaluate_matches",
+                "jogos.tasks.send_telegram",
+            )
+        }
+        self.assertEqual(
+            queues,
+            {
+                "jogos.tasks.dispatch_due_matches": "live",
+                "jogos.tasks.process_match_batch": "live",
+                "jogos.tasks.ingest_events": "ingest",
+                "jogos.tasks.evaluate_matches": "analysis",
+                "jogos.tasks.send_telegram": "notify",
+            },
+        )
+
+
+@override_settings(LIVE_FEED_BACKEND="local")
+class LiveAnalysisTestCase(TestCase):
+    def test_new_version_only_when_analysis_changes(self):
+        match = create_match(external_id=70)
+
+        with mock.patch(
+            "jogos.live_analysis.publish"
+        ) as publish, self.captureOnCommitCallbacks(execute=True):
+            first = record_live_analysis(match, {"pressure_home": False}, minute=10)
+            same = record_live_analysis(match, {"pressure_home": False}, minute=11)
+            second = record_live_analysis(match, {"pressure_home": True}, minute=12)
+
+        self.assertEqual(same.pk, first.pk)
+        self.assertEqual((first.version, second.version), (1, 2))
+        self.assertEqual(publish.call_count, 2)
+        publish.assert_called_with(match.pk, "analysis", second.payload())
+        self.assertEqual(
+            LiveAnalysis.objects.latest_by_match([match.pk])[match.pk], second
+        )
+
+    def test_concurrent_version_collision_is_retried(self):
+        match = create_match(external_id=71)
+        first = record_live_analysis(match, {"pressure_home": False}, minute=10)
+
+        # a outra coleta gravou a v1 depois desta ler "nenhuma versão"
+        with mock.patch(
+            "jogos.live_analysis.latest_analysis", side_effect=[None, first]
+        ):
+            second = record_live_analysis(match, {"pressure_home": True}, minute=11)
+
+        self.assertEqual(second.version, 2)
+        self.assertEqual(
+            list(LiveAnalysis.objects.values_list("version", flat=True)), [1, 2]
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FinalizeMatchesTestCase(TestCase):
+    def test_stale_and_duplicate_matches_are_finalized_with_team_forms(self):
+        self.addCleanup(cache.clear)
+        now = timezone.now()
+        stale = create_match(external_id=80, date=now - timedelta(hours=5))
+        older_copy = create_match(external_id=81, date=now + timedelta(hours=2))
+        newer_copy = create_match(external_id=82, date=now + timedelta(hours=2))
+        live = create_match(external_id=83, date=now - timedelta(minutes=30))
+        live.home_team = Team.objects.create(
+            league=live.season.league, name="Time C", external_id=3
+        )
+        live.save()
+
+        cache.set(team_analysis_key(stale.home_team_id), {"stats": {}})
+        with mock.patch(
+            "jogos.tasks.refresh_team_forms.delay", side_effect=refresh_team_forms
+        ) as refresh, self.captureOnCommitCallbacks(execute=True):
+            result = finalize_matches(now)
+
+        self.assertEqual(result, {"stale": 1, "duplicates": 1})
+        # .update() não passa pelo post_save: forma e cache vêm de tasks por lote
+        refresh.assert_called_with([stale.home_team_id, stale.away_team_id])
+        self.assertIsNone(cache.get(team_analysis_key(stale.home_team_id)))
+        self.assertTrue(
+            TeamForm.objects.filter(team=stale.home_team_id, games=2).exists()
+        )
+        finalized = set(
+            Match.objects.filter(finalizado=True).values_list("pk", flat=True)
+        )
+        self.assertEqual(finalized, {stale.pk, older_copy.pk})
+        self.assertIsNone(Match.objects.get(pk=stale.pk).next_poll_at)
+        self.assertFalse(Match.objects.get(pk=newer_copy.pk).finalizado)
+
+
+class StatIndexTestCase(SimpleTestCase):
+    def test_index_is_built_once_per_payload(self):
+        payload = {
+            "statistics": [
+                {
+                    "period": "ALL",
+                    "groups": [
+                        {
+                            "statisticsItems": [
+                                {"key": "expectedGoals", "homeValue": 1.2},
+                                {"key": "cornerKicks", "homeValue": 5, "awayValue": 3},
+                            ]
+                        }
+                    ],
+                },
+                {
+                    "period": "2ND",
+                    "groups": [
+                        {
+                            "statisticsItems": [
+                                {"key": "expectedGoals", "homeValue": 0.4}
+                            ]
+                        }
+                    ],
+                },
+            ]
+        }
+
+        with mock.patch(
+            "jogos.stat_index.build_stat_index", wraps=build_stat_index
+        ) as build:
+            index = stat_index(payload)
+            self.assertEqual(stat_pair(index, "cornerKicks"), (5.0, 3.0))
+            self.assertEqual(stat_pair(index, "expectedGoals"), (1.2, 0.0))
+            self.assertEqual(stat_pair(index, "expectedGoals", "2ND"), (0.4, 0.0))
+            self.assertEqual(stat_pair(index, "fouls", default=-1), (-1, -1))
+
+        self.assertEqual(build.call_count, 1)
+
+        # dict alterado no lugar entre polls (mesma estrutura): valor novo
+        corners = payload["statistics"][0]["groups"][0]["statisticsItems"][1]
+        corners["homeValue"] = 7
+        self.assertEqual(stat_pair(payload, "cornerKicks"), (7.0, 3.0))
+        self.assertEqual(
+            SofaScore.parse_sofascore_stats(payload)["corners_home"],
+            stat_pair(payload, "cornerKicks")[0],
+        )
+
+        corners["homeValue"] = "n/a"
+        with self.assertLogs("jogos.stat_index", "WARNING"):
+            self.assertEqual(stat_pair(payload, "cornerKicks"), (0.0, 0.0))
+        with self.assertRaises(ValueError):
+            SofaStatParser(payload).get_stats()
+
+
+class ScorelineTestCase(SimpleTestCase):
+    def test_markets_from_score_matrix(self):
+        matrix = score_matrix(1.4, 1.1)
+        self.assertIs(score_matrix(1.4001, 1.0999), matrix)
+        self.assertAlmostEqual(matrix.sum(), 1.0)
+
+        markets = goal_markets(matrix)
+        total = 2.5
+        self.assertAlmostEqual(
+            markets["over_2_5"],
+            1 - math.exp(-total) * (1 + total + total**2 / 2),
+            places=5,
+        )
+        self.assertAlmostEqual(markets["home"] + markets["draw"] + markets["away"], 1)
+        self.assertAlmostEqual(
+            markets["home_or_draw"], markets["home"] + markets["draw"]
+        )
+        self.assertAlmostEqual(
+            markets["btts"], (1 - math.exp(-1.4)) * (1 - math.exp(-1.1)), places=5
+        )
+        self.assertEqual(markets["most_likely_score"], "1-1")
+
+        # Dixon–Coles com rho < 0 aumenta os empates de placar baixo
+        corrected = goal_markets(score_matrix(1.4, 1.1, rho=-0.1))
+        self.assertGreater(
+            corrected["correct_score"]["0-0"], markets["correct_score"]["0-0"]
+        )
+        self.assertGreater(corrected["draw"], markets["draw"])
+
+    def test_batch_matches_scalar(self):
+        home = [1.4, 0.3, 1.4, 2.2]
+        away = [1.1, 0.8, 1.1, 0.0]
+        batch = goal_markets_batch(home, away)
+
+        for row, (lam_home, lam_away) in enumerate(zip(home, away)):
+            markets = goal_markets(score_matrix(lam_home, lam_away))
+            for key in ("home", "draw", "over_1_5", "under_3_5", "btts"):
+                self.assertAlmostEqual(batch[key][row], markets[key])
+            self.assertAlmostEqual(
+                batch["correct_score"]["2-0"][row], markets["correct_score"]["2-0"]
+            )
+            self.assertEqual(
+                batch["most_likely_score"][row], markets["most_likely_score"]
+            )
+
+
+def stats_payload(**values):
+    items = [
+        {"key": key, "homeValue": home, "awayValue": away}
+        for key, (home, away) in values.items()
+    ]
+    return {"statistics": [{"period": "ALL", "groups": [{"statisticsItems": items}]}]}
+
+
+class MatchStatLineTestCase(TestCase):
+    def test_team_aggregates_come_from_stat_lines(self):
+        first = create_match(
+            external_id=90,
+            raw_statistics_json=stats_payload(
+                expectedGoals=(1.5, 0.5), cornerKicks=(6, 2), ballPossession=("55%", 1)
+            ),
+        )
+        second = create_match(
+            external_id=91,
+            raw_statistics_json=stats_payload(
+                expectedGoals=(0.5, 1.5), cornerKicks=(4, 4)
+            ),
+        )
+        self.assertEqual(sync_stat_lines([first, second]), 9)
+
+        home, away = first.home_team, first.away_team
+        with self.assertNumQueries(1):
+            profile = team_profile(away, Match.objects.filter(away_team=away))
+
+        self.assertEqual((profile["xg_for"], profile["xg_against"]), (1.0, 1.0))
+        self.assertEqual((profile["corners_for"], profile["corners_against"]), (3, 5))
+        self.assertEqual(profile["touches_box_for"], 0)
+
+        summary = team_stat_summary(home)
+        self.assertEqual(
+            summary["cornerKicks"], {"avg": 5.0, "min": 4.0, "max": 6.0, "games": 2}
+        )
+        self.assertNotIn("ballPossession", summary)  # "55%" não é numérico
+
+
+class TeamFormTestCase(TestCase):
+    def test_preview_reads_stored_form_matching_team_profile(self):
+        now = timezone.now()
+        matches = [
+            create_match(
+                external_id=100 + day,
+                date=now - timedelta(days=day),
+                finalizado=True,
+                raw_statistics_json=stats_payload(
+                    expectedGoals=(day / 2, 1.0), cornerKicks=(day, 10 - day)
+                ),
+            )
+            for day in range(1, 5)
+        ]
+        sync_stat_lines(matches)
+        update_finalized_forms(matches)
+
+        team = matches[0].home_team
+        with self.assertNumQueries(1):
+            form = team_form_profile(team, 3, before=now)
+
+        expected = team_profile(team, recent_matches(team, limit=3))
+        self.assertEqual(form, {**expected, "games": 3})
+        self.assertEqual(form["corners_for"], 2)
+
+        # preview de uma partida antiga: a forma guardada já inclui jogos depois dela
+        past = team_form_profile(team, 3, before=matches[1].date)
+        self.assertEqual(past["games"], 2)
+        self.assertEqual(past["corners_for"], 3.5)
+
+    def test_admin_check_analise_uses_batch_previews(self):
+        upcoming = [
+            create_match(
+                external_id=200 + day, date=timezone.now() + timedelta(days=day)
+            )
+            for day in range(3)
+        ]
+        match_admin = MatchAdmin(Match, admin.site)
+
+        with mock.patch("jogos.admin.send_telegram") as send:
+            match_admin.check_analise(
+                None, Match.objects.filter(pk__in=[m.pk for m in upcoming])
+            )
+
+        home = team_form_profile(upcoming[0].home_team, 5, upcoming[0].date)
+        away = team_form_profile(upcoming[0].away_team, 5, upcoming[0].date)
+        scalar = bet_recommendations(home, away, match_preview(home, away))
+        self.assertEqual(send.delay.call_count, 3)
+        self.assertEqual(
+            send.delay.call_args_list[0].args[0],
+            match_admin.build_telegram_message(upcoming[0], scalar),
+        )
+
+
+class StartupImportTestCase(SimpleTestCase):
+    # folgado para CI; localmente o startup fica bem abaixo (manage.py importtime)
+    BUDGET_SECONDS = 3.0
+    LAZY_MODULES = ["numpy", "pandas", "curl_cffi", "playwright", "get_events"]
+
+    def test_setup_and_urls_import_fast_without_heavy_modules(self):
+        code = (
+            "import sys, time; start = time.perf_counter(); "
+            f"{STARTUP_CODE}; "
+            "print(time.perf_counter() - start); "
+            f"print(','.join(m for m in {self.LAZY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE},
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        elapsed, loaded = result.stdout.splitlines()
+        self.assertLess(float(elapsed), self.BUDGET_SECONDS)
+        self.assertEqual(loaded, "")
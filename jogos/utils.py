@@ -5,6 +5,9 @@ from django.db import transaction
 from django.utils.timezone import now
 
 from jogos.models import League, Match, MatchStats, Season, Team
+from jogos.stat_index import raw_stat, stat_index
+from jogos.stat_lines import sync_stat_lines
+from jogos.team_form import update_finalized_forms
 
 
 def save_sofascore_data_nba(
@@ -92,6 +95,13 @@ def save_sofascore_data_nba(
         + json.dumps(previsao, indent=2, ensure_ascii=False)
     )
 
+    # -------------------------
+    # STAT LINES + FORMA DOS TIMES (médias por time no banco)
+    # antes do save: o post_save invalida a análise em cache dos times
+    # -------------------------
+    sync_stat_lines([match_obj])
+    update_finalized_forms([match_obj])
+
     match_obj.analysis = summary
     match_obj.save()
 
@@ -221,6 +231,13 @@ def save_sofascore_data(
         + json.dumps(standings, indent=2, ensure_ascii=False)
     )
 
+    # -------------------------
+    # STAT LINES + FORMA DOS TIMES (médias por time no banco)
+    # antes do save: o post_save invalida a análise em cache dos times
+    # -------------------------
+    sync_stat_lines([match_obj])
+    update_finalized_forms([match_obj])
+
     match_obj.analysis = summary
     match_obj.save()
 
@@ -280,6 +297,51 @@ def safe(val):
         return 0
 
 
+# pesos reais por liga
+LIGA_PESO = {
+    "premier-league": 1.20,
+    "la-liga": 1.15,
+    "serie-a": 1.10,
+    "bundesliga": 1.15,
+    "ligue-1": 1.05,
+    "brasileirao-serie-a": 1.08,
+    "default": 1.00,
+}
+
+# vantagem do mandante
+MANDANTE_BONUS = 1.05
+
+
+def analyze_match_features(data_event, data_stats):
+    """
+    Entradas numéricas de analyze_match numa linha (dict), para o lote
+    vetorizado (bet.teams.batch.analyze_match_batch).
+    """
+    row = {
+        "home_users": data_event["homeTeam"].get("userCount", 30000),
+        "away_users": data_event["awayTeam"].get("userCount", 30000),
+        "league_weight": LIGA_PESO.get(
+            data_event["tournament"]["slug"], LIGA_PESO["default"]
+        ),
+        "has_stats": bool(
+            data_stats
+            and "statistics" in data_stats
+            and any(b.get("period") == "ALL" for b in data_stats["statistics"])
+        ),
+    }
+    index = stat_index(data_stats)
+    for name, key, period in (
+        ("xg", "expectedGoals", "ALL"),
+        ("sot", "shotsOnGoal", "ALL"),
+        ("big", "bigChanceCreated", "ALL"),
+        ("xg_h2", "expectedGoals", "2ND"),
+    ):
+        home, away = raw_stat(index, key, period) if row["has_stats"] else (0, 0)
+        row[f"{name}_home"] = safe(home)
+        row[f"{name}_away"] = safe(away)
+    return row
+
+
 def analyze_match(data_event, data_stats):
     """
     Modelo avançado:
@@ -302,20 +364,8 @@ def analyze_match(data_event, data_stats):
     league = data_event["tournament"]["name"].lower()
     league_slug = data_event["tournament"]["slug"]
 
-    # pesos reais por liga
-    liga_peso = {
-        "premier-league": 1.20,
-        "la-liga": 1.15,
-        "serie-a": 1.10,
-        "bundesliga": 1.15,
-        "ligue-1": 1.05,
-        "brasileirao-serie-a": 1.08,
-        "default": 1.00,
-    }
-    peso_liga = liga_peso.get(league_slug, liga_peso["default"])
-
-    # vantagem do mandante
-    mandante_bonus = 1.05
+    peso_liga = LIGA_PESO.get(league_slug, LIGA_PESO["default"])
+    mandante_bonus = MANDANTE_BONUS
 
     # ============================
     # 2. Caso PRÉ-LIVE
@@ -393,15 +443,12 @@ def analyze_match(data_event, data_stats):
     if not all_stats:
         return analyze_match(data_event, {})  # pré-live
 
-    groups = all_stats.get("groups", [])
+    index = stat_index(data_stats)
 
-    def take(key):
+    def take(key, period="ALL"):
         """extrai estatísticas com segurança"""
-        for g in groups:
-            for item in g["statisticsItems"]:
-                if item.get("key") == key:
-                    return safe(item.get("homeValue")), safe(item.get("awayValue"))
-        return (0, 0)
+        home, away = raw_stat(index, key, period)
+        return safe(home), safe(away)
 
     # coleta avançada
     xg_home, xg_away = take("expectedGoals")
@@ -414,22 +461,15 @@ def analyze_match(data_event, data_stats):
     total_sot = sot_home + sot_away
 
     # segundo tempo
-    second_half = next((b for b in stats_list if b.get("period") == "2ND"), None)
-    xg_h2_home = xg_h2_away = 0
-    if second_half:
-        for g in second_half.get("groups", []):
-            for item in g["statisticsItems"]:
-                if item.get("key") == "expectedGoals":
-                    xg_h2_home += safe(item.get("homeValue"))
-                    xg_h2_away += safe(item.get("awayValue"))
-
-    # modelo poisson
-    def poisson(lam, k):
-        return (lam**k * math.exp(-lam)) / math.factorial(k)
-
-    p_over_2_5 = 1 - sum(poisson(total_xg, i) for i in range(3))
-    p_over_1_5 = min(1, p_over_2_5 + 0.20)
-    p_btts = min(1, (xg_home / 1.1) * (xg_away / 1.1))
+    xg_h2_home, xg_h2_away = take("expectedGoals", "2ND")
+
+    # matriz de placares (Poisson no xG de cada lado); numpy só carrega aqui
+    from jogos.scoreline import goal_markets, score_matrix
+
+    markets = goal_markets(score_matrix(xg_home, xg_away))
+    p_over_2_5 = float(markets["over_2_5"])
+    p_over_1_5 = float(markets["over_1_5"])
+    p_btts = float(markets["btts"])
     p_under_2_5 = 1 - p_over_2_5
     p_goal_h2 = min(1, (xg_h2_home + xg_h2_away) / 0.55)
 
@@ -478,12 +518,17 @@ def analyze_match(data_event, data_stats):
             "goal_h2": round(p_goal_h2 * 100, 1),
         },
         "odds": {
-            "over_1_5": round(1 / p_over_1_5, 2),
-            "over_2_5": round(1 / p_over_2_5, 2),
+            "over_1_5": round(1 / p_over_1_5, 2) if p_over_1_5 else 0,
+            "over_2_5": round(1 / p_over_2_5, 2) if p_over_2_5 else 0,
             "btts": round(1 / p_btts, 2) if p_btts else 0,
             "goal_h2": round(1 / p_goal_h2, 2) if p_goal_h2 else 0,
             "under_2_5": round(1 / p_under_2_5, 2) if p_under_2_5 else 0,
         },
+        "markets": {
+            key: round(float(markets[key]) * 100, 1)
+            for key in ("home", "draw", "away", "home_or_draw", "draw_or_away")
+        },
+        "most_likely_score": markets["most_likely_score"],
         "projected_score": f"{projected_home:.1f} x {projected_away:.1f}",
         "recommendation": rec,
         "confidence": confidence,